@@ -1,35 +1,27 @@
-import math
-import random
 import numpy as np
 import time
 import json
 import os  # Import os for checking file existence
 
-# ------------------------------------------------
-# ENVIRONMENT & GAME CONSTANTS
-# ------------------------------------------------
-SCREEN_WIDTH = 650
-SCREEN_HEIGHT = 550
-
-PLAYER_WIDTH = 100
-PLAYER_HEIGHT = 100
-PLAYER_REPLACEMENT = 15  # MUCH FASTER PLAYER SPEED for accelerated learning
-
-GRAVITY = 20
-COLLECT_DISTANCE = 20
-GARBAGE_ON_GROUND_LIMIT = 20
-
-# Fixed timestep for physics (crucial for headless simulation)
-FIXED_DT = 0.01
-
-# Garbage Spawning Variables
-GARBAGE_SPAWN_INTERVAL = 8.0  # Starting interval (seconds)
-GARBAGE_SPAWN_RATE_MODIFIER = 0.25  # Rate of difficulty increase
+from checkpoint import CheckpointWriter, read_checkpoint, write_atomic, write_checkpoint
+# Game rules and environment constants
+from game_engine import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_REPLACEMENT,
+    GARBAGE_WIDTH, GARBAGE_HEIGHT, GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, GARBAGE_POOL_CAPACITY, FIXED_DT,
+    GROUND, GameEngine,
+)
+from garbage_pool import GarbagePool
+from greedy_policy import compile_policy
+from phase_profiler import PhaseProfiler
+from policy_mmap import PolicyPublisher
+from q_storage import DENSE, DenseQStorage, as_q_storage, make_q_storage
+from transition_log import TransitionRecorder
 
 # ------------------------------------------------
 # Q-LEARNING AI SETTINGS
 # ------------------------------------------------
 ACTION_SPACE = 3  # 0: Left, 1: No Move, 2: Right
+DECISION_INTERVAL = 1  # Physics ticks each chosen action is held for (1 = decide every tick)
 
 # State Space Simplification (10 relative horizontal bins, 3 vertical bins)
 STATE_RELATIVE_X_BINS = 10
@@ -48,22 +40,79 @@ REWARD_COLLECT = 150
 PENALTY_GROUND = -75
 PENALTY_GAME_OVER = -1500
 
+# Randomness: every episode draws from its own generator seeded by (RUN_SEED, episode index)
+RUN_SEED = int(np.random.SeedSequence().entropy)  # Overridden by fast_training_run(seed=...)
+RNG_COIN_BLOCK = 4096    # Exploration coins drawn per block (one per tick)
+RNG_ACTION_BLOCK = 1024  # Random actions drawn per block
+RNG_SPAWN_BLOCK = 256    # Spawn x positions drawn per block
+
 # File paths for saving/loading
-Q_TABLE_FILE = 'catch_garbage_q_table.npy'
-METADATA_FILE = 'ai_metadata.json'  # To store epsilon and other variables
+CHECKPOINT_FILE = 'catch_garbage_checkpoint.npz'  # Q-table, epsilon, episodes, seed and hyperparameters
+Q_TABLE_FILE = 'catch_garbage_q_table.npy'  # Q-table alone, as read by visual_player
+METADATA_FILE = 'ai_metadata.json'  # Epsilon of old checkpoints (read only, for migration)
+PROFILE_FILE = 'training_profile.json'  # Per-phase timings of a profiled run
+POLICY_FILE = 'catch_garbage_policy.bin'  # Live Q-table for viewers (visual_player.py --live)
+TRANSITIONS_FILE = 'catch_garbage_transitions.bin'  # Transition log of a recorded run (see transition_log.py)
+
+# Periodic checkpoints during training (whichever comes first)
+CHECKPOINT_EVERY_EPISODES = 1000
+CHECKPOINT_EVERY_SECONDS = 60
+
+# Seconds between live Q-table publishes to POLICY_FILE
+POLICY_PUBLISH_SECONDS = 0.5
 
 # Initialize Q-Table and Epsilon
 Q_TABLE = np.zeros(Q_TABLE_SHAPE)
 GLOBAL_EPSILON = INITIAL_EPSILON
+_Q_STORAGE = DenseQStorage(table=Q_TABLE)  # Q_TABLE behind the storage interface, see q_storage()
+EPISODES_TRAINED = 0  # Over all sessions; also the index of the next episode
+
+# Reused by every episode, so spawning never allocates a new object
+GARBAGE_POOL = GarbagePool(GARBAGE_POOL_CAPACITY, GARBAGE_WIDTH, GARBAGE_HEIGHT)
+
+# PhaseProfiler while profiling (see fast_training_run), otherwise None
+PROFILER = None
+
+# TransitionRecorder while recording transitions (see fast_training_run), otherwise None
+RECORDER = None
 
 
 # ------------------------------------------------
 # CHECKPOINTING FUNCTIONS
 # ------------------------------------------------
 
+def hyperparameters():
+    """Settings a checkpoint was trained with, stored alongside it."""
+    return dict(TrainingConfig().as_dict(), player_replacement=PLAYER_REPLACEMENT, fixed_dt=FIXED_DT)
+
+
 def load_checkpoint():
-    """Loads the Q-table and epsilon value if they exist."""
-    global Q_TABLE, GLOBAL_EPSILON, INITIAL_EPSILON
+    """Loads the Q-table, epsilon, episode count and run seed if a checkpoint exists.
+
+    Falls back to the old separate Q-table / metadata files.
+    """
+    global Q_TABLE, GLOBAL_EPSILON, EPISODES_TRAINED, RUN_SEED
+
+    if os.path.exists(CHECKPOINT_FILE):
+        try:
+            snapshot = read_checkpoint(CHECKPOINT_FILE)
+            if snapshot['q_table'].shape != Q_TABLE_SHAPE:
+                raise ValueError(f"Q-table shape {snapshot['q_table'].shape} does not match {Q_TABLE_SHAPE}")
+
+            Q_TABLE = snapshot['q_table']
+            GLOBAL_EPSILON = max(MIN_EPSILON, snapshot['epsilon'])
+            EPISODES_TRAINED = snapshot['episodes_trained']
+            RUN_SEED = snapshot['run_seed']
+            print(f"Loaded checkpoint from {CHECKPOINT_FILE}. Episodes trained: {EPISODES_TRAINED:,} | "
+                  f"Epsilon: {GLOBAL_EPSILON:.6f}")
+
+            if snapshot['hyperparameters'] != hyperparameters():
+                print("Warning: checkpoint was trained with different hyperparameters.")
+            return
+        except Exception as e:
+            print(f"Error loading checkpoint: {e}. Trying the Q-table file.")
+
+    EPISODES_TRAINED = 0
 
     # 1. Load Q-Table
     if os.path.exists(Q_TABLE_FILE):
@@ -92,56 +141,112 @@ def load_checkpoint():
         GLOBAL_EPSILON = INITIAL_EPSILON
 
 
-def save_checkpoint(final_epsilon):
-    """Saves the current Q-table and the last epsilon value."""
-    # 1. Save Q-Table
-    np.save(Q_TABLE_FILE, Q_TABLE)
+def checkpoint_snapshot(epsilon, episodes_trained, q_table=None):
+    """Copies the training state, so it can be written while training goes on."""
+    return {
+        'q_table': np.array(Q_TABLE if q_table is None else q_table, copy=True),
+        'epsilon': float(epsilon),
+        'episodes_trained': int(episodes_trained),
+        'run_seed': int(RUN_SEED),
+        'hyperparameters': hyperparameters(),
+    }
+
 
-    # 2. Save Metadata (Epsilon)
-    metadata = {'epsilon': final_epsilon}
-    with open(METADATA_FILE, 'w') as f:
-        json.dump(metadata, f)
+def write_checkpoint_files(snapshot):
+    """Atomically writes the checkpoint and the standalone Q-table file."""
+    write_checkpoint(CHECKPOINT_FILE, snapshot)
+    write_atomic(Q_TABLE_FILE, lambda f: np.save(f, snapshot['q_table']))
 
-    print(f"\nSaved Q-table to {Q_TABLE_FILE} and metadata to {METADATA_FILE}.")
+
+def save_checkpoint(final_epsilon):
+    """Saves the current Q-table, epsilon and EPISODES_TRAINED (blocking)."""
+    write_checkpoint_files(checkpoint_snapshot(final_epsilon, EPISODES_TRAINED))
+    print(f"\nSaved checkpoint to {CHECKPOINT_FILE} and Q-table to {Q_TABLE_FILE}.")
 
 
 # ------------------------------------------------
 # SIMULATION CLASSES (Simplified, no Pygame dependency)
 # ------------------------------------------------
 
-class Player:
-    def __init__(self, x, y, width, height):
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-
-    @property
-    def centerx(self):
-        return self.x + self.width / 2
-
-
-class Garbage:
-    def __init__(self, y, width, height):
-        self.x = random.randint(20, SCREEN_WIDTH - width - 20)
-        self.y = y
-        self.width = width
-        self.height = height
-        self.vy = 0.0
-        self._y = float(self.y)
-        self.lock = False  # True if it has hit the ground
-
-    @property
-    def centerx(self):
-        return self.x + self.width / 2
-
-    @property
-    def centery(self):
-        return self.y + self.height / 2
-
-    @property
-    def bottom(self):
-        return self.y + self.height
+class EpisodeRandom:
+    """Block-drawn random streams for one episode.
+
+    Exploration coins, random actions and spawn x positions come from three
+    independent child generators of SeedSequence([run_seed, episode_index]), so
+    an episode is exactly reproducible from those two numbers and skipping ticks
+    in one stream never shifts the others. Values are pre-drawn in blocks and
+    handed out from plain lists to keep the per-tick cost to an index lookup.
+    """
+
+    def __init__(self, run_seed, episode_index):
+        coin_seed, action_seed, spawn_seed = np.random.SeedSequence([run_seed, episode_index]).spawn(3)
+        self.coin_rng = np.random.default_rng(coin_seed)
+        self.action_rng = np.random.default_rng(action_seed)
+        self.spawn_rng = np.random.default_rng(spawn_seed)
+
+        self.coin_index = self.action_index = self.spawn_index = 0
+        self._draw_coins()
+        self._draw_actions()
+        self._draw_spawns()
+
+    def _draw_coins(self):
+        self.coin_block = self.coin_rng.random(RNG_COIN_BLOCK)
+        self.coins = self.coin_block.tolist()
+        self.coin_index = 0
+
+    def _draw_actions(self):
+        self.action_block = self.action_rng.integers(0, ACTION_SPACE, RNG_ACTION_BLOCK)
+        self.actions = self.action_block.tolist()
+        self.action_index = 0
+
+    def _draw_spawns(self):
+        self.spawn_block = self.spawn_rng.integers(
+            GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, RNG_SPAWN_BLOCK, endpoint=True)
+        self.spawns = self.spawn_block.tolist()
+        self.spawn_index = 0
+
+    def coin(self):
+        """Uniform [0, 1) draw deciding whether this tick explores."""
+        if self.coin_index == RNG_COIN_BLOCK:
+            self._draw_coins()
+        value = self.coins[self.coin_index]
+        self.coin_index += 1
+        return value
+
+    def exploit_coins(self, count, epsilon):
+        """Consumes up to `count` coins and stops at the first one below `epsilon`.
+
+        Returns (coins >= epsilon before it, whether one below epsilon was found);
+        that exploring coin is consumed as well.
+        """
+        exploited = 0
+        while count > 0:
+            if self.coin_index == RNG_COIN_BLOCK:
+                self._draw_coins()
+            end = min(self.coin_index + count, RNG_COIN_BLOCK)
+            explore = np.flatnonzero(self.coin_block[self.coin_index:end] < epsilon)
+            if explore.size:
+                exploited += int(explore[0])
+                self.coin_index += int(explore[0]) + 1
+                return exploited, True
+            exploited += end - self.coin_index
+            count -= end - self.coin_index
+            self.coin_index = end
+        return exploited, False
+
+    def random_action(self):
+        if self.action_index == RNG_ACTION_BLOCK:
+            self._draw_actions()
+        value = self.actions[self.action_index]
+        self.action_index += 1
+        return value
+
+    def spawn_x(self):
+        if self.spawn_index == RNG_SPAWN_BLOCK:
+            self._draw_spawns()
+        value = self.spawns[self.spawn_index]
+        self.spawn_index += 1
+        return value
 
 
 # ------------------------------------------------
@@ -149,7 +254,16 @@ class Garbage:
 # ------------------------------------------------
 
 def get_state(player_obj, garbage_list):
-    """Discretizes the game state (Relative X, Y Height)."""
+    """Discretizes the game state (Relative X, Y Height).
+
+    `garbage_list` is either a GarbagePool or a plain list of garbage objects.
+    """
+    if isinstance(garbage_list, GarbagePool):
+        slot = garbage_list.closest_falling(player_obj.centerx)
+        if slot < 0:
+            return (0, 0)
+        return discretize_state(garbage_list.centerx(slot) - player_obj.centerx, garbage_list.centery(slot))
+
     falling_garbage = [g for g in garbage_list if not g.lock]
 
     if not falling_garbage:
@@ -157,32 +271,47 @@ def get_state(player_obj, garbage_list):
 
     closest_garbage = min(falling_garbage, key=lambda g: abs(player_obj.centerx - g.centerx))
 
-    # 1. Relative X Bin (Horizontal distance)
-    relative_x = closest_garbage.centerx - player_obj.centerx
+    return discretize_state(closest_garbage.centerx - player_obj.centerx, closest_garbage.centery)
 
+
+def discretize_state(relative_x, garbage_center_y):
+    """Maps the closest garbage's position to its (relative X bin, Y bin) state."""
+    # 1. Relative X Bin (Horizontal distance)
     bin_size = SCREEN_WIDTH / STATE_RELATIVE_X_BINS
 
-    relative_x_bin = np.clip(
+    relative_x_bin = min(max(
         int((relative_x + SCREEN_WIDTH / 2) / bin_size),
-        0, STATE_RELATIVE_X_BINS - 1
+        0), STATE_RELATIVE_X_BINS - 1
     )
 
     # 2. Y Height Bin (Vertical position: High, Mid, Low)
-    garbage_y_bin = np.clip(
-        int(closest_garbage.centery / SCREEN_HEIGHT * STATE_Y_BINS),
-        0, STATE_Y_BINS - 1
+    garbage_y_bin = min(max(
+        int(garbage_center_y / SCREEN_HEIGHT * STATE_Y_BINS),
+        0), STATE_Y_BINS - 1
     )
 
     return (relative_x_bin, garbage_y_bin)
 
 
-def select_action(state):
-    """Selects an action using the Epsilon-Greedy strategy."""
-    if random.random() < GLOBAL_EPSILON:
-        return random.choice(range(ACTION_SPACE))  # Explore
+def q_storage():
+    """Q_TABLE as a DenseQStorage (re-wrapped whenever Q_TABLE has been rebound)."""
+    global _Q_STORAGE
+    if _Q_STORAGE.table is not Q_TABLE:
+        _Q_STORAGE = DenseQStorage(table=Q_TABLE)
+    return _Q_STORAGE
+
+
+def select_action(state, episode_random, q_values=None):
+    """Selects an action using the Epsilon-Greedy strategy.
+
+    `q_values` is any Q-storage backend; the default is Q_TABLE.
+    """
+    if episode_random.coin() < GLOBAL_EPSILON:
+        return episode_random.random_action()  # Explore
     else:
-        q_values = Q_TABLE[state]
-        return np.argmax(q_values)
+        if q_values is None:
+            q_values = q_storage()
+        return q_values.argmax(state)
 
 
 def apply_action(player_obj, action):
@@ -193,171 +322,374 @@ def apply_action(player_obj, action):
         player_obj.x += PLAYER_REPLACEMENT
 
 
-def update_q_table(state, action, reward, next_state):
-    """Applies the Q-learning formula."""
-    old_q_value = Q_TABLE[state + (action,)]
-    max_future_q = np.max(Q_TABLE[next_state])
+def update_q_table(state, action, reward, next_state, q_values=None):
+    """Applies the Q-learning formula to `q_values` (any Q-storage backend; default Q_TABLE)."""
+    if q_values is None:
+        q_values = q_storage()
+    old_q_value = q_values.value(state, action)
+    max_future_q = q_values.max(next_state)
 
     new_q_value = (1 - LEARNING_RATE) * old_q_value + LEARNING_RATE * (reward + DISCOUNT_FACTOR * max_future_q)
 
-    Q_TABLE[state + (action,)] = new_q_value
+    q_values.update(state, action, new_q_value)
+
+
+# ------------------------------------------------
+# TRAINER OBJECT (one configuration's state, no module globals)
+# ------------------------------------------------
+
+class TrainingConfig:
+    """Hyperparameters of one training run. Defaults are the module constants."""
+
+    FIELDS = (
+        'learning_rate', 'discount_factor', 'initial_epsilon', 'epsilon_decay', 'min_epsilon',
+        'reward_collect', 'penalty_ground', 'penalty_game_over',
+        'state_relative_x_bins', 'state_y_bins', 'decision_interval',
+    )
+
+    def __init__(self, **overrides):
+        self.learning_rate = LEARNING_RATE
+        self.discount_factor = DISCOUNT_FACTOR
+        self.initial_epsilon = INITIAL_EPSILON
+        self.epsilon_decay = EPSILON_DECAY
+        self.min_epsilon = MIN_EPSILON
+        self.reward_collect = REWARD_COLLECT
+        self.penalty_ground = PENALTY_GROUND
+        self.penalty_game_over = PENALTY_GAME_OVER
+        self.state_relative_x_bins = STATE_RELATIVE_X_BINS
+        self.state_y_bins = STATE_Y_BINS
+        self.decision_interval = DECISION_INTERVAL
+
+        for name, value in overrides.items():
+            if name not in self.FIELDS:
+                raise TypeError(f"Unknown hyperparameter: {name}")
+            setattr(self, name, value)
+
+    @property
+    def q_table_shape(self):
+        return (self.state_relative_x_bins, self.state_y_bins, ACTION_SPACE)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self):
+        return f"TrainingConfig({', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())})"
+
+
+class QLearningTrainer:
+    """Q-table, epsilon, seed and garbage pool of one configuration.
+
+    Several trainers can live in one process without sharing anything. The
+    module-level run_episode() is this trainer wrapped around Q_TABLE,
+    GLOBAL_EPSILON and RUN_SEED, so both produce the same episodes.
+
+    `q_table` is an array or Q-storage backend to learn into (arrays are not
+    copied); without one, an empty backend of kind `storage` is created
+    (DENSE, DENSE32, DENSE16 or SPARSE, see q_storage.py).
+    """
+
+    def __init__(self, config=None, q_table=None, epsilon=None, run_seed=None, garbage_pool=None, storage=DENSE):
+        self.config = config = config if config is not None else TrainingConfig()
+        if q_table is None:
+            self.q_storage = make_q_storage(storage, config.q_table_shape)
+        else:
+            self.q_storage = as_q_storage(q_table)
+        self.epsilon = config.initial_epsilon if epsilon is None else epsilon
+        self.run_seed = int(np.random.SeedSequence().entropy) if run_seed is None else run_seed
+        self.garbage_pool = garbage_pool if garbage_pool is not None else GarbagePool(
+            GARBAGE_POOL_CAPACITY, GARBAGE_WIDTH, GARBAGE_HEIGHT)
+        self.engine = GameEngine(self.garbage_pool)
+        self.episodes_trained = 0
+        self.profiler = None
+        self.recorder = None  # TransitionRecorder that gets every transition learned from
+
+        self.x_bin_size = SCREEN_WIDTH / config.state_relative_x_bins
+
+    # --- Q-Learning core (same formulas as the module functions) ---
+
+    def get_state(self, player_obj):
+        garbage_pool = self.garbage_pool
+        slot = garbage_pool.closest_falling(player_obj.centerx)
+        if slot < 0:
+            return (0, 0)
+        return self.discretize_state(garbage_pool.centerx(slot) - player_obj.centerx, garbage_pool.centery(slot))
+
+    def discretize_state(self, relative_x, garbage_center_y):
+        x_bins = self.config.state_relative_x_bins
+        y_bins = self.config.state_y_bins
+        relative_x_bin = min(max(int((relative_x + SCREEN_WIDTH / 2) / self.x_bin_size), 0), x_bins - 1)
+        garbage_y_bin = min(max(int(garbage_center_y / SCREEN_HEIGHT * y_bins), 0), y_bins - 1)
+        return (relative_x_bin, garbage_y_bin)
+
+    def select_action(self, state, episode_random):
+        if episode_random.coin() < self.epsilon:
+            return episode_random.random_action()  # Explore
+        return self.q_storage.argmax(state)
+
+    def update_q_table(self, state, action, reward, next_state):
+        q_values = self.q_storage
+        learning_rate = self.config.learning_rate
+        old_q_value = q_values.value(state, action)
+        max_future_q = q_values.max(next_state)
+
+        new_q_value = (1 - learning_rate) * old_q_value + learning_rate * (
+            reward + self.config.discount_factor * max_future_q)
+
+        q_values.update(state, action, new_q_value)
+
+    # --- Episodes ---
+
+    def run_episode(self, episode_index=0, learn=True):
+        """Runs a single episode (game) of the GameEngine to completion.
+
+        All randomness comes from EpisodeRandom(run_seed, episode_index). With
+        `learn` off the Q-table and epsilon are left untouched (evaluation).
+        While learning, every transition the Q-table is updated with also goes
+        to `recorder`, if one is set.
+
+        An action is chosen every `config.decision_interval` ticks and repeated
+        in between. With an interval of 1 every ground/collection event updates
+        the Q-table on its own; with a longer one the rewards of the interval are
+        summed into one update at the next decision, whose state is next_state.
+        """
+        config = self.config
+        episode_random = EpisodeRandom(self.run_seed, episode_index)
+        profiler = self.profiler
+        recorder = self.recorder
+
+        # Reset game state
+        engine = self.engine
+        engine.profiler = profiler
+        engine.reset(episode_random.spawn_x)
+        player = engine.player
+
+        # Variables for Q-Learning update
+        last_state = None
+        last_action = None
+        decision_interval = config.decision_interval
+        ticks_until_decision = 0
+        interval_reward = 0  # Reward since the last decision
+        interval_events = False
+
+        def on_event(kind):
+            """Rewards a ground/collection event the moment it happens."""
+            nonlocal interval_reward, interval_events
+            r = config.penalty_ground if kind == GROUND else config.reward_collect
+            interval_reward += r
+            interval_events = True
+
+            if learn and decision_interval == 1:
+                # Called from inside engine.step's loops: the update is left out of their phases
+                if profiler is not None:
+                    profiler.begin_nested()
+                next_state = self.get_state(player)
+                self.update_q_table(last_state, last_action, r, next_state)
+                if recorder is not None:
+                    recorder.record(episode_index, last_state, last_action, r, next_state)
+                if profiler is not None:
+                    profiler.end_nested('q_update')
+
+        is_running = True
+
+        while is_running:
+            if profiler is not None:
+                profiler.start(len(engine.garbage_pool))
+
+            # --- AI Decision Making ---
+            if ticks_until_decision == 0:
+                current_state = self.get_state(player)
+                if profiler is not None:
+                    profiler.lap('get_state')
+
+                if learn and interval_events and decision_interval > 1:
+                    # The held action's summed reward, observed at this decision
+                    self.update_q_table(last_state, last_action, interval_reward, current_state)
+                    if recorder is not None:
+                        recorder.record(episode_index, last_state, last_action, interval_reward, current_state)
+                    if profiler is not None:
+                        profiler.lap('q_update')
+
+                action = self.select_action(current_state, episode_random)
+                if profiler is not None:
+                    profiler.lap('select_action')
+
+                last_state = current_state
+                last_action = action
+                ticks_until_decision = decision_interval
+                interval_reward = 0
+                interval_events = False
+
+            ticks_until_decision -= 1
+
+            # --- Physics and Reward Collection ---
+            if engine.step(last_action, on_event):
+                is_running = False
+                interval_reward += config.penalty_game_over
+
+                if learn:
+                    learning_rate = config.learning_rate
+                    old_q_value = self.q_storage.value(last_state, last_action)
+                    new_q_value = (1 - learning_rate) * old_q_value + learning_rate * (
+                        interval_reward + config.discount_factor * 0)
+                    self.q_storage.update(last_state, last_action, new_q_value)
+                    if recorder is not None:
+                        recorder.record(episode_index, last_state, last_action, interval_reward,
+                                        self.get_state(player), done=True)
+                    if profiler is not None:
+                        profiler.lap('q_update')
+
+        # --- End of Episode ---
+        if learn:
+            # Epsilon decay occurs only once per episode
+            self.epsilon = max(config.min_epsilon, self.epsilon * config.epsilon_decay)
+            self.episodes_trained += 1
+
+        return engine.points, engine.game_time
+
+    def train(self, episodes=None, max_seconds=None):
+        """Runs learning episodes until `episodes` have run or `max_seconds` have passed.
+
+        Returns (episodes run, total points).
+        """
+        start_time = time.time()
+        episode_count = 0
+        total_points = 0
+
+        while episodes is None or episode_count < episodes:
+            if max_seconds is not None and time.time() - start_time >= max_seconds:
+                break
+            points, _ = self.run_episode(self.episodes_trained)
+            episode_count += 1
+            total_points += points
+
+        return episode_count, total_points
+
+    def evaluate(self, episodes, seed):
+        """Mean points of `episodes` greedy games seeded from `seed`, without learning."""
+        q_table = self.q_storage.to_dense(self.config.q_table_shape)
+        evaluator = QLearningTrainer(self.config, compile_policy(q_table), epsilon=0.0, run_seed=seed,
+                                     garbage_pool=self.garbage_pool)
+        return sum(evaluator.run_episode(i, learn=False)[0] for i in range(episodes)) / episodes
 
 
 # ------------------------------------------------
 # SIMULATION LOOP (THE FAST RUNNER)
 # ------------------------------------------------
 
-def visualize_q_table():
-    """Prints a text visualization of the Q-table's policy."""
+def visualize_q_table(q_values=None, x_bins=STATE_RELATIVE_X_BINS, y_bins=STATE_Y_BINS):
+    """Prints a text visualization of the Q-table's policy.
+
+    `q_values` is any Q-storage backend; the default is Q_TABLE.
+    """
+    if q_values is None:
+        q_values = q_storage()
+
     print("\n--- AI Learned Policy (Best Action for each State) ---")
     print("Action Key: 0=LEFT, 1=NONE, 2=RIGHT")
     print("Relative X Bins (0=Leftmost, 9=Rightmost) vs. Y Bins (0=High, 2=Low)")
 
     # Create the header for the relative X bins
-    header = ["Y Bins ↓ |"] + [f"X={i}" for i in range(STATE_RELATIVE_X_BINS)]
+    header = ["Y Bins ↓ |"] + [f"X={i}" for i in range(x_bins)]
     print("-" * 75)
     print("".join([f"{col:^7}" for col in header]))
     print("-" * 75)
 
     # Iterate through Y Bins (vertical height)
-    for y_bin in range(STATE_Y_BINS):
+    for y_bin in range(y_bins):
         row = [f"Y={y_bin:^5} |"]
         # Iterate through Relative X Bins (horizontal position)
-        for x_bin in range(STATE_RELATIVE_X_BINS):
+        for x_bin in range(x_bins):
             state = (x_bin, y_bin)
-            best_action = np.argmax(Q_TABLE[state])
+            best_action = q_values.argmax(state)
             row.append(f" {best_action:^5} |")
         print("".join(row).replace('| |', '|'))
         print("-" * 75)
 
 
-def run_episode():
-    """Runs a single episode (game) to completion."""
-    global GLOBAL_EPSILON
-
-    # Reset game state
-    player = Player(275, 450, PLAYER_WIDTH, PLAYER_HEIGHT)
-    garbage_list = []
-    points = 0
-    garbage_on_ground_count = 0
-
-    game_time = 0.0
-    spawn_timer = 0.0
-    spawn_difficulty_rate = 2.0  # Corresponds to initial 'x' in original log2 formula
-
-    # Variables for Q-Learning update
-    last_state = None
-    last_action = None
-
-    is_running = True
-
-    while is_running:
-
-        # --- Garbage Spawning ---
-        spawn_timer += FIXED_DT
-
-        log_value = math.log2(spawn_difficulty_rate)
-        wait_time = GARBAGE_SPAWN_INTERVAL / log_value
-
-        if spawn_timer >= wait_time or not garbage_list:
-            garbage = Garbage(-50, 50, 50)
-            garbage_list.append(garbage)
-            spawn_timer = 0.0
-            spawn_difficulty_rate += GARBAGE_SPAWN_RATE_MODIFIER
-
-        # --- AI Decision Making ---
-        current_state = get_state(player, garbage_list)
-        action = select_action(current_state)
-        apply_action(player, action)
-
-        last_state = current_state
-        last_action = action
-
-        # --- Physics and Reward Collection ---
-
-        reward = 0
+def run_episode(episode_index=0):
+    """Runs a single episode (game) to completion on Q_TABLE / GLOBAL_EPSILON.
 
-        # 1. Apply Gravity and Check Ground Collision
-        for garbage in garbage_list[:]:
-            if garbage.lock: continue
-
-            garbage._y += (garbage.vy * FIXED_DT)
-            garbage.y = int(garbage._y)
-            garbage.vy += (GRAVITY * FIXED_DT)
-
-            # Check for ground collision
-            if garbage.bottom >= SCREEN_HEIGHT:
-                garbage.y = SCREEN_HEIGHT - garbage.height
-                garbage._y = garbage.y
-                garbage.vy = 0.0
-                garbage.lock = True
-
-                garbage_on_ground_count += 1
-                r = PENALTY_GROUND
-                reward += r
-
-                next_state = get_state(player, garbage_list)
-                update_q_table(last_state, last_action, r, next_state)
-
-        # 2. Check for Player Collection
-        for garbage in garbage_list[:]:
-            if garbage.lock: continue
-
-            player_center_x = player.centerx
-            player_collect_y = player.y + player.height / 3
-
-            dx = garbage.centerx - player_center_x
-            dy = garbage.centery - player_collect_y
-            length_sq = (dx ** 2 + dy ** 2)
-
-            if length_sq < COLLECT_DISTANCE ** 2:
-                garbage_list.remove(garbage)
-                points += 1
-                r = REWARD_COLLECT
-                reward += r
-
-                next_state = get_state(player, garbage_list)
-                update_q_table(last_state, last_action, r, next_state)
-
-        # 3. Check Game Over
-        if garbage_on_ground_count > GARBAGE_ON_GROUND_LIMIT:
-            is_running = False
-            reward += PENALTY_GAME_OVER
-
-            old_q_value = Q_TABLE[last_state + (last_action,)]
-            new_q_value = (1 - LEARNING_RATE) * old_q_value + LEARNING_RATE * (reward + DISCOUNT_FACTOR * 0)
-            Q_TABLE[last_state + (last_action,)] = new_q_value
-
-        game_time += FIXED_DT
-
-    # --- End of Episode ---
-    # Epsilon decay occurs only once per episode
-    GLOBAL_EPSILON = max(MIN_EPSILON, GLOBAL_EPSILON * EPSILON_DECAY)
-
-    return points, game_time
+    All randomness comes from EpisodeRandom(RUN_SEED, episode_index).
+    """
+    global GLOBAL_EPSILON
 
+    trainer = QLearningTrainer(TrainingConfig(), Q_TABLE, GLOBAL_EPSILON, RUN_SEED, GARBAGE_POOL)
+    trainer.profiler = PROFILER
+    trainer.recorder = RECORDER
+    result = trainer.run_episode(episode_index)
+
+    GLOBAL_EPSILON = trainer.epsilon
+    return result
+
+
+def fast_training_run(max_runtime_seconds=3600, episode_runner=None, seed=None, profile=False,
+                      checkpoint_every_episodes=CHECKPOINT_EVERY_EPISODES,
+                      checkpoint_every_seconds=CHECKPOINT_EVERY_SECONDS, publish_policy=True,
+                      record_transitions=False):
+    """Runs episodes as fast as possible for a set duration (default 1 hour).
+
+    `episode_runner` replaces run_episode, e.g. with the event-driven runner.
+    Episodes continue the checkpoint's seed and episode count; pass `seed` to
+    start a different stream. With `profile`, run_episode times each phase of
+    a tick and the totals are written to PROFILE_FILE next to the checkpoint.
+    A checkpoint is written in the background every `checkpoint_every_episodes`
+    episodes or `checkpoint_every_seconds` seconds, whichever comes first.
+    With `publish_policy`, the Q-table is also published to POLICY_FILE every
+    POLICY_PUBLISH_SECONDS for live viewers. With `record_transitions`,
+    run_episode appends every transition it learns from to TRANSITIONS_FILE
+    (other episode runners do not record).
+    """
+    global RUN_SEED, PROFILER, RECORDER, EPISODES_TRAINED
+
+    if episode_runner is None:
+        episode_runner = run_episode
+    PROFILER = PhaseProfiler() if profile else None
 
-def fast_training_run(max_runtime_seconds=3600):
-    """Runs episodes as fast as possible for a set duration (default 1 hour)."""
     start_time = time.time()
     episode_count = 0
     total_points = 0
 
     # Load previous training state
     load_checkpoint()
+    if seed is not None:
+        RUN_SEED = seed
+    first_episode = EPISODES_TRAINED
+
+    checkpoint_writer = CheckpointWriter(write_checkpoint_files)
+    last_checkpoint_episode = 0
+    last_checkpoint_time = start_time
+
+    policy_publisher = PolicyPublisher(POLICY_FILE, Q_TABLE_SHAPE) if publish_policy else None
+    if policy_publisher is not None:
+        policy_publisher.publish(Q_TABLE)
+    last_publish_time = start_time
+
+    RECORDER = TransitionRecorder(TRANSITIONS_FILE) if record_transitions else None
 
     print("--- Starting Headless Q-Learning Simulation ---")
     print(f"Goal Runtime: {max_runtime_seconds // 60} minutes")
     print(f"Current Epsilon: {GLOBAL_EPSILON:.6f}")
+    print(f"Run Seed: {RUN_SEED}")
     print("-" * 40)
 
     try:
         while time.time() - start_time < max_runtime_seconds:
-            points, duration = run_episode()
+            points, duration = episode_runner(first_episode + episode_count)
 
             episode_count += 1
             total_points += points
 
+            # Periodic checkpoint: only the snapshot copy happens on this thread
+            if (episode_count - last_checkpoint_episode >= checkpoint_every_episodes
+                    or time.time() - last_checkpoint_time >= checkpoint_every_seconds):
+                checkpoint_writer.submit(checkpoint_snapshot(GLOBAL_EPSILON, first_episode + episode_count))
+                last_checkpoint_episode = episode_count
+                last_checkpoint_time = time.time()
+
+            if policy_publisher is not None and time.time() - last_publish_time >= POLICY_PUBLISH_SECONDS:
+                policy_publisher.publish(Q_TABLE)
+                last_publish_time = time.time()
+
             # Log progress every 100 episodes
             if episode_count % 100 == 0:
                 elapsed_time = time.time() - start_time
@@ -369,6 +701,18 @@ def fast_training_run(max_runtime_seconds=3600):
     except KeyboardInterrupt:
         print("\nTraining interrupted by user.")
 
+    finally:
+        checkpoint_writer.close()
+        if policy_publisher is not None:
+            policy_publisher.publish(Q_TABLE)
+            policy_publisher.close()
+        if RECORDER is not None:
+            RECORDER.close()
+            print(f"Recorded {RECORDER.written:,} transitions to {TRANSITIONS_FILE}.")
+            RECORDER = None
+
+    EPISODES_TRAINED = first_episode + episode_count
+
     print("-" * 40)
     print(f"Simulation Finished. Total time added: {int(time.time() - start_time)} seconds.")
     print(f"Total Episodes Run in this session: {episode_count:,}")
@@ -381,6 +725,11 @@ def fast_training_run(max_runtime_seconds=3600):
     # Save the current state for continuation
     save_checkpoint(GLOBAL_EPSILON)
 
+    if PROFILER is not None:
+        PROFILER.report()
+        PROFILER.dump(os.path.join(os.path.dirname(Q_TABLE_FILE), PROFILE_FILE))
+        PROFILER = None
+
     # Visualize the final policy
     visualize_q_table()
 
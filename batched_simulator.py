@@ -0,0 +1,433 @@
+import time
+import numpy as np
+
+import MachineLearningGemini as trainer
+from MachineLearningGemini import (
+    ACTION_SPACE, STATE_RELATIVE_X_BINS, STATE_Y_BINS,
+    LEARNING_RATE, DISCOUNT_FACTOR, EPSILON_DECAY, MIN_EPSILON,
+    REWARD_COLLECT, PENALTY_GROUND, PENALTY_GAME_OVER,
+    POLICY_PUBLISH_SECONDS,
+)
+from game_engine import (
+    SCREEN_WIDTH, SCREEN_HEIGHT,
+    PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_REPLACEMENT, PLAYER_START_X, PLAYER_START_Y,
+    GARBAGE_WIDTH, GARBAGE_HEIGHT, GARBAGE_START_Y, GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX,
+    GRAVITY, COLLECT_DISTANCE, GARBAGE_ON_GROUND_LIMIT, FIXED_DT,
+    GARBAGE_SPAWN_INTERVAL, GARBAGE_SPAWN_RATE_MODIFIER,
+)
+from checkpoint import CheckpointWriter
+from policy_mmap import PolicyPublisher
+
+# ------------------------------------------------
+# BATCHED SIMULATION SETTINGS
+# ------------------------------------------------
+DEFAULT_NUM_ENVS = 256
+INITIAL_GARBAGE_CAPACITY = 32  # Slots per env, doubled whenever an env runs out
+
+PLAYER_COLLECT_Y = PLAYER_START_Y + PLAYER_HEIGHT / 3
+
+
+class BatchedSimulator:
+    """Steps N independent CatchTheGarbage games in lockstep with NumPy arrays.
+
+    Every env follows the same tick as MachineLearningGemini.run_episode:
+    spawn -> observe state -> move player -> gravity/ground -> collection -> game over.
+    `step()` finishes the current tick and already performs the spawn of the next
+    one, so `get_states()` always returns what run_episode would observe.
+    Envs that pass GARBAGE_ON_GROUND_LIMIT reset themselves inside `step()`.
+    """
+
+    def __init__(self, n_envs=DEFAULT_NUM_ENVS, capacity=INITIAL_GARBAGE_CAPACITY, rng=None):
+        self.n_envs = n_envs
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.rows = np.arange(n_envs)
+
+        # When True, step() stores the observation of every finished env in
+        # `final_observations` before resetting it (used by the Gymnasium VectorEnv)
+        self.keep_final_observations = False
+        self.final_observations = None
+
+        # Per-env scalars
+        self.player_x = np.zeros(n_envs, dtype=np.int64)
+        self.spawn_timer = np.zeros(n_envs)
+        self.spawn_difficulty_rate = np.zeros(n_envs)
+        self.garbage_on_ground_count = np.zeros(n_envs, dtype=np.int64)
+        self.points = np.zeros(n_envs, dtype=np.int64)
+        self.game_time = np.zeros(n_envs)
+        self.next_seq = np.zeros(n_envs, dtype=np.int64)
+
+        # Per-garbage slots (n_envs, capacity)
+        self._allocate_garbage(capacity)
+
+        self.reset()
+
+    def _allocate_garbage(self, capacity):
+        self.capacity = capacity
+        self.garbage_x = np.zeros((self.n_envs, capacity), dtype=np.int64)
+        self.garbage_y = np.zeros((self.n_envs, capacity), dtype=np.int64)
+        self.garbage_fy = np.zeros((self.n_envs, capacity))  # Float position (Garbage._y)
+        self.garbage_vy = np.zeros((self.n_envs, capacity))
+        self.garbage_lock = np.zeros((self.n_envs, capacity), dtype=bool)
+        self.garbage_active = np.zeros((self.n_envs, capacity), dtype=bool)
+        self.garbage_seq = np.zeros((self.n_envs, capacity), dtype=np.int64)  # Spawn order
+
+    def _grow_garbage(self):
+        """Doubles the number of garbage slots, keeping every live object."""
+        old = (self.garbage_x, self.garbage_y, self.garbage_fy, self.garbage_vy,
+               self.garbage_lock, self.garbage_active, self.garbage_seq)
+        old_capacity = self.capacity
+        self._allocate_garbage(old_capacity * 2)
+        new = (self.garbage_x, self.garbage_y, self.garbage_fy, self.garbage_vy,
+               self.garbage_lock, self.garbage_active, self.garbage_seq)
+        for old_array, new_array in zip(old, new):
+            new_array[:, :old_capacity] = old_array
+
+    def reset(self, mask=None):
+        """Resets the envs selected by `mask` (all by default) and spawns their first garbage."""
+        if mask is None:
+            mask = np.ones(self.n_envs, dtype=bool)
+
+        self.player_x[mask] = PLAYER_START_X
+        self.spawn_timer[mask] = 0.0
+        self.spawn_difficulty_rate[mask] = 2.0
+        self.garbage_on_ground_count[mask] = 0
+        self.points[mask] = 0
+        self.game_time[mask] = 0.0
+        self.next_seq[mask] = 0
+        self.garbage_active[mask] = False
+        self.garbage_lock[mask] = False
+
+        self._spawn(mask, advance_timer=True)
+
+    def _spawn(self, mask, advance_timer=True):
+        """First part of a tick: advances spawn timers and spawns garbage where due."""
+        if advance_timer:
+            self.spawn_timer[mask] += FIXED_DT
+
+        wait_time = GARBAGE_SPAWN_INTERVAL / np.log2(self.spawn_difficulty_rate[mask])
+        empty = ~self.garbage_active[mask].any(axis=1)
+        due = np.zeros(self.n_envs, dtype=bool)
+        due[mask] = (self.spawn_timer[mask] >= wait_time) | empty
+
+        rows = np.flatnonzero(due)
+        if rows.size == 0:
+            return
+
+        if self.garbage_active[rows].all(axis=1).any():
+            self._grow_garbage()
+
+        slots = np.argmin(self.garbage_active[rows], axis=1)  # First free slot
+        self.garbage_x[rows, slots] = self.rng.integers(
+            GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, size=rows.size, endpoint=True)
+        self.garbage_y[rows, slots] = GARBAGE_START_Y
+        self.garbage_fy[rows, slots] = float(GARBAGE_START_Y)
+        self.garbage_vy[rows, slots] = 0.0
+        self.garbage_lock[rows, slots] = False
+        self.garbage_active[rows, slots] = True
+        self.garbage_seq[rows, slots] = self.next_seq[rows]
+        self.next_seq[rows] += 1
+
+        self.spawn_timer[rows] = 0.0
+        self.spawn_difficulty_rate[rows] += GARBAGE_SPAWN_RATE_MODIFIER
+
+    def get_states(self, rows=None, x_bins=STATE_RELATIVE_X_BINS, y_bins=STATE_Y_BINS):
+        """Vectorized get_state(): returns (relative_x_bin, garbage_y_bin) arrays.
+
+        `x_bins`/`y_bins` discretize into a different state space than the trainer's.
+        """
+        if rows is None:
+            rows = self.rows
+
+        falling = self.garbage_active[rows] & ~self.garbage_lock[rows]
+        player_center_x = self.player_x[rows] + PLAYER_WIDTH / 2
+        garbage_center_x = self.garbage_x[rows] + GARBAGE_WIDTH / 2
+
+        distance = np.where(falling, np.abs(player_center_x[:, None] - garbage_center_x), np.inf)
+        # Equally close garbage: the oldest one (lowest spawn sequence), like GarbagePool.closest_falling
+        tied = distance == distance.min(axis=1)[:, None]
+        closest = np.argmin(np.where(tied, self.garbage_seq[rows], np.iinfo(np.int64).max), axis=1)
+        local_rows = np.arange(len(rows))
+
+        relative_x = garbage_center_x[local_rows, closest] - player_center_x
+        relative_x_bin = np.clip(
+            ((relative_x + SCREEN_WIDTH / 2) / (SCREEN_WIDTH / x_bins)).astype(np.int64),
+            0, x_bins - 1
+        )
+
+        closest_center_y = self.garbage_y[rows][local_rows, closest] + GARBAGE_HEIGHT / 2
+        garbage_y_bin = np.clip(
+            (closest_center_y / SCREEN_HEIGHT * y_bins).astype(np.int64),
+            0, y_bins - 1
+        )
+
+        # No falling garbage -> state (0, 0), like the scalar version
+        any_falling = falling.any(axis=1)
+        relative_x_bin[~any_falling] = 0
+        garbage_y_bin[~any_falling] = 0
+
+        return relative_x_bin, garbage_y_bin
+
+    def get_observations(self, n_garbage=3):
+        """Raw float observations: [player x, (x, y, vy) of the newest falling garbage] per env.
+
+        Shape (n_envs, 1 + 3 * n_garbage); missing garbage is padded with zeros.
+        """
+        falling = self.garbage_active & ~self.garbage_lock
+        order_key = np.where(falling, self.garbage_seq, -1)
+        newest = np.argsort(-order_key, axis=1, kind='stable')[:, :n_garbage]
+        valid = np.take_along_axis(order_key, newest, axis=1) >= 0
+
+        observations = np.zeros((self.n_envs, 1 + 3 * n_garbage), dtype=np.float32)
+        observations[:, 0] = self.player_x
+        observations[:, 1::3] = np.where(valid, np.take_along_axis(self.garbage_x, newest, axis=1), 0)
+        observations[:, 2::3] = np.where(valid, np.take_along_axis(self.garbage_y, newest, axis=1), 0)
+        observations[:, 3::3] = np.where(valid, np.take_along_axis(self.garbage_vy, newest, axis=1), 0)
+        return observations
+
+    def step(self, actions):
+        """Finishes the current tick for every env with the given actions.
+
+        Returns (rewards, ground_hits, collections, done, points, game_time, event_states):
+        `points`/`game_time` are the final episode stats for envs where `done` is True,
+        and `event_states` is (ground_states, collect_states) for Q-learning updates:
+        the state of envs with a landing this tick (rows where `ground_hits > 0`) right
+        after all landings, and of envs with a collection (rows where `collections > 0`)
+        after all collections.
+        """
+        # --- Player Movement ---
+        move_left = (actions == 0) & (self.player_x - PLAYER_REPLACEMENT >= 0)
+        move_right = (actions == 2) & (self.player_x + PLAYER_REPLACEMENT <= SCREEN_WIDTH - PLAYER_WIDTH)
+        self.player_x -= PLAYER_REPLACEMENT * move_left
+        self.player_x += PLAYER_REPLACEMENT * move_right
+
+        # --- Gravity and Ground Collision ---
+        falling = self.garbage_active & ~self.garbage_lock
+        self.garbage_fy += np.where(falling, self.garbage_vy * FIXED_DT, 0.0)
+        self.garbage_y = np.where(falling, self.garbage_fy.astype(np.int64), self.garbage_y)
+        self.garbage_vy += np.where(falling, GRAVITY * FIXED_DT, 0.0)
+
+        grounded = falling & (self.garbage_y + GARBAGE_HEIGHT >= SCREEN_HEIGHT)
+        if grounded.any():
+            self.garbage_y[grounded] = SCREEN_HEIGHT - GARBAGE_HEIGHT
+            self.garbage_fy[grounded] = SCREEN_HEIGHT - GARBAGE_HEIGHT
+            self.garbage_vy[grounded] = 0.0
+            self.garbage_lock[grounded] = True
+            falling &= ~grounded
+        ground_hits = grounded.sum(axis=1)
+        self.garbage_on_ground_count += ground_hits
+
+        ground_rows = np.flatnonzero(ground_hits)
+        ground_states = self.get_states(ground_rows) if ground_rows.size else None
+
+        # --- Player Collection ---
+        dx = (self.garbage_x + GARBAGE_WIDTH / 2) - (self.player_x + PLAYER_WIDTH / 2)[:, None]
+        dy = (self.garbage_y + GARBAGE_HEIGHT / 2) - PLAYER_COLLECT_Y
+        collected = falling & (dx ** 2 + dy ** 2 < COLLECT_DISTANCE ** 2)
+        collections = collected.sum(axis=1)
+        if collections.any():
+            self.garbage_active[collected] = False
+            self.points += collections
+
+        rewards = ground_hits * PENALTY_GROUND + collections * REWARD_COLLECT
+
+        collect_rows = np.flatnonzero(collections)
+        collect_states = self.get_states(collect_rows) if collect_rows.size else None
+
+        # --- Game Over ---
+        done = self.garbage_on_ground_count > GARBAGE_ON_GROUND_LIMIT
+        self.game_time += FIXED_DT
+
+        final_points = self.points.copy()
+        final_game_time = self.game_time.copy()
+
+        if done.any():
+            if self.keep_final_observations:
+                self.final_observations = self.get_observations()
+            self.reset(done)
+        self._spawn(~done)
+
+        return (rewards, ground_hits, collections, done, final_points, final_game_time,
+                (ground_states, collect_states))
+
+
+# ------------------------------------------------
+# BATCHED Q-LEARNING
+# ------------------------------------------------
+
+def select_actions(simulator, states, epsilon):
+    """Vectorized epsilon-greedy over the shared Q_TABLE."""
+    x_bins, y_bins = states
+    greedy = np.argmax(trainer.Q_TABLE[x_bins, y_bins], axis=1)
+    explore = simulator.rng.random(simulator.n_envs) < epsilon
+    random_actions = simulator.rng.integers(0, ACTION_SPACE, size=simulator.n_envs)
+    return np.where(explore, random_actions, greedy)
+
+
+def update_q_table_batch(states, actions, rewards, next_states, terminal=False):
+    """Applies one Q-learning update per entry, scattered into the shared Q_TABLE.
+
+    Targets are computed from the table before the batch is applied. Updates
+    that land on the same (state, action) are averaged (bincount sum / count),
+    so an entry moves by at most one LEARNING_RATE step per batch however many
+    envs hit it; summing them overshoots once a few envs share a state.
+    """
+    q_flat = trainer.Q_TABLE.reshape(-1)
+    x_bins, y_bins = states
+    index = np.ravel_multi_index((x_bins, y_bins, actions), trainer.Q_TABLE.shape)
+
+    if terminal:
+        max_future_q = 0.0
+    else:
+        max_future_q = np.max(trainer.Q_TABLE[next_states[0], next_states[1]], axis=1)
+
+    target = rewards + DISCOUNT_FACTOR * max_future_q
+    error_sum = np.bincount(index, weights=target - q_flat[index], minlength=q_flat.size)
+    count = np.bincount(index, minlength=q_flat.size)
+    updated = count > 0
+    q_flat[updated] += LEARNING_RATE * error_sum[updated] / count[updated]
+
+
+def learn_step(simulator, states):
+    """Runs one lockstep tick for all envs and applies the resulting Q updates."""
+    actions = select_actions(simulator, states, trainer.GLOBAL_EPSILON)
+    rewards, ground_hits, collections, done, points, game_time, event_states = simulator.step(actions)
+
+    # 1. Ground and collection events, one update per event. Unlike run_episode, which
+    # reads the state at each event, every landing of a tick bootstraps from the state
+    # after all of its landings, and every collection from the state after all collections
+    for event_counts, event_reward, next_states in ((ground_hits, PENALTY_GROUND, event_states[0]),
+                                                    (collections, REWARD_COLLECT, event_states[1])):
+        event_rows = np.flatnonzero(event_counts)
+        if event_rows.size:
+            order = np.repeat(np.arange(event_rows.size), event_counts[event_rows])
+            rows = event_rows[order]
+            update_q_table_batch(
+                (states[0][rows], states[1][rows]), actions[rows], np.full(order.size, event_reward),
+                (next_states[0][order], next_states[1][order])
+            )
+
+    # 2. Game over: terminal update with the tick's whole reward
+    done_rows = np.flatnonzero(done)
+    if done_rows.size:
+        update_q_table_batch(
+            (states[0][done_rows], states[1][done_rows]), actions[done_rows],
+            rewards[done_rows] + PENALTY_GAME_OVER, None, terminal=True
+        )
+
+        # Epsilon decay occurs once per finished episode
+        trainer.GLOBAL_EPSILON = max(MIN_EPSILON, trainer.GLOBAL_EPSILON * EPSILON_DECAY ** done_rows.size)
+
+    return done_rows, points[done_rows], game_time[done_rows]
+
+
+def evaluate_policy_batched(policy, episodes, n_envs=DEFAULT_NUM_ENVS, seed=None):
+    """Mean points of the first `episodes` games a GreedyPolicy finishes, played N at a time.
+
+    Actions for all envs come from one policy.act_batch() call per tick.
+    """
+    simulator = BatchedSimulator(n_envs, rng=np.random.default_rng(seed))
+    finished_points = []
+
+    while len(finished_points) < episodes:
+        _, _, _, done, points, _, _ = simulator.step(policy.act_batch(simulator.get_states()))
+        if done.any():
+            finished_points.extend(points[done].tolist())
+
+    return sum(finished_points[:episodes]) / episodes
+
+
+def fast_batched_training_run(max_runtime_seconds=3600, n_envs=DEFAULT_NUM_ENVS, seed=None,
+                              checkpoint_every_episodes=trainer.CHECKPOINT_EVERY_EPISODES,
+                              checkpoint_every_seconds=trainer.CHECKPOINT_EVERY_SECONDS, publish_policy=True):
+    """Batched counterpart of fast_training_run: N games per step on one core.
+
+    The simulator is seeded from (run seed, episodes trained), so a resumed
+    session continues with new games instead of replaying the last session's.
+    """
+    start_time = time.time()
+    episode_count = 0
+    total_points = 0
+    env_steps = 0
+    last_report = 0
+
+    if trainer.DECISION_INTERVAL != 1:
+        # Every env decides every tick; checkpoints record DECISION_INTERVAL, so refuse rather than mislabel them
+        raise ValueError(f"fast_batched_training_run decides every tick (DECISION_INTERVAL is "
+                         f"{trainer.DECISION_INTERVAL}); use fast_training_run for action repeat")
+
+    trainer.load_checkpoint()
+    if seed is not None:
+        trainer.RUN_SEED = seed
+    first_episode = trainer.EPISODES_TRAINED
+
+    simulator = BatchedSimulator(n_envs, rng=np.random.default_rng([trainer.RUN_SEED, first_episode]))
+    states = simulator.get_states()
+
+    checkpoint_writer = CheckpointWriter(trainer.write_checkpoint_files)
+    last_checkpoint_episode = 0
+    last_checkpoint_time = start_time
+
+    policy_publisher = PolicyPublisher(trainer.POLICY_FILE, trainer.Q_TABLE.shape) if publish_policy else None
+    last_publish_time = start_time
+
+    print("--- Starting Batched Headless Q-Learning Simulation ---")
+    print(f"Goal Runtime: {max_runtime_seconds // 60} minutes | Envs: {n_envs}")
+    print(f"Current Epsilon: {trainer.GLOBAL_EPSILON:.6f}")
+    print(f"Run Seed: {trainer.RUN_SEED}")
+    print("-" * 40)
+
+    try:
+        while time.time() - start_time < max_runtime_seconds:
+            done_rows, points, _ = learn_step(simulator, states)
+            states = simulator.get_states()
+            env_steps += n_envs
+
+            if done_rows.size:
+                episode_count += done_rows.size
+                total_points += int(points.sum())
+
+            # Periodic checkpoint: only the snapshot copy happens on this thread
+            if (episode_count - last_checkpoint_episode >= checkpoint_every_episodes
+                    or time.time() - last_checkpoint_time >= checkpoint_every_seconds):
+                checkpoint_writer.submit(trainer.checkpoint_snapshot(trainer.GLOBAL_EPSILON,
+                                                                     first_episode + episode_count))
+                last_checkpoint_episode = episode_count
+                last_checkpoint_time = time.time()
+
+            if policy_publisher is not None and time.time() - last_publish_time >= POLICY_PUBLISH_SECONDS:
+                policy_publisher.publish(trainer.Q_TABLE)
+                last_publish_time = time.time()
+
+            # Log progress every 100 episodes
+            if episode_count // 100 > last_report:
+                last_report = episode_count // 100
+                elapsed_time = time.time() - start_time
+                avg_points = total_points / episode_count
+
+                print(
+                    f"[{int(elapsed_time)}s] Episodes: {episode_count:,} | Avg Score: {avg_points:.2f} | "
+                    f"Epsilon: {trainer.GLOBAL_EPSILON:.6f} | Steps/s: {env_steps / elapsed_time:,.0f}")
+
+    except KeyboardInterrupt:
+        print("\nTraining interrupted by user.")
+
+    finally:
+        checkpoint_writer.close()
+        if policy_publisher is not None:
+            policy_publisher.publish(trainer.Q_TABLE)
+            policy_publisher.close()
+
+    print("-" * 40)
+    print(f"Simulation Finished. Total time added: {int(time.time() - start_time)} seconds.")
+    print(f"Total Episodes Run in this session: {episode_count:,}")
+
+    if episode_count > 0:
+        print(f"Session Average Score: {total_points / episode_count:.2f}")
+
+    trainer.EPISODES_TRAINED = first_episode + episode_count
+    trainer.save_checkpoint(trainer.GLOBAL_EPSILON)
+    trainer.visualize_q_table()
+
+
+if __name__ == "__main__":
+    fast_batched_training_run(max_runtime_seconds=1200)
@@ -0,0 +1,325 @@
+"""Performance benchmarks for the trainer and the pygame front-ends.
+
+Usage:
+    python benchmark.py                      # run and compare against stored baselines
+    python benchmark.py --update-baselines   # run and store the results as new baselines
+    python benchmark.py --quick              # fewer repetitions, for a fast sanity check
+
+Every result is stored as seconds per operation (lower is better), the median
+of several timed rounds and passes. Full and --quick runs keep separate baselines. A
+benchmark regresses when it is slower than its baseline by more than
+--threshold (default 100%; at least 150% for calls under 10 us) and stays
+slower when timed again; the script then exits with status 1.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Headless pygame with no frame cap; must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+import MachineLearningGemini as trainer
+from game_engine import (
+    SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_START_X, PLAYER_START_Y,
+    GARBAGE_START_Y, GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, FIXED_DT, Player,
+)
+from event_driven_simulator import run_episode_event_driven
+
+BASELINE_FILE = 'benchmark_baselines.json'
+# Medians of separate runs of unchanged code differ by up to ~1.9x (more under
+# 10 us) on a shared single-core machine, so tighter limits fail on noise
+DEFAULT_THRESHOLD = 1.0
+FAST_OP_SECONDS = 10e-6  # Calls faster than this are allowed at least FAST_OP_THRESHOLD
+FAST_OP_THRESHOLD = 1.5
+BENCHMARK_SEED = 1234
+
+# Timed rounds per benchmark; the median round is compared, as single rounds of
+# microsecond calls vary by tens of percent on a busy machine
+ROUNDS = 7
+FULL_SIZES = (10, 20000, 300)  # (episodes, calls, frames) per round
+QUICK_SIZES = (3, 2000, 100)
+PASSES = 3          # Results are the median of this many passes, for baselines and comparisons alike
+CONFIRM_PASSES = 1  # Further measurements to confirm regressions before failing
+
+# Exploration rates the episode runners are timed at: fully random (most of
+# training, as EPSILON_DECAY is slow), halfway, and the trained floor
+EPISODE_EPSILONS = (1.0, 0.5, trainer.MIN_EPSILON)
+
+# Number of live garbage objects for the scaling benchmarks (late game has the most)
+GARBAGE_COUNTS = (1, 5, 20, 50)
+
+# Falling garbage starts above this y, so none of it lands during a 300-frame round
+FALLING_MAX_Y = 200
+
+
+def time_per_call(function, repeat, setup=None, rounds=ROUNDS):
+    """Median over `rounds` rounds of the average wall time per call, in seconds.
+
+    `setup` runs before each round.
+    """
+    round_seconds = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        round_seconds.append((time.perf_counter() - start) / repeat)
+    return statistics.median(round_seconds)
+
+
+# ------------------------------------------------
+# TRAINER BENCHMARKS
+# ------------------------------------------------
+
+def bench_episodes(results, episodes):
+    """Median steps/sec and episodes/sec of the fixed-step and event-driven runners at each of EPISODE_EPSILONS."""
+    q_table = np.load(trainer.Q_TABLE_FILE) if os.path.exists(trainer.Q_TABLE_FILE) else np.zeros(trainer.Q_TABLE_SHAPE)
+    trainer.RUN_SEED = BENCHMARK_SEED
+
+    for epsilon in EPISODE_EPSILONS:
+        for name, runner in (('run_episode', trainer.run_episode),
+                             ('run_episode_event_driven', run_episode_event_driven)):
+            trainer.Q_TABLE = q_table.copy()
+
+            step_seconds, episode_seconds = [], []
+            for episode_index in range(episodes):
+                trainer.GLOBAL_EPSILON = epsilon  # Held for every episode, not decayed
+                start = time.perf_counter()
+                _, game_time = runner(episode_index)
+                elapsed = time.perf_counter() - start
+                step_seconds.append(elapsed / round(game_time / FIXED_DT))
+                episode_seconds.append(elapsed)
+
+            # Medians over the (fixed, seeded) episodes, so one slow episode does not move the result
+            step = results[f'trainer/{name}/epsilon_{epsilon:g}/step'] = statistics.median(step_seconds)
+            episode = results[f'trainer/{name}/epsilon_{epsilon:g}/episode'] = statistics.median(episode_seconds)
+            print(f"{name + ' (eps ' + format(epsilon, 'g') + ')':<36} {1 / step:>12,.0f} steps/s "
+                  f"{1 / episode:>8,.2f} episodes/s")
+
+
+def _fill_pool(pool, count, rng):
+    pool.reset()
+    for x in rng.integers(GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, count, endpoint=True):
+        slot = pool.spawn(int(x), GARBAGE_START_Y)
+        pool.y[slot] = int(rng.integers(0, 400))
+
+
+def bench_trainer_functions(results, repeat):
+    """get_state (scaled by live garbage), select_action and update_q_table."""
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    player = Player(PLAYER_START_X, PLAYER_START_Y, PLAYER_WIDTH, PLAYER_HEIGHT)
+    pool = trainer.GARBAGE_POOL
+    trainer.Q_TABLE = np.zeros(trainer.Q_TABLE_SHAPE)
+    trainer.GLOBAL_EPSILON = 0.1
+
+    for count in GARBAGE_COUNTS:
+        _fill_pool(pool, count, rng)
+
+        # Alternate two player positions so every call misses the nearest-garbage cache
+        def get_state_call():
+            player.x = 200
+            trainer.get_state(player, pool)
+            player.x = 215
+            trainer.get_state(player, pool)
+
+        seconds = time_per_call(get_state_call, repeat) / 2
+        results[f'trainer/get_state/{count}_garbage'] = seconds
+        print(f"{'get_state (' + str(count) + ' garbage)':<28} {seconds * 1e6:>10.2f} us")
+
+    episode_random = trainer.EpisodeRandom(BENCHMARK_SEED, 0)
+    seconds = time_per_call(lambda: trainer.select_action((4, 1), episode_random), repeat)
+    results['trainer/select_action'] = seconds
+    print(f"{'select_action':<28} {seconds * 1e6:>10.2f} us")
+
+    seconds = time_per_call(lambda: trainer.update_q_table((4, 1), 1, trainer.REWARD_COLLECT, (5, 2)), repeat)
+    results['trainer/update_q_table'] = seconds
+    print(f"{'update_q_table':<28} {seconds * 1e6:>10.2f} us")
+
+
+# ------------------------------------------------
+# PYGAME FRONT-END BENCHMARKS
+# ------------------------------------------------
+
+def _fill_engine(engine, renderer, count, seed):
+    """Restarts `engine` with `count` live garbage, about half of it on the ground, and redraws it all.
+
+    Falling garbage starts above FALLING_MAX_Y and one step below its previous
+    position, so interpolated frames (alpha 0 vs 1) move every falling sprite.
+    """
+    rng = np.random.default_rng(seed)
+    engine.reset(lambda: int(rng.integers(GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, endpoint=True)))
+    pool = engine.garbage_pool
+    pool.reset()
+    for _ in range(count):
+        slot = pool.spawn(int(rng.integers(GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, endpoint=True)),
+                          int(rng.integers(0, FALLING_MAX_Y)))
+        if rng.random() < 0.5:
+            pool.ground(slot, SCREEN_HEIGHT)
+        else:
+            pool.prev_y[slot] = pool.y[slot] - 5
+    renderer.attach(engine)
+    renderer.flip(renderer.draw())
+
+
+def _bench_engine_front_end(results, frames, name, engine, renderer, status_text):
+    """renderer.draw() + flip and engine.step() of one front-end, scaled by live garbage."""
+    for count in GARBAGE_COUNTS:
+        _fill_engine(engine, renderer, count, BENCHMARK_SEED)
+        alphas = [0.0]
+
+        def frame():
+            alphas[0] = 1.0 - alphas[0]  # Alternate ends of the step, so every falling sprite moves
+            renderer.flip(renderer.draw(status_text(), alphas[0]))
+
+        seconds = time_per_call(frame, frames)
+        results[f'{name}/draw/{count}_garbage'] = seconds
+        print(f"{name + ' draw (' + str(count) + ' garbage)':<28} {seconds * 1e3:>10.3f} ms")
+
+        # Each round restarts from the same garbage, so every round times the same landings and spawns
+        seconds = time_per_call(lambda: engine.step(1), frames,
+                                lambda: _fill_engine(engine, renderer, count, BENCHMARK_SEED))
+        results[f'{name}/step/{count}_garbage'] = seconds
+        print(f"{name + ' step (' + str(count) + ')':<28} {seconds * 1e6:>10.2f} us")
+
+
+def bench_main(results, frames):
+    """The GameEngine and EngineRenderer of main.py (human game pace)."""
+    import main
+
+    _bench_engine_front_end(results, frames, 'main', main.engine, main.renderer,
+                            lambda: f"Points: {main.engine.points}")
+
+
+def bench_visual_player(results, frames):
+    """The GameEngine and EngineRenderer of visual_player.py (trainer pace)."""
+    import visual_player
+
+    _bench_engine_front_end(results, frames, 'visual_player', visual_player.engine, visual_player.renderer,
+                            visual_player.status_text)
+
+
+# ------------------------------------------------
+# BASELINES
+# ------------------------------------------------
+
+def load_baselines():
+    """The stored baselines file: {'threshold': ..., 'modes': {mode: {name: seconds}}}, or None."""
+    if not os.path.exists(BASELINE_FILE):
+        return None
+    with open(BASELINE_FILE, 'r') as f:
+        return json.load(f)
+
+
+def compare_to_baselines(results, mode, threshold):
+    """Prints the change against the stored baselines of `mode`; returns the names that regressed.
+
+    Calls faster than FAST_OP_SECONDS are judged with at least FAST_OP_THRESHOLD,
+    as timer and scheduling noise is a large share of them.
+    """
+    stored = load_baselines()
+    baselines = stored.get('modes', {}).get(mode) if stored is not None else None
+    if not baselines:
+        print(f"\nNo {mode} baselines found in {BASELINE_FILE}. Run with --update-baselines"
+              f"{' --quick' if mode == 'quick' else ''} to create them.")
+        return []
+    if threshold is None:
+        threshold = stored.get('threshold', DEFAULT_THRESHOLD)
+
+    regressions = []
+    print(f"\n--- Comparison with {mode} baselines (seconds per op, lower is better) ---")
+    for name, seconds in results.items():
+        if name not in baselines:
+            print(f"{name:<48} {'(new)':>10}")
+            continue
+        change = seconds / baselines[name] - 1
+        allowed = threshold if baselines[name] >= FAST_OP_SECONDS else max(threshold, FAST_OP_THRESHOLD)
+        flag = ""
+        if change > allowed:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<48} {change:>+10.1%}{flag}")
+    return regressions
+
+
+def run_suite(episodes, repeat, frames, skip_pygame=False):
+    """One pass of every benchmark; returns {name: seconds per op}."""
+    results = {}
+
+    print("--- Trainer ---")
+    bench_episodes(results, episodes)
+    bench_trainer_functions(results, repeat)
+
+    if not skip_pygame:
+        print("\n--- Pygame front-ends (SDL dummy driver, no frame cap) ---")
+        bench_main(results, frames)
+        bench_visual_player(results, frames)
+    return results
+
+
+def measure(episodes, repeat, frames, skip_pygame=False):
+    """Median of PASSES runs of the suite in this process.
+
+    A short warm-up pass runs first: the first pass of a process runs up to
+    ~1.7x slower than the ones after it. Baselines and comparisons are
+    measured the same way.
+    """
+    print("--- Warm-up pass (not measured) ---")
+    run_suite(*QUICK_SIZES, skip_pygame)
+    passes = [run_suite(episodes, repeat, frames, skip_pygame) for _ in range(PASSES)]
+    return {name: statistics.median(run[name] for run in passes) for name in passes[0]}
+
+
+def run_benchmarks(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--update-baselines', action='store_true', help='store these results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='allowed slowdown, e.g. 0.5 = 50%% (default: stored with the baselines)')
+    parser.add_argument('--quick', action='store_true', help='fewer repetitions (compared with quick baselines)')
+    parser.add_argument('--skip-pygame', action='store_true', help='only run the trainer benchmarks')
+    args = parser.parse_args(argv)
+
+    # The front-ends load Images/ and the Q-table, and the baselines live, relative to the repo
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    mode = 'quick' if args.quick else 'full'
+    sizes = QUICK_SIZES if args.quick else FULL_SIZES
+
+    results = measure(*sizes, args.skip_pygame)
+
+    if args.update_baselines:
+        stored = load_baselines() or {'threshold': DEFAULT_THRESHOLD, 'modes': {}}
+        if args.threshold is not None:
+            stored['threshold'] = args.threshold
+        stored.setdefault('modes', {})[mode] = results
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(stored, f, indent=2)
+        print(f"\nSaved {len(results)} {mode} baselines to {BASELINE_FILE}.")
+        return 0
+
+    regressions = compare_to_baselines(results, mode, args.threshold)
+    for _ in range(CONFIRM_PASSES):
+        if not regressions:
+            break
+        # A regression only counts if it is still there when timed again
+        print(f"\nRe-timing to confirm {len(regressions)} regression(s)...")
+        retimed = measure(*sizes, args.skip_pygame)
+        for name in regressions:
+            results[name] = min(results[name], retimed[name])
+        regressions = compare_to_baselines(results, mode, args.threshold)
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond the threshold.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmarks())
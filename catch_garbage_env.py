@@ -0,0 +1,114 @@
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from MachineLearningGemini import ACTION_SPACE, REWARD_COLLECT, PENALTY_GROUND, PENALTY_GAME_OVER
+from batched_simulator import BatchedSimulator, DEFAULT_NUM_ENVS
+from game_engine import GameEngine, spawn_x_source
+
+# ------------------------------------------------
+# OBSERVATION LAYOUT (unverified against dqn_catchgarbage_fast.zip)
+# ------------------------------------------------
+# [player x, then (x, y, vy) of the 3 newest falling garbage, newest first]
+# Missing garbage is padded with zeros.
+#
+# The env that trained dqn_catchgarbage_fast.zip is not in the tree. The
+# order above fits the last observations saved in the zip, but its game was
+# not this one: garbage gained 5 vy per step and episodes lasted ~230 steps,
+# against 0.2 and thousands of ticks here. The shipped policy does not beat
+# random actions in this env (see `python dqn_numpy.py --eval-episodes N`).
+OBSERVATION_GARBAGE_COUNT = 3
+OBSERVATION_SIZE = 1 + 3 * OBSERVATION_GARBAGE_COUNT
+OBSERVATION_BOUND = 10000.0
+
+OBSERVATION_SPACE = spaces.Box(-OBSERVATION_BOUND, OBSERVATION_BOUND, (OBSERVATION_SIZE,), dtype=np.float32)
+ACTION_SPACE_GYM = spaces.Discrete(ACTION_SPACE)  # 0: Left, 1: No Move, 2: Right
+
+
+class CatchGarbageEnv(gym.Env):
+    """Headless CatchTheGarbage as a Gymnasium environment.
+
+    One step is one GameEngine tick, the same game the tabular trainer plays.
+    The reward is the sum of the tick's ground penalties, collections and the
+    game-over penalty.
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(self):
+        self.observation_space = OBSERVATION_SPACE
+        self.action_space = ACTION_SPACE_GYM
+        self.engine = GameEngine()
+
+    def _get_obs(self):
+        return np.array(self.engine.observation(OBSERVATION_GARBAGE_COUNT), dtype=np.float32)
+
+    def _get_info(self):
+        return {"points": self.engine.points, "game_time": self.engine.game_time}
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        self.engine.reset(spawn_x_source(self.np_random))
+        return self._get_obs(), self._get_info()
+
+    def step(self, action):
+        engine = self.engine
+        points = engine.points
+        ground_count = engine.garbage_on_ground_count
+
+        terminated = engine.step(action)
+
+        reward = ((engine.garbage_on_ground_count - ground_count) * PENALTY_GROUND
+                  + (engine.points - points) * REWARD_COLLECT)
+        if terminated:
+            reward += PENALTY_GAME_OVER
+
+        return self._get_obs(), float(reward), terminated, False, self._get_info()
+
+
+class CatchGarbageVectorEnv(VectorEnv):
+    """Native vectorized CatchTheGarbage: all sub-envs advance in one BatchedSimulator step.
+
+    Finished sub-envs reset in the same step (AutoresetMode.SAME_STEP); their last
+    observation is in infos["final_obs"], masked by infos["_final_obs"].
+    """
+
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs=DEFAULT_NUM_ENVS):
+        self.num_envs = num_envs
+        self.single_observation_space = OBSERVATION_SPACE
+        self.single_action_space = ACTION_SPACE_GYM
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self.simulator = BatchedSimulator(num_envs)
+        self.simulator.keep_final_observations = True
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        if seed is not None:
+            self.simulator.rng = np.random.default_rng(seed)
+        self.simulator.reset()
+        return self.simulator.get_observations(OBSERVATION_GARBAGE_COUNT), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        rewards, _, _, done, points, game_time, _ = self.simulator.step(actions)
+
+        rewards = (rewards + done * PENALTY_GAME_OVER).astype(np.float64)
+        infos = {}
+        if done.any():
+            infos = {
+                "final_obs": self.simulator.final_observations,
+                "_final_obs": done,
+                "points": points,
+                "game_time": game_time,
+                "_points": done,
+                "_game_time": done,
+            }
+
+        observations = self.simulator.get_observations(OBSERVATION_GARBAGE_COUNT)
+        return observations, rewards, done, np.zeros(self.num_envs, dtype=bool), infos
@@ -0,0 +1,102 @@
+# ------------------------------------------------
+# VERSIONED, ATOMIC CHECKPOINTS
+# ------------------------------------------------
+# A checkpoint is one .npz file holding the Q-table and a JSON metadata record
+# (epsilon, episodes trained, run seed, hyperparameters). Files are written to
+# a temporary file in the same directory and moved into place with os.replace,
+# so a crash mid-write never leaves a torn or half-updated checkpoint.
+
+import json
+import os
+import stat
+import tempfile
+import threading
+
+import numpy as np
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+def write_atomic(path, write):
+    """Calls write(file) on a temporary file next to `path`, then renames it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        # mkstemp creates the file private; keep the permissions of the file being replaced
+        os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_checkpoint(path, snapshot):
+    """Writes `snapshot` (a dict with a 'q_table' array and JSON-serializable values) to `path`."""
+    metadata = {key: value for key, value in snapshot.items() if key != 'q_table'}
+    metadata['format_version'] = CHECKPOINT_FORMAT_VERSION
+
+    write_atomic(path, lambda f: np.savez(f, q_table=snapshot['q_table'], metadata=np.array(json.dumps(metadata))))
+
+
+def read_checkpoint(path):
+    """Returns the snapshot dict stored by write_checkpoint."""
+    with np.load(path, allow_pickle=False) as data:
+        metadata = json.loads(str(data['metadata']))
+        q_table = data['q_table']
+
+    version = metadata.get('format_version')
+    if version != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format version {version} (expected {CHECKPOINT_FORMAT_VERSION})")
+
+    metadata['q_table'] = q_table
+    return metadata
+
+
+class CheckpointWriter:
+    """Writes checkpoints on a background thread, so training never waits for the disk.
+
+    submit() only hands over a snapshot the caller has already copied. If the
+    writer is still busy with an older one, the newer snapshot replaces any
+    pending one: only the latest state is worth writing. close() writes what is
+    still pending and stops the thread.
+    """
+
+    def __init__(self, write):
+        self._write = write
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self.written = 0
+
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot):
+        with self._condition:
+            self._pending = snapshot
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+
+            try:
+                self._write(snapshot)
+                self.written += 1
+            except Exception as e:
+                print(f"Error writing checkpoint: {e}")
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
@@ -0,0 +1,220 @@
+import argparse
+import io
+import pickle
+import time
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+# ------------------------------------------------
+# TORCH-FREE DQN INFERENCE
+# ------------------------------------------------
+# dqn_catchgarbage_fast.zip is a Stable-Baselines3 DQN: its policy.pth holds a
+# torch state dict whose q_net is an MLP of Linear layers with ReLU in between
+# (the SB3 default net_arch [64, 64]). The exporter reads that state dict with a
+# restricted unpickler that rebuilds tensors as NumPy arrays, so neither the
+# export nor the forward pass needs torch or stable-baselines3.
+
+DQN_MODEL_FILE = 'dqn_catchgarbage_fast.zip'
+DQN_WEIGHTS_FILE = 'dqn_catchgarbage_fast.npz'
+Q_NET_PREFIX = 'q_net.q_net.'  # Online network; q_net_target.* is only used while training
+
+_STORAGE_DTYPES = {
+    'FloatStorage': np.float32, 'DoubleStorage': np.float64, 'HalfStorage': np.float16,
+    'LongStorage': np.int64, 'IntStorage': np.int32, 'ShortStorage': np.int16,
+    'CharStorage': np.int8, 'ByteStorage': np.uint8, 'BoolStorage': np.bool_,
+}
+
+
+def _rebuild_tensor(storage, storage_offset, size, stride, *_):
+    """torch._utils._rebuild_tensor_v2, producing a NumPy array (strides are in elements)."""
+    itemsize = storage.dtype.itemsize
+    return np.lib.stride_tricks.as_strided(storage[storage_offset:], tuple(size),
+                                           tuple(s * itemsize for s in stride)).copy()
+
+
+class _StateDictUnpickler(pickle.Unpickler):
+    """Unpickles a torch.save()d state dict into NumPy arrays; refuses every other global."""
+
+    def __init__(self, file, archive, prefix):
+        super().__init__(file)
+        self.archive = archive
+        self.prefix = prefix
+
+    def find_class(self, module, name):
+        if (module, name) == ('collections', 'OrderedDict'):
+            return OrderedDict
+        if (module, name) == ('torch._utils', '_rebuild_tensor_v2'):
+            return _rebuild_tensor
+        if module == 'torch' and name in _STORAGE_DTYPES:
+            return _STORAGE_DTYPES[name]
+        raise pickle.UnpicklingError(f"Unexpected global in state dict: {module}.{name}")
+
+    def persistent_load(self, pid):
+        # ('storage', storage type, key, location, element count)
+        _, dtype, key, _, numel = pid
+        data = self.archive.read(f'{self.prefix}data/{key}')
+        return np.frombuffer(data, dtype=np.dtype(dtype).newbyteorder('<'), count=numel)
+
+
+def read_state_dict(pth_bytes):
+    """Returns the state dict in a torch.save() zip file (given as bytes) as NumPy arrays."""
+    with zipfile.ZipFile(io.BytesIO(pth_bytes)) as archive:
+        pickle_name = next(name for name in archive.namelist() if name.endswith('data.pkl'))
+        prefix = pickle_name[:-len('data.pkl')]
+        if prefix + 'byteorder' in archive.namelist() and archive.read(prefix + 'byteorder') != b'little':
+            raise ValueError("Only little-endian torch files are supported")
+        return _StateDictUnpickler(io.BytesIO(archive.read(pickle_name)), archive, prefix).load()
+
+
+def read_q_net_weights(model_path=DQN_MODEL_FILE):
+    """The q_net Linear layers of an SB3 DQN zip as [(weight, bias), ...], input layer first."""
+    with zipfile.ZipFile(model_path) as model:
+        state_dict = read_state_dict(model.read('policy.pth'))
+
+    layer_ids = sorted({int(name[len(Q_NET_PREFIX):].split('.')[0]) for name in state_dict
+                        if name.startswith(Q_NET_PREFIX)})
+    if not layer_ids:
+        raise ValueError(f"No {Q_NET_PREFIX}* weights in {model_path}")
+    return [(state_dict[f'{Q_NET_PREFIX}{i}.weight'], state_dict[f'{Q_NET_PREFIX}{i}.bias']) for i in layer_ids]
+
+
+def export_weights(model_path=DQN_MODEL_FILE, weights_path=DQN_WEIGHTS_FILE):
+    """Writes the q_net weights of `model_path` to `weights_path` (weight_0, bias_0, weight_1, ...)."""
+    layers = read_q_net_weights(model_path)
+    arrays = {}
+    for i, (weight, bias) in enumerate(layers):
+        arrays[f'weight_{i}'] = weight
+        arrays[f'bias_{i}'] = bias
+    np.savez(weights_path, **arrays)
+    return layers
+
+
+class NumpyQNetwork:
+    """Forward pass of the DQN q_net: Linear layers with ReLU between them, in float32.
+
+    Weights keep torch's (out, in) layout, so each layer is x @ weight.T + bias.
+    """
+
+    def __init__(self, layers):
+        self.weights = [np.ascontiguousarray(weight.T, dtype=np.float32) for weight, _ in layers]
+        self.biases = [np.asarray(bias, dtype=np.float32) for _, bias in layers]
+
+    @classmethod
+    def load(cls, path=DQN_WEIGHTS_FILE):
+        """From an exported .npz, or straight from an SB3 .zip (still without torch)."""
+        if path.endswith('.zip'):
+            return cls(read_q_net_weights(path))
+        with np.load(path) as data:
+            n_layers = sum(1 for name in data.files if name.startswith('weight_'))
+            return cls([(data[f'weight_{i}'], data[f'bias_{i}']) for i in range(n_layers)])
+
+    def q_values(self, observations):
+        """Q-values of a batch of observations, shape (n, actions)."""
+        x = np.asarray(observations, dtype=np.float32)
+        last = len(self.weights) - 1
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = x @ weight + bias
+            if i < last:
+                np.maximum(x, 0.0, out=x)
+        return x
+
+    def act(self, observation):
+        """Greedy action for one observation."""
+        return int(np.argmax(self.q_values(np.asarray(observation, dtype=np.float32)[None])[0]))
+
+    def act_batch(self, observations):
+        """Greedy actions for a batch of observations."""
+        return np.argmax(self.q_values(observations), axis=1)
+
+
+def evaluate_batched(network, episodes, n_envs=256, seed=None, n_garbage=3):
+    """Mean points of the first `episodes` games the network finishes, played n_envs at a time.
+
+    With `network` None every action is random, the baseline a policy has to beat.
+    """
+    from batched_simulator import BatchedSimulator
+
+    rng = np.random.default_rng(seed)
+    simulator = BatchedSimulator(n_envs, rng=rng)
+    finished_points = []
+    while len(finished_points) < episodes:
+        if network is None:
+            actions = rng.integers(0, 3, n_envs)
+        else:
+            actions = network.act_batch(simulator.get_observations(n_garbage))
+        _, _, _, done, points, _, _ = simulator.step(actions)
+        if done.any():
+            finished_points.extend(points[done].tolist())
+    return sum(finished_points[:episodes]) / episodes
+
+
+def test_observations(count=20_000, seed=0, stride=128):
+    """Observations the policy meets in play (random-action games) plus uniformly random ones.
+
+    Played observations are taken every `stride` ticks, so they cover whole
+    episodes (about 10,000 ticks at random) rather than only their first ticks.
+    """
+    from batched_simulator import BatchedSimulator
+    from game_engine import SCREEN_WIDTH, SCREEN_HEIGHT
+
+    rng = np.random.default_rng(seed)
+    simulator = BatchedSimulator(64, rng=rng)
+    played = []
+    tick = 0
+    while len(played) * 64 < count // 2:
+        if tick % stride == 0:
+            played.append(simulator.get_observations())
+        simulator.step(rng.integers(0, 3, 64))
+        tick += 1
+
+    uniform = rng.uniform(0, 1, (count - len(played) * 64, 10)).astype(np.float32)
+    uniform[:, 0] *= SCREEN_WIDTH      # Player x
+    uniform[:, 1::3] *= SCREEN_WIDTH   # Garbage x
+    uniform[:, 2::3] *= SCREEN_HEIGHT  # Garbage y
+    uniform[:, 3::3] *= 160.0          # Garbage vy (about 150 on landing)
+    return np.concatenate(played + [uniform])
+
+
+def check_against_torch(model_path=DQN_MODEL_FILE, network=None, count=20_000):
+    """Compares greedy actions with the SB3 policy (needs torch and stable-baselines3); True if all match."""
+    from stable_baselines3 import DQN
+
+    network = network if network is not None else NumpyQNetwork(read_q_net_weights(model_path))
+    observations = test_observations(count)
+
+    model = DQN.load(model_path, device='cpu')
+    torch_actions, _ = model.predict(observations, deterministic=True)
+    numpy_actions = network.act_batch(observations)
+
+    mismatches = int(np.count_nonzero(torch_actions != numpy_actions))
+    print(f"Argmax agreement with torch: {len(observations) - mismatches:,}/{len(observations):,} observations")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export and run the DQN policy with NumPy only.")
+    parser.add_argument('--model', default=DQN_MODEL_FILE, help="SB3 DQN zip to export")
+    parser.add_argument('--output', default=DQN_WEIGHTS_FILE, help="exported .npz")
+    parser.add_argument('--check', action='store_true', help="compare argmax with torch (needs stable-baselines3)")
+    parser.add_argument('--eval-episodes', type=int, default=0, help="batched greedy evaluation games")
+    args = parser.parse_args()
+
+    layers = export_weights(args.model, args.output)
+    print(f"Exported {len(layers)} layers {[weight.shape for weight, _ in layers]} to {args.output}.")
+    q_network = NumpyQNetwork.load(args.output)
+
+    if args.eval_episodes:
+        start_time = time.perf_counter()
+        score = evaluate_batched(q_network, args.eval_episodes, seed=0)
+        print(f"Greedy Eval Score ({args.eval_episodes} games): {score:.2f} | "
+              f"{time.perf_counter() - start_time:.1f}s")
+        random_score = evaluate_batched(None, args.eval_episodes, seed=0)
+        print(f"Random Action Score ({args.eval_episodes} games): {random_score:.2f}")
+        if score <= random_score:
+            print("The policy does not beat random actions in this game (see the observation notes in "
+                  "catch_garbage_env.py).")
+
+    if args.check and not check_against_torch(args.model, q_network):
+        raise SystemExit(1)
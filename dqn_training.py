@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import torch
+from stable_baselines3 import DQN
+from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback
+from stable_baselines3.common.env_util import make_vec_env
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv, VecMonitor
+
+from catch_garbage_env import CatchGarbageEnv, CatchGarbageVectorEnv
+
+# ------------------------------------------------
+# DQN TRAINING SETTINGS
+# ------------------------------------------------
+# Defaults are the settings dqn_catchgarbage_fast.zip was trained with; a JSON
+# config file (dqn_config.json) overrides any of them. `vec_env` picks how the
+# n_envs games run: 'native' steps them all in one BatchedSimulator call,
+# 'subproc' runs one CatchGarbageEnv per worker process, 'dummy' runs them one
+# after another in this process. `gradient_steps` null keeps the original ratio
+# of one gradient step per train_freq transitions at any n_envs.
+CONFIG_FILE = 'dqn_config.json'
+
+DEFAULT_CONFIG = {
+    'total_timesteps': 50_000,
+    'n_envs': 1,
+    'vec_env': 'native',
+    'seed': 0,
+    'torch_threads': 1,
+
+    'learning_rate': 0.0005,
+    'buffer_size': 20_000,
+    'learning_starts': 100,
+    'batch_size': 128,
+    'gamma': 0.98,
+    'train_freq': 8,
+    'gradient_steps': None,
+    'target_update_interval': 500,
+    'exploration_fraction': 0.15,
+    'exploration_initial_eps': 1.0,
+    'exploration_final_eps': 0.05,
+
+    'output': 'dqn_catchgarbage.zip',
+    'checkpoint_dir': 'dqn_checkpoints',
+    'checkpoint_every_steps': 10_000,
+    'report_every_seconds': 10,
+}
+
+DQN_PARAMETERS = (
+    'learning_rate', 'buffer_size', 'learning_starts', 'batch_size', 'gamma', 'train_freq', 'gradient_steps',
+    'target_update_interval', 'exploration_fraction', 'exploration_initial_eps', 'exploration_final_eps',
+)
+
+
+def load_config(path=None):
+    """DEFAULT_CONFIG updated with the JSON file at `path` (if any); unknown keys are an error."""
+    config = dict(DEFAULT_CONFIG)
+    if path is not None:
+        with open(path, 'r') as f:
+            overrides = json.load(f)
+        unknown = sorted(set(overrides) - set(config))
+        if unknown:
+            raise ValueError(f"Unknown DQN settings in {path}: {', '.join(unknown)}")
+        config.update(overrides)
+    if config['vec_env'] not in ('native', 'subproc', 'dummy'):
+        raise ValueError(f"Unknown vec_env {config['vec_env']!r} (expected native, subproc or dummy)")
+    return config
+
+
+class NativeVecEnv(VecEnv):
+    """Stable-Baselines3 view of CatchGarbageVectorEnv: every game advances in one NumPy step."""
+
+    def __init__(self, n_envs):
+        self.venv = CatchGarbageVectorEnv(n_envs)
+        super().__init__(n_envs, self.venv.single_observation_space, self.venv.single_action_space)
+        self._actions = None
+
+    def reset(self):
+        observations, _ = self.venv.reset(seed=self._seeds[0])
+        self._seeds = [None] * self.num_envs
+        return observations
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        observations, rewards, terminated, _, infos = self.venv.step(self._actions)
+        dones = terminated.copy()
+        env_infos = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(dones):
+            env_infos[i] = {
+                'terminal_observation': infos['final_obs'][i],
+                'TimeLimit.truncated': False,
+                'points': int(infos['points'][i]),
+            }
+        return observations, rewards.astype(np.float32), dones, env_infos
+
+    def close(self):
+        self.venv.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self.venv, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self.venv, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        result = getattr(self.venv, method_name)(*method_args, **method_kwargs)
+        return [result] * len(self._get_indices(indices))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+
+def make_env(config):
+    """The n_envs training games, as chosen by config['vec_env'], with episode statistics."""
+    if config['vec_env'] == 'native':
+        return VecMonitor(NativeVecEnv(config['n_envs']))
+    vec_env_cls = SubprocVecEnv if config['vec_env'] == 'subproc' else DummyVecEnv
+    return make_vec_env(CatchGarbageEnv, n_envs=config['n_envs'], seed=config['seed'], vec_env_cls=vec_env_cls)
+
+
+class ThroughputCallback(BaseCallback):
+    """Reports environment and gradient throughput separately.
+
+    DQN alternates between collecting train_freq steps from every env and
+    training on the replay buffer. Time from rollout start to rollout end is
+    charged to the envs, time from rollout end to the next rollout start to
+    gradient steps, so each rate shows how fast that side alone runs.
+    """
+
+    def __init__(self, report_every_seconds):
+        super().__init__()
+        self.report_every_seconds = report_every_seconds
+        self.env_seconds = 0.0
+        self.train_seconds = 0.0
+        self.episode_points = []
+
+    def _on_training_start(self):
+        self.start_time = self.last_report_time = time.perf_counter()
+        self.start_steps = self.report_steps = self.model.num_timesteps
+        self.start_updates = self.report_updates = self.model._n_updates
+        self.report_env_seconds = self.report_train_seconds = 0.0
+        self._mark = None
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._mark is not None:
+            self.train_seconds += now - self._mark
+        self._mark = now
+
+    def _on_rollout_end(self):
+        now = time.perf_counter()
+        self.env_seconds += now - self._mark
+        self._mark = now
+
+        if now - self.last_report_time >= self.report_every_seconds:
+            self.report()
+
+    def _on_training_end(self):
+        if self._mark is not None:
+            self.train_seconds += time.perf_counter() - self._mark  # Gradient steps after the last rollout
+
+    def _on_step(self):
+        for info, done in zip(self.locals['infos'], self.locals['dones']):
+            if done:
+                self.episode_points.append(info['points'])
+        return True
+
+    def rates(self, steps, updates, env_seconds, train_seconds):
+        return steps / max(env_seconds, 1e-9), updates / max(train_seconds, 1e-9)
+
+    def report(self):
+        """Prints the rates since the last report."""
+        now = time.perf_counter()
+        steps = self.model.num_timesteps - self.report_steps
+        updates = self.model._n_updates - self.report_updates
+        env_rate, grad_rate = self.rates(steps, updates, self.env_seconds - self.report_env_seconds,
+                                         self.train_seconds - self.report_train_seconds)
+        recent_points = self.episode_points[-100:]
+        points = f"{sum(recent_points) / len(recent_points):.2f}" if recent_points else "-"
+
+        print(f"[{int(now - self.start_time)}s] Steps: {self.model.num_timesteps:,} | "
+              f"Env Steps/s: {env_rate:,.0f} | Grad Steps/s: {grad_rate:,.1f} | "
+              f"Wall Steps/s: {steps / (now - self.last_report_time):,.0f} | "
+              f"Episodes: {len(self.episode_points):,} | Avg Points (last 100): {points} | "
+              f"Epsilon: {self.model.exploration_rate:.3f}")
+
+        self.last_report_time = now
+        self.report_steps = self.model.num_timesteps
+        self.report_updates = self.model._n_updates
+        self.report_env_seconds = self.env_seconds
+        self.report_train_seconds = self.train_seconds
+
+    def summary(self):
+        env_rate, grad_rate = self.rates(self.model.num_timesteps - self.start_steps,
+                                         self.model._n_updates - self.start_updates,
+                                         self.env_seconds, self.train_seconds)
+        print(f"Env time: {self.env_seconds:.1f}s ({env_rate:,.0f} steps/s) | "
+              f"Gradient time: {self.train_seconds:.1f}s ({grad_rate:,.1f} steps/s)")
+
+
+def train_dqn(config, resume=None):
+    """Trains (or with `resume`, continues training) a DQN on config['n_envs'] games and saves it."""
+    torch.set_num_threads(config['torch_threads'])
+    n_envs = config['n_envs']
+    env = make_env(config)
+
+    parameters = {name: config[name] for name in DQN_PARAMETERS}
+    if parameters['gradient_steps'] is None:
+        parameters['gradient_steps'] = n_envs
+
+    if resume is not None:
+        model = DQN.load(resume, env=env, device='cpu', custom_objects=parameters)
+        model.set_random_seed(config['seed'])
+        model._last_obs = None  # Saved for the old env count; learn() resets the new envs instead
+    else:
+        model = DQN('MlpPolicy', env, seed=config['seed'], device='cpu', verbose=0, **parameters)
+
+    throughput = ThroughputCallback(config['report_every_seconds'])
+    callbacks = [throughput]
+    if config['checkpoint_every_steps']:
+        # CheckpointCallback counts vectorized steps, n_envs env steps each
+        callbacks.append(CheckpointCallback(max(config['checkpoint_every_steps'] // n_envs, 1),
+                                            config['checkpoint_dir'], name_prefix='dqn_catchgarbage'))
+
+    print("--- Starting DQN Training ---")
+    print(f"Timesteps: {config['total_timesteps']:,} | Envs: {n_envs} ({config['vec_env']}) | "
+          f"Seed: {config['seed']} | Gradient steps per rollout: {parameters['gradient_steps']}")
+    if resume is not None:
+        print(f"Resuming from {resume} at {model.num_timesteps:,} timesteps")
+    print("-" * 40)
+
+    start_time = time.time()
+    try:
+        model.learn(config['total_timesteps'], callback=callbacks, reset_num_timesteps=resume is None)
+    except KeyboardInterrupt:
+        print("\nTraining interrupted by user.")
+    finally:
+        env.close()
+
+    print("-" * 40)
+    print(f"Training Finished in {int(time.time() - start_time)} seconds. Timesteps: {model.num_timesteps:,}")
+    throughput.summary()
+
+    model.save(config['output'])
+    print(f"Saved model to {config['output']}.")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the CatchTheGarbage DQN on parallel headless games (CPU).")
+    parser.add_argument('--config', default=CONFIG_FILE if os.path.exists(CONFIG_FILE) else None,
+                        help=f"JSON file of settings to override (default {CONFIG_FILE} if present)")
+    parser.add_argument('--resume', default=None, metavar='ZIP', help="continue training a saved model")
+    parser.add_argument('--timesteps', type=int, default=None, help="override total_timesteps")
+    parser.add_argument('--seed', type=int, default=None, help="override seed")
+    args = parser.parse_args()
+
+    dqn_config = load_config(args.config)
+    if args.timesteps is not None:
+        dqn_config['total_timesteps'] = args.timesteps
+    if args.seed is not None:
+        dqn_config['seed'] = args.seed
+
+    train_dqn(dqn_config, args.resume)
@@ -0,0 +1,342 @@
+import argparse
+import math
+import os
+
+import numpy as np
+
+import MachineLearningGemini as trainer
+from MachineLearningGemini import (
+    LEARNING_RATE, DISCOUNT_FACTOR, EPSILON_DECAY, MIN_EPSILON,
+    REWARD_COLLECT, PENALTY_GROUND, PENALTY_GAME_OVER,
+)
+from game_engine import (
+    SCREEN_WIDTH, SCREEN_HEIGHT,
+    PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_REPLACEMENT, PLAYER_START_X, PLAYER_START_Y,
+    GARBAGE_WIDTH, GARBAGE_HEIGHT, GARBAGE_START_Y,
+    GRAVITY, COLLECT_DISTANCE, GARBAGE_ON_GROUND_LIMIT, FIXED_DT,
+    GARBAGE_SPAWN_INTERVAL, GARBAGE_SPAWN_RATE_MODIFIER,
+)
+
+# Numba is optional: without it the kernel functions stay plain Python and
+# run_episode_compiled() falls back to the reference run_episode.
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+# ------------------------------------------------
+# KERNEL STATE LAYOUT
+# ------------------------------------------------
+# The whole episode lives in flat arrays so the kernel can stop at a tick
+# boundary (to get the next block of random numbers or more garbage slots)
+# and be called again where it left off.
+
+I_PLAYER_X, I_POINTS, I_GROUND_COUNT, I_LIVE_COUNT, I_COIN, I_ACTION, I_SPAWN, I_NEXT_SEQ, I_FIRST_FALLING = range(9)
+INT_STATE_SIZE = 9
+F_GAME_TIME, F_SPAWN_TIMER, F_SPAWN_RATE = range(3)
+FLOAT_STATE_SIZE = 3
+P_LEARNING_RATE, P_DISCOUNT, P_REWARD_COLLECT, P_PENALTY_GROUND, P_PENALTY_GAME_OVER = range(5)
+
+FALLING, GROUNDED, COLLECTED = 0, 1, 2
+
+# Kernel exit codes
+DONE, NEED_COINS, NEED_ACTIONS, NEED_SPAWNS, NEED_CAPACITY = range(5)
+
+KERNEL_GARBAGE_CAPACITY = 256  # Garbage per episode (indexed by spawn order), doubled on demand
+NOT_SETTLING = np.iinfo(np.int64).max  # settled_seq outside of a ground event
+
+
+# ------------------------------------------------
+# EPISODE KERNEL
+# ------------------------------------------------
+
+@njit(cache=True)
+def _closest_state(g_x, g_y, g_prev_y, g_state, first, next_seq, settled_seq, player_center_x, x_bins, y_bins):
+    """get_state() over the garbage arrays: closest falling garbage by center x, oldest on ties."""
+    best = -1
+    best_distance = 0.0
+    for seq in range(first, next_seq):
+        if g_state[seq] != FALLING:
+            continue
+        distance = abs(g_x[seq] + GARBAGE_WIDTH / 2 - player_center_x)
+        if best < 0 or distance < best_distance:
+            best = seq
+            best_distance = distance
+
+    if best < 0:
+        return 0, 0
+
+    relative_x = (g_x[best] + GARBAGE_WIDTH / 2) - player_center_x
+    if best > settled_seq:
+        center_y = g_prev_y[best] + GARBAGE_HEIGHT / 2
+    else:
+        center_y = g_y[best] + GARBAGE_HEIGHT / 2
+
+    x_bin = min(max(int((relative_x + SCREEN_WIDTH / 2) / (SCREEN_WIDTH / x_bins)), 0), x_bins - 1)
+    y_bin = min(max(int(center_y / SCREEN_HEIGHT * y_bins), 0), y_bins - 1)
+    return x_bin, y_bin
+
+
+@njit(cache=True)
+def _greedy_action(q_table, x_bin, y_bin):
+    """np.argmax over the action values: first maximum wins."""
+    best = 0
+    for action in range(1, q_table.shape[2]):
+        if q_table[x_bin, y_bin, action] > q_table[x_bin, y_bin, best]:
+            best = action
+    return best
+
+
+@njit(cache=True)
+def _update(q_table, params, x_bin, y_bin, action, reward, next_x_bin, next_y_bin):
+    """update_q_table() with the same operation order."""
+    learning_rate = params[P_LEARNING_RATE]
+    old_q_value = q_table[x_bin, y_bin, action]
+    max_future_q = q_table[next_x_bin, next_y_bin, 0]
+    for next_action in range(1, q_table.shape[2]):
+        max_future_q = max(max_future_q, q_table[next_x_bin, next_y_bin, next_action])
+
+    q_table[x_bin, y_bin, action] = (1 - learning_rate) * old_q_value + learning_rate * (
+        reward + params[P_DISCOUNT] * max_future_q)
+
+
+@njit(cache=True)
+def episode_kernel(q_table, epsilon, params, coins, actions, spawns, ints, floats,
+                   g_x, g_y, g_prev_y, g_fy, g_vy, g_state):
+    """Runs ticks of run_episode() until the episode ends or a buffer runs out.
+
+    Returns DONE, or the NEED_* code of the buffer to refill before calling
+    again. It only stops at tick boundaries, before anything of the tick is
+    consumed, so a resumed episode is indistinguishable from an uninterrupted one.
+    """
+    x_bins = q_table.shape[0]
+    y_bins = q_table.shape[1]
+    player_y = PLAYER_START_Y
+    player_collect_y = player_y + PLAYER_HEIGHT / 3
+    velocity_step = GRAVITY * FIXED_DT
+    lowest_y = SCREEN_HEIGHT - GARBAGE_HEIGHT
+    distance_sq = COLLECT_DISTANCE ** 2
+
+    while True:
+        if ints[I_COIN] >= coins.shape[0]:
+            return NEED_COINS
+        if ints[I_ACTION] >= actions.shape[0]:
+            return NEED_ACTIONS
+        if ints[I_SPAWN] >= spawns.shape[0]:
+            return NEED_SPAWNS
+        if ints[I_NEXT_SEQ] >= g_x.shape[0]:
+            return NEED_CAPACITY
+
+        # --- Garbage Spawning ---
+        floats[F_SPAWN_TIMER] += FIXED_DT
+        wait_time = GARBAGE_SPAWN_INTERVAL / math.log2(floats[F_SPAWN_RATE])
+
+        if floats[F_SPAWN_TIMER] >= wait_time or ints[I_LIVE_COUNT] == 0:
+            seq = ints[I_NEXT_SEQ]
+            g_x[seq] = spawns[ints[I_SPAWN]]
+            g_y[seq] = GARBAGE_START_Y
+            g_prev_y[seq] = GARBAGE_START_Y
+            g_fy[seq] = GARBAGE_START_Y
+            g_vy[seq] = 0.0
+            g_state[seq] = FALLING
+            ints[I_SPAWN] += 1
+            ints[I_NEXT_SEQ] += 1
+            ints[I_LIVE_COUNT] += 1
+            floats[F_SPAWN_TIMER] = 0.0
+            floats[F_SPAWN_RATE] += GARBAGE_SPAWN_RATE_MODIFIER
+
+        while ints[I_FIRST_FALLING] < ints[I_NEXT_SEQ] and g_state[ints[I_FIRST_FALLING]] != FALLING:
+            ints[I_FIRST_FALLING] += 1
+        first = ints[I_FIRST_FALLING]
+        next_seq = ints[I_NEXT_SEQ]
+
+        # --- AI Decision Making ---
+        player_center_x = ints[I_PLAYER_X] + PLAYER_WIDTH / 2
+        x_bin, y_bin = _closest_state(g_x, g_y, g_prev_y, g_state, first, next_seq, NOT_SETTLING,
+                                      player_center_x, x_bins, y_bins)
+
+        coin = coins[ints[I_COIN]]
+        ints[I_COIN] += 1
+        if coin < epsilon:
+            action = actions[ints[I_ACTION]]  # Explore
+            ints[I_ACTION] += 1
+        else:
+            action = _greedy_action(q_table, x_bin, y_bin)
+
+        if action == 0 and ints[I_PLAYER_X] - PLAYER_REPLACEMENT >= 0:
+            ints[I_PLAYER_X] -= PLAYER_REPLACEMENT
+        elif action == 2 and ints[I_PLAYER_X] + PLAYER_REPLACEMENT <= SCREEN_WIDTH - PLAYER_WIDTH:
+            ints[I_PLAYER_X] += PLAYER_REPLACEMENT
+        player_center_x = ints[I_PLAYER_X] + PLAYER_WIDTH / 2
+
+        reward = 0.0
+
+        # 1. Apply Gravity and Check Ground Collision
+        for seq in range(first, next_seq):
+            if g_state[seq] == FALLING:
+                g_prev_y[seq] = g_y[seq]
+                position = g_fy[seq] + g_vy[seq] * FIXED_DT
+                g_fy[seq] = position
+                g_y[seq] = int(position)
+                g_vy[seq] += velocity_step
+
+        for seq in range(first, next_seq):
+            if g_state[seq] == FALLING and g_y[seq] >= lowest_y:
+                g_state[seq] = GROUNDED
+                g_y[seq] = lowest_y
+                ints[I_GROUND_COUNT] += 1
+                reward += params[P_PENALTY_GROUND]
+
+                # Garbage later in spawn order has not moved yet at this point of the tick
+                next_x_bin, next_y_bin = _closest_state(g_x, g_y, g_prev_y, g_state, first, next_seq, seq,
+                                                        player_center_x, x_bins, y_bins)
+                _update(q_table, params, x_bin, y_bin, action, params[P_PENALTY_GROUND], next_x_bin, next_y_bin)
+
+        # 2. Check for Player Collection
+        for seq in range(first, next_seq):
+            if g_state[seq] != FALLING:
+                continue
+            dx = g_x[seq] + GARBAGE_WIDTH / 2 - player_center_x
+            dy = g_y[seq] + GARBAGE_HEIGHT / 2 - player_collect_y
+            if dx ** 2 + dy ** 2 < distance_sq:
+                g_state[seq] = COLLECTED
+                ints[I_LIVE_COUNT] -= 1
+                ints[I_POINTS] += 1
+                reward += params[P_REWARD_COLLECT]
+
+                next_x_bin, next_y_bin = _closest_state(g_x, g_y, g_prev_y, g_state, first, next_seq, NOT_SETTLING,
+                                                        player_center_x, x_bins, y_bins)
+                _update(q_table, params, x_bin, y_bin, action, params[P_REWARD_COLLECT], next_x_bin, next_y_bin)
+
+        # 3. Check Game Over
+        game_over = ints[I_GROUND_COUNT] > GARBAGE_ON_GROUND_LIMIT
+        if game_over:
+            reward += params[P_PENALTY_GAME_OVER]
+            learning_rate = params[P_LEARNING_RATE]
+            old_q_value = q_table[x_bin, y_bin, action]
+            q_table[x_bin, y_bin, action] = (1 - learning_rate) * old_q_value + learning_rate * (
+                reward + params[P_DISCOUNT] * 0)
+
+        floats[F_GAME_TIME] += FIXED_DT
+
+        if game_over:
+            return DONE
+
+
+# ------------------------------------------------
+# EPISODE RUNNER
+# ------------------------------------------------
+
+def run_episode_kernel(episode_index=0, kernel=episode_kernel):
+    """Runs run_episode(episode_index) through the array kernel on trainer.Q_TABLE."""
+    q_table = trainer.Q_TABLE
+    episode_random = trainer.EpisodeRandom(trainer.RUN_SEED, episode_index)
+
+    params = np.array([LEARNING_RATE, DISCOUNT_FACTOR, REWARD_COLLECT, PENALTY_GROUND, PENALTY_GAME_OVER],
+                      dtype=np.float64)
+    coins = episode_random.coin_block
+    actions = episode_random.action_block
+    spawns = episode_random.spawn_block
+
+    ints = np.zeros(INT_STATE_SIZE, dtype=np.int64)
+    ints[I_PLAYER_X] = PLAYER_START_X
+    floats = np.zeros(FLOAT_STATE_SIZE, dtype=np.float64)
+    floats[F_SPAWN_RATE] = 2.0  # Corresponds to initial 'x' in original log2 formula
+
+    capacity = KERNEL_GARBAGE_CAPACITY
+    garbage = [np.zeros(capacity, dtype=np.int64) for _ in range(3)] + \
+              [np.zeros(capacity, dtype=np.float64) for _ in range(2)] + [np.zeros(capacity, dtype=np.int8)]
+
+    while True:
+        status = kernel(q_table, trainer.GLOBAL_EPSILON, params, coins, actions, spawns, ints, floats, *garbage)
+        if status == DONE:
+            break
+        elif status == NEED_COINS:
+            episode_random._draw_coins()
+            coins = episode_random.coin_block
+            ints[I_COIN] = 0
+        elif status == NEED_ACTIONS:
+            episode_random._draw_actions()
+            actions = episode_random.action_block
+            ints[I_ACTION] = 0
+        elif status == NEED_SPAWNS:
+            episode_random._draw_spawns()
+            spawns = episode_random.spawn_block
+            ints[I_SPAWN] = 0
+        else:
+            garbage = [np.concatenate([column, np.zeros_like(column)]) for column in garbage]
+
+    # --- End of Episode ---
+    trainer.GLOBAL_EPSILON = max(MIN_EPSILON, trainer.GLOBAL_EPSILON * EPSILON_DECAY)
+
+    return int(ints[I_POINTS]), float(floats[F_GAME_TIME])
+
+
+def run_episode_compiled(episode_index=0):
+    """run_episode through the Numba kernel, or the reference run_episode if Numba is not installed.
+
+    The kernel decides every tick, so action repeat (DECISION_INTERVAL > 1) also uses run_episode.
+    """
+    if (not NUMBA_AVAILABLE or trainer.DECISION_INTERVAL != 1
+            or trainer.Q_TABLE.dtype != np.float64 or not trainer.Q_TABLE.flags.c_contiguous):
+        return trainer.run_episode(episode_index)
+    return run_episode_kernel(episode_index)
+
+
+# ------------------------------------------------
+# EQUIVALENCE CHECK
+# ------------------------------------------------
+
+def check_equivalence(episodes=20, seed=1234, epsilons=(1.0, 0.3, 0.01)):
+    """Runs the same seeded episodes through run_episode and the kernel and compares them.
+
+    Checks points, game time, final epsilon and the Q-table bit for bit. Without
+    Numba the kernel runs as plain Python, which still checks its logic.
+    Returns True if everything matched.
+    """
+    saved = trainer.Q_TABLE, trainer.GLOBAL_EPSILON, trainer.RUN_SEED
+    if os.path.exists(trainer.Q_TABLE_FILE):
+        start_q_table = np.load(trainer.Q_TABLE_FILE)
+    else:
+        start_q_table = np.zeros(trainer.Q_TABLE_SHAPE)
+    trainer.RUN_SEED = seed
+    all_equal = True
+
+    try:
+        for epsilon in epsilons:
+            results = []
+            for runner in (trainer.run_episode, run_episode_kernel):
+                trainer.Q_TABLE = start_q_table.copy()
+                trainer.GLOBAL_EPSILON = epsilon
+                outcomes = [runner(i) for i in range(episodes)]
+                results.append((outcomes, trainer.Q_TABLE.copy(), trainer.GLOBAL_EPSILON))
+
+            (reference, reference_q, reference_epsilon), (kernel, kernel_q, kernel_epsilon) = results
+            equal = reference == kernel and reference_epsilon == kernel_epsilon and np.array_equal(reference_q, kernel_q)
+            all_equal &= equal
+            print(f"Epsilon {epsilon:<5} | Episodes: {episodes} | "
+                  f"Q-table identical: {np.array_equal(reference_q, kernel_q)} | "
+                  f"Results identical: {reference == kernel} | {'OK' if equal else 'MISMATCH'}")
+    finally:
+        trainer.Q_TABLE, trainer.GLOBAL_EPSILON, trainer.RUN_SEED = saved
+
+    return all_equal
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Numba episode kernel for the tabular Q-learner.")
+    parser.add_argument('--check', action='store_true', help='compare the kernel against run_episode and exit')
+    parser.add_argument('--episodes', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Numba available: {NUMBA_AVAILABLE}")
+    if args.check:
+        raise SystemExit(0 if check_equivalence(args.episodes) else 1)
+
+    trainer.fast_training_run(max_runtime_seconds=1200, episode_runner=run_episode_compiled)
@@ -0,0 +1,270 @@
+import heapq
+import math
+from bisect import bisect_left
+
+import numpy as np
+
+import MachineLearningGemini as trainer
+from MachineLearningGemini import (
+    STATE_Y_BINS,
+    LEARNING_RATE, DISCOUNT_FACTOR, EPSILON_DECAY, MIN_EPSILON,
+    REWARD_COLLECT, PENALTY_GROUND, PENALTY_GAME_OVER,
+    get_state, discretize_state, select_action, apply_action, update_q_table,
+)
+from game_engine import (
+    SCREEN_WIDTH, SCREEN_HEIGHT,
+    PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_REPLACEMENT, PLAYER_START_X, PLAYER_START_Y,
+    GARBAGE_HEIGHT, GARBAGE_START_Y,
+    GRAVITY, COLLECT_DISTANCE, GARBAGE_ON_GROUND_LIMIT, FIXED_DT,
+    GARBAGE_SPAWN_INTERVAL, GARBAGE_SPAWN_RATE_MODIFIER,
+    Player,
+)
+
+# ------------------------------------------------
+# EVENT-DRIVEN SETTINGS
+# ------------------------------------------------
+# Ticks that move the player still cost one exploration coin each, and with
+# many random moves the skipping bookkeeping costs more than it saves. Above
+# this epsilon (measured crossover about 0.35) episodes are left to run_episode.
+EVENT_DRIVEN_MAX_EPSILON = 0.3
+
+# ------------------------------------------------
+# PRECOMPUTED SCHEDULES
+# ------------------------------------------------
+# Every garbage starts at the same height with vy = 0 and gravity is constant,
+# so its whole fall is the same sequence of float operations. Replaying that
+# sequence once gives, for every age (number of physics ticks since spawn),
+# exactly the values the fixed-step loop would compute, rounding included.
+
+def _build_fall_table():
+    fall_fy, fall_vy, fall_y = [float(GARBAGE_START_Y)], [0.0], [GARBAGE_START_Y]
+    position, velocity = float(GARBAGE_START_Y), 0.0
+    velocity_step = GRAVITY * FIXED_DT
+
+    while fall_y[-1] < SCREEN_HEIGHT - GARBAGE_HEIGHT:
+        position = position + velocity * FIXED_DT
+        velocity += velocity_step
+        fall_fy.append(position)
+        fall_vy.append(velocity)
+        fall_y.append(int(position))
+
+    return fall_fy, fall_vy, fall_y
+
+
+FALL_FY, FALL_VY, FALL_Y = _build_fall_table()
+GROUND_AGE = len(FALL_Y) - 1  # Age at which garbage hits the ground
+
+# First age at which garbage can be within COLLECT_DISTANCE of the player (dx = 0)
+PLAYER_COLLECT_Y = PLAYER_START_Y + PLAYER_HEIGHT / 3
+COLLECT_WINDOW_AGE = next(
+    age for age, y in enumerate(FALL_Y)
+    if (y + GARBAGE_HEIGHT / 2 - PLAYER_COLLECT_Y) ** 2 < COLLECT_DISTANCE ** 2
+)
+
+
+def _build_y_bin_changes():
+    """NEXT_Y_BIN_CHANGE[age] = first later age whose Y bin differs from the bin at `age`."""
+    y_bins = [min(max(int((y + GARBAGE_HEIGHT / 2) / SCREEN_HEIGHT * STATE_Y_BINS), 0), STATE_Y_BINS - 1)
+              for y in FALL_Y]
+    next_change = [math.inf] * len(y_bins)
+    for age in range(len(y_bins) - 2, -1, -1):
+        next_change[age] = age + 1 if y_bins[age + 1] != y_bins[age] else next_change[age + 1]
+    return next_change
+
+
+NEXT_Y_BIN_CHANGE = _build_y_bin_changes()
+
+# TICK_TIME[n] is the float sum of n FIXED_DT steps, i.e. the value of both
+# spawn_timer and game_time after n ticks. Extended on demand.
+TICK_TIME = [0.0]
+
+
+def _tick_time(n):
+    while len(TICK_TIME) <= n:
+        TICK_TIME.append(TICK_TIME[-1] + FIXED_DT)
+    return TICK_TIME[n]
+
+
+def _ticks_until_spawn(wait_time):
+    """Smallest number of ticks after a spawn whose spawn_timer reaches `wait_time`."""
+    while TICK_TIME[-1] < wait_time:
+        _tick_time(len(TICK_TIME) * 2)
+    return bisect_left(TICK_TIME, wait_time)
+
+
+# ------------------------------------------------
+# EVENT-DRIVEN EPISODE RUNNER
+# ------------------------------------------------
+
+def run_episode_event_driven(episode_index=0):
+    """Runs a single episode like run_episode, skipping ticks where nothing can change.
+
+    A heap holds the tick at which each garbage enters collection range; from there
+    until it is collected or grounded the episode runs tick by tick. Before that
+    (and before the next spawn) no reward or Q update can happen, so those ticks
+    only track the player and the state of the closest garbage, reading garbage
+    heights from the fall table. While the greedy action leaves the player where
+    it is, the run jumps straight to the next Y-bin change of the closest garbage.
+    Exploration coins are still consumed per tick, so the random draws, states,
+    actions and Q-table updates are identical to run_episode(episode_index).
+    Action repeat (DECISION_INTERVAL > 1) and episodes that start with epsilon
+    above EVENT_DRIVEN_MAX_EPSILON are left to run_episode.
+    """
+    if trainer.DECISION_INTERVAL != 1 or trainer.GLOBAL_EPSILON > EVENT_DRIVEN_MAX_EPSILON:
+        return trainer.run_episode(episode_index)
+
+    episode_random = trainer.EpisodeRandom(trainer.RUN_SEED, episode_index)
+
+    player = Player(PLAYER_START_X, PLAYER_START_Y, PLAYER_WIDTH, PLAYER_HEIGHT)
+    garbage_pool = trainer.GARBAGE_POOL
+    garbage_pool.reset()
+    points = 0
+    garbage_on_ground_count = 0
+
+    tick = 0                 # Completed ticks
+    spawn_ticks = 0          # Ticks since the spawn timer was last reset
+    spawn_difficulty_rate = 2.0
+    spawn_wait_ticks = _ticks_until_spawn(GARBAGE_SPAWN_INTERVAL / math.log2(spawn_difficulty_rate))
+
+    spawn_tick = {}          # slot -> tick in which it spawned
+    collect_range_events = []  # heap of (tick entering collection range, seq, slot)
+    in_collect_range = set()
+
+    is_running = True
+
+    while is_running:
+
+        # --- Fast-forward over quiet ticks ---
+        explore_next = False
+
+        if garbage_pool and not in_collect_range:
+            epsilon = trainer.GLOBAL_EPSILON
+            greedy_actions = {}  # The Q-table cannot change before the next event
+
+            # Last tick that can be skipped: the next spawn or collection-range entry ends it
+            last_quiet_tick = tick + spawn_wait_ticks - spawn_ticks - 1
+            if collect_range_events:
+                last_quiet_tick = min(last_quiet_tick, collect_range_events[0][0] - 1)
+            start_tick = tick
+
+            while tick < last_quiet_tick:
+                # State seen at the start of tick + 1 (garbage positions from the fall table)
+                closest_slot = garbage_pool.closest_falling(player.centerx)
+                if closest_slot >= 0:
+                    closest_spawn_tick = spawn_tick[closest_slot]
+                    age = tick + 1 - closest_spawn_tick
+                    state = discretize_state(garbage_pool.centerx(closest_slot) - player.centerx,
+                                             FALL_Y[age] + GARBAGE_HEIGHT / 2)
+                else:
+                    state = (0, 0)
+
+                greedy_action = greedy_actions.get(state)
+                if greedy_action is None:
+                    greedy_action = greedy_actions[state] = np.argmax(trainer.Q_TABLE[state])
+
+                player_stays = (
+                    greedy_action == 1
+                    or (greedy_action == 0 and player.x - PLAYER_REPLACEMENT < 0)
+                    or (greedy_action == 2 and player.x + PLAYER_REPLACEMENT > SCREEN_WIDTH - PLAYER_WIDTH)
+                )
+
+                if player_stays:
+                    # Nothing changes until the closest garbage reaches its next Y bin
+                    run_end = last_quiet_tick
+                    if closest_slot >= 0:
+                        run_end = min(run_end, closest_spawn_tick + NEXT_Y_BIN_CHANGE[age] - 1)
+
+                    exploited, explore_next = episode_random.exploit_coins(run_end - tick, epsilon)
+                    tick += exploited
+                elif episode_random.coin() < epsilon:
+                    explore_next = True
+                else:
+                    tick += 1
+                    apply_action(player, greedy_action)
+
+                if explore_next:
+                    break
+
+            if tick != start_tick:
+                spawn_ticks += tick - start_tick
+                for i in range(garbage_pool.falling_count):
+                    slot = garbage_pool.falling[i]
+                    age = tick - spawn_tick[slot] + 1
+                    garbage_pool.fy[slot] = FALL_FY[age]
+                    garbage_pool.vy[slot] = FALL_VY[age]
+                    garbage_pool.y[slot] = FALL_Y[age]
+
+        # --- Full tick ---
+        tick += 1
+        spawn_ticks += 1
+
+        if spawn_ticks >= spawn_wait_ticks or not garbage_pool:
+            slot = garbage_pool.spawn(episode_random.spawn_x(), GARBAGE_START_Y)
+            spawn_tick[slot] = tick
+            heapq.heappush(collect_range_events,
+                           (tick + COLLECT_WINDOW_AGE - 1, garbage_pool.seq[slot], slot))
+            spawn_ticks = 0
+            spawn_difficulty_rate += GARBAGE_SPAWN_RATE_MODIFIER
+            spawn_wait_ticks = _ticks_until_spawn(GARBAGE_SPAWN_INTERVAL / math.log2(spawn_difficulty_rate))
+
+        while collect_range_events and collect_range_events[0][0] <= tick:
+            in_collect_range.add(heapq.heappop(collect_range_events)[2])
+
+        current_state = get_state(player, garbage_pool)
+        if explore_next:
+            action = episode_random.random_action()
+        else:
+            action = select_action(current_state, episode_random)
+        apply_action(player, action)
+
+        last_state = current_state
+        last_action = action
+
+        reward = 0
+
+        # 1. Apply Gravity and Check Ground Collision
+        for slot in garbage_pool.apply_gravity(GRAVITY, FIXED_DT, SCREEN_HEIGHT):
+            garbage_pool.ground(slot, SCREEN_HEIGHT)
+            in_collect_range.discard(slot)
+
+            garbage_on_ground_count += 1
+            r = PENALTY_GROUND
+            reward += r
+
+            garbage_pool.settled_seq = garbage_pool.seq[slot]
+            next_state = get_state(player, garbage_pool)
+            update_q_table(last_state, last_action, r, next_state)
+
+        garbage_pool.settled_seq = float('inf')
+
+        # 2. Check for Player Collection
+        player_center_x = player.centerx
+        player_collect_y = player.y + player.height / 3
+
+        for slot in garbage_pool.find_collected(player_center_x, player_collect_y, COLLECT_DISTANCE):
+            garbage_pool.collect(slot)
+            in_collect_range.discard(slot)
+            points += 1
+            r = REWARD_COLLECT
+            reward += r
+
+            next_state = get_state(player, garbage_pool)
+            update_q_table(last_state, last_action, r, next_state)
+
+        # 3. Check Game Over
+        if garbage_on_ground_count > GARBAGE_ON_GROUND_LIMIT:
+            is_running = False
+            reward += PENALTY_GAME_OVER
+
+            old_q_value = trainer.Q_TABLE[last_state + (last_action,)]
+            new_q_value = (1 - LEARNING_RATE) * old_q_value + LEARNING_RATE * (reward + DISCOUNT_FACTOR * 0)
+            trainer.Q_TABLE[last_state + (last_action,)] = new_q_value
+
+    # --- End of Episode ---
+    trainer.GLOBAL_EPSILON = max(MIN_EPSILON, trainer.GLOBAL_EPSILON * EPSILON_DECAY)
+
+    return points, _tick_time(tick)
+
+
+if __name__ == "__main__":
+    trainer.fast_training_run(max_runtime_seconds=1200, episode_runner=run_episode_event_driven)
@@ -0,0 +1,183 @@
+import math
+
+from garbage_pool import GarbagePool
+
+# ------------------------------------------------
+# ENVIRONMENT & GAME CONSTANTS
+# ------------------------------------------------
+SCREEN_WIDTH = 650
+SCREEN_HEIGHT = 550
+
+PLAYER_WIDTH = 100
+PLAYER_HEIGHT = 100
+PLAYER_REPLACEMENT = 15  # MUCH FASTER PLAYER SPEED for accelerated learning
+PLAYER_START_X = 275
+PLAYER_START_Y = 450
+
+GARBAGE_WIDTH = 50
+GARBAGE_HEIGHT = 50
+GARBAGE_START_Y = -50
+GARBAGE_SPAWN_X_MIN = 20
+GARBAGE_SPAWN_X_MAX = SCREEN_WIDTH - GARBAGE_WIDTH - 20  # Inclusive
+GARBAGE_POOL_CAPACITY = 128  # Live garbage slots per episode (grows if ever exceeded)
+
+GRAVITY = 20
+COLLECT_DISTANCE = 20
+GARBAGE_ON_GROUND_LIMIT = 20
+
+# Fixed timestep for physics (crucial for headless simulation)
+FIXED_DT = 0.01
+
+# Garbage Spawning Variables
+GARBAGE_SPAWN_INTERVAL = 8.0  # Starting interval (seconds)
+GARBAGE_SPAWN_RATE_MODIFIER = 0.25  # Rate of difficulty increase
+
+# Events reported to step()'s on_event callback
+GROUND = 'ground'
+COLLECT = 'collect'
+
+
+class Player:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.previous = (x, y)  # Position before the last step (for interpolated drawing)
+
+    @property
+    def centerx(self):
+        return self.x + self.width / 2
+
+
+def spawn_x_source(rng):
+    """spawn_x callable for GameEngine.reset() drawing from a numpy Generator."""
+    return lambda: int(rng.integers(GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, endpoint=True))
+
+
+# ------------------------------------------------
+# GAME ENGINE (rules only: no pygame, no learning)
+# ------------------------------------------------
+
+class GameEngine:
+    """One game of CatchTheGarbage, advanced one fixed tick per step(action).
+
+    These are the rules the trainer learns with; the pygame front-ends run the
+    same engine and only draw it, so a policy plays the same on screen as in
+    training. Actions: 0 = left, 1 = no move, 2 = right. `dt` and
+    `player_speed` (pixels per step) let the human game keep its own pace.
+    """
+
+    def __init__(self, garbage_pool=None, dt=FIXED_DT, player_speed=PLAYER_REPLACEMENT):
+        self.garbage_pool = garbage_pool if garbage_pool is not None else GarbagePool(
+            GARBAGE_POOL_CAPACITY, GARBAGE_WIDTH, GARBAGE_HEIGHT)
+        self.dt = dt
+        self.player_speed = player_speed
+        self.player = None
+        self.profiler = None  # PhaseProfiler of the caller, if it is timing phases
+
+    def reset(self, spawn_x):
+        """Starts a new game; `spawn_x()` returns the x of each new garbage."""
+        self.spawn_x = spawn_x
+        self.player = Player(PLAYER_START_X, PLAYER_START_Y, PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.garbage_pool.reset()
+        self.points = 0
+        self.garbage_on_ground_count = 0
+        self.game_time = 0.0
+        self.spawn_timer = 0.0
+        self.spawn_difficulty_rate = 2.0  # Corresponds to initial 'x' in original log2 formula
+        self.game_over = False
+
+        self._spawn_garbage()
+
+    def _spawn_garbage(self):
+        """Last part of a tick (and of reset), so observations include the new garbage."""
+        self.spawn_timer += self.dt
+
+        log_value = math.log2(self.spawn_difficulty_rate)
+        wait_time = GARBAGE_SPAWN_INTERVAL / log_value
+
+        if self.spawn_timer >= wait_time or not self.garbage_pool:
+            self.garbage_pool.spawn(self.spawn_x(), GARBAGE_START_Y)
+            self.spawn_timer = 0.0
+            self.spawn_difficulty_rate += GARBAGE_SPAWN_RATE_MODIFIER
+
+    def observation(self, n_garbage=3):
+        """[player x, then (x, y, vy) of the `n_garbage` newest falling garbage, newest first], zero padded.
+
+        The raw observation of the DQN policy (see BatchedSimulator.get_observations); that
+        the shipped model was trained on this layout is unverified (see catch_garbage_env).
+        """
+        pool = self.garbage_pool
+        newest = sorted(pool.falling[:pool.falling_count], key=pool.seq.__getitem__, reverse=True)
+
+        observation = [0.0] * (1 + 3 * n_garbage)
+        observation[0] = self.player.x
+        for i, slot in enumerate(newest[:n_garbage]):
+            observation[1 + 3 * i:4 + 3 * i] = (pool.x[slot], pool.y[slot], pool.vy[slot])
+        return observation
+
+    def move_player(self, action):
+        player = self.player
+        player.previous = (player.x, player.y)
+        if action == 0 and player.x - self.player_speed >= 0:
+            player.x -= self.player_speed
+        elif action == 2 and player.x + self.player_speed <= (SCREEN_WIDTH - PLAYER_WIDTH):
+            player.x += self.player_speed
+
+    def step(self, action, on_event=None):
+        """Plays one tick with `action` and returns whether the game is over.
+
+        `on_event(kind)` is called right after each GROUND and COLLECT, in spawn
+        order. While a GROUND is reported, garbage later in spawn order still
+        reports the height it had before this tick (see GarbagePool.centery),
+        as if the garbage were moved and checked one at a time.
+        """
+        garbage_pool = self.garbage_pool
+        profiler = self.profiler
+
+        self.move_player(action)
+
+        # 1. Apply Gravity and Check Ground Collision
+        landed = garbage_pool.apply_gravity(GRAVITY, self.dt, SCREEN_HEIGHT)
+        if profiler is not None:
+            profiler.lap('gravity')
+
+        for slot in landed:
+            garbage_pool.ground(slot, SCREEN_HEIGHT)
+            self.garbage_on_ground_count += 1
+
+            if on_event is not None:
+                # Garbage later in spawn order has not moved yet at this point of the tick
+                garbage_pool.settled_seq = garbage_pool.seq[slot]
+                on_event(GROUND)
+
+        garbage_pool.settled_seq = float('inf')
+        if profiler is not None:
+            profiler.lap('ground')
+
+        # 2. Check for Player Collection
+        player = self.player
+        player_collect_y = player.y + player.height / 3
+
+        for slot in garbage_pool.find_collected(player.centerx, player_collect_y, COLLECT_DISTANCE):
+            garbage_pool.collect(slot)
+            self.points += 1
+
+            if on_event is not None:
+                on_event(COLLECT)
+
+        if profiler is not None:
+            profiler.lap('collection')
+
+        # 3. Check Game Over
+        self.game_over = self.garbage_on_ground_count > GARBAGE_ON_GROUND_LIMIT
+
+        self.game_time += self.dt
+
+        if not self.game_over:
+            self._spawn_garbage()
+            if profiler is not None:
+                profiler.lap('spawn')
+
+        return self.game_over
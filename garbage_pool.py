@@ -0,0 +1,322 @@
+# ------------------------------------------------
+# ARRAY-BACKED GARBAGE POOL (Structure of Arrays)
+# ------------------------------------------------
+# Garbage objects live in parallel lists indexed by a slot number instead of
+# one Python object per spawn. Falling and grounded slots are kept in dense
+# index lists with a position table, so grounding and collecting are O(1)
+# swap-removes and a tick never allocates.
+
+from bisect import bisect_left
+
+NEGATIVE_INFINITY = float('-inf')
+
+
+class FallingIndex:
+    """Falling garbage kept sorted by center x, for O(log n) nearest queries.
+
+    Entries are (center_x, seq) keys with a parallel list of items (pool slots or
+    game objects). `seq` is the spawn order and breaks ties towards the oldest
+    item, exactly like min() over a spawn-ordered list. The last answer is cached
+    until the index changes or a different center x is asked for, so repeated
+    get_state() calls within a tick are free.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.items = []
+        self.version = 0
+        self._cache_x = None
+        self._cache_version = -1
+        self._cache_item = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        self.keys.clear()
+        self.items.clear()
+        self.version += 1
+
+    def add(self, item, center_x, seq):
+        key = (center_x, seq)
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.items.insert(position, item)
+        self.version += 1
+
+    def remove(self, center_x, seq):
+        position = bisect_left(self.keys, (center_x, seq))
+        del self.keys[position]
+        del self.items[position]
+        self.version += 1
+
+    def nearest(self, center_x, default=None):
+        """Item whose center x is closest to `center_x` (oldest on ties), or `default`."""
+        if center_x == self._cache_x and self.version == self._cache_version:
+            return self._cache_item
+
+        keys = self.keys
+        if not keys:
+            item = default
+        else:
+            right = bisect_left(keys, (center_x, NEGATIVE_INFINITY))
+            if right == 0:
+                best = right
+            else:
+                # Oldest item among those sharing the closest center on the left
+                left = bisect_left(keys, (keys[right - 1][0], NEGATIVE_INFINITY))
+                if right == len(keys):
+                    best = left
+                else:
+                    left_distance = abs(center_x - keys[left][0])
+                    right_distance = abs(center_x - keys[right][0])
+                    if left_distance < right_distance:
+                        best = left
+                    elif right_distance < left_distance:
+                        best = right
+                    else:
+                        best = left if keys[left][1] < keys[right][1] else right
+            item = self.items[best]
+
+        self._cache_x = center_x
+        self._cache_version = self.version
+        self._cache_item = item
+        return item
+
+
+class GarbageView:
+    """Read-only accessor for one pool slot, mirroring the old Garbage attributes."""
+
+    __slots__ = ('pool', 'slot')
+
+    def __init__(self, pool, slot):
+        self.pool = pool
+        self.slot = slot
+
+    @property
+    def x(self):
+        return self.pool.x[self.slot]
+
+    @property
+    def y(self):
+        return self.pool.y[self.slot]
+
+    @property
+    def vy(self):
+        return self.pool.vy[self.slot]
+
+    @property
+    def width(self):
+        return self.pool.width
+
+    @property
+    def height(self):
+        return self.pool.height
+
+    @property
+    def lock(self):
+        return self.pool.lock[self.slot]
+
+    @property
+    def centerx(self):
+        return self.pool.centerx(self.slot)
+
+    @property
+    def centery(self):
+        return self.pool.centery(self.slot)
+
+    @property
+    def bottom(self):
+        return self.pool.y[self.slot] + self.pool.height
+
+
+class GarbagePool:
+    """Fixed-capacity pool of equally sized garbage objects.
+
+    Slots are recycled through a free list. Every slot also remembers its spawn
+    sequence number, so queries can break ties the same way the original list
+    (which was always in spawn order) did. The pool doubles its capacity only if
+    it ever runs out of free slots.
+    """
+
+    def __init__(self, capacity, width, height):
+        self.width = width
+        self.height = height
+        self.capacity = 0
+
+        self.x = []
+        self.y = []
+        self.fy = []       # Float position (old Garbage._y)
+        self.vy = []
+        self.prev_y = []   # y before the last apply_gravity() call
+        self.seq = []      # Spawn order
+        self.lock = []     # True if it has hit the ground
+
+        self.falling = []
+        self.falling_pos = []
+        self.grounded = []
+        self.grounded_pos = []
+        self.free = []
+
+        self.landed = []     # Scratch list filled by apply_gravity()
+        self.collected = []  # Scratch list filled by find_collected()
+        self.index = FallingIndex()
+
+        self._grow(capacity)
+        self.reset()
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        for column in (self.x, self.y, self.prev_y, self.seq, self.falling, self.falling_pos,
+                       self.grounded, self.grounded_pos):
+            column.extend([0] * extra)
+        self.fy.extend([0.0] * extra)
+        self.vy.extend([0.0] * extra)
+        self.lock.extend([False] * extra)
+        self.free[:0] = range(capacity - 1, self.capacity - 1, -1)
+        self.capacity = capacity
+
+    def reset(self):
+        """Releases every slot (start of a new episode)."""
+        self.index.clear()
+        self.falling_count = 0
+        self.grounded_count = 0
+        self.free[:] = range(self.capacity - 1, -1, -1)
+        self.next_seq = 0
+        # Garbage spawned after this sequence number still reports its previous y
+        # (see centery); run_episode uses it to reproduce mid-loop state queries.
+        self.settled_seq = float('inf')
+
+    def __len__(self):
+        return self.falling_count + self.grounded_count
+
+    def __iter__(self):
+        """Yields a GarbageView per live object, in spawn order."""
+        slots = self.falling[:self.falling_count] + self.grounded[:self.grounded_count]
+        slots.sort(key=self.seq.__getitem__)
+        return (GarbageView(self, slot) for slot in slots)
+
+    def __getitem__(self, slot):
+        return GarbageView(self, slot)
+
+    # --- Accessors ---
+
+    def centerx(self, slot):
+        return self.x[slot] + self.width / 2
+
+    def centery(self, slot):
+        if self.seq[slot] > self.settled_seq:
+            return self.prev_y[slot] + self.height / 2
+        return self.y[slot] + self.height / 2
+
+    # --- Mutations ---
+
+    def spawn(self, x, y):
+        """Takes a free slot for a new falling object and returns it."""
+        if not self.free:
+            self._grow(self.capacity * 2)
+
+        slot = self.free.pop()
+        self.x[slot] = x
+        self.y[slot] = y
+        self.prev_y[slot] = y
+        self.fy[slot] = float(y)
+        self.vy[slot] = 0.0
+        self.lock[slot] = False
+        self.seq[slot] = self.next_seq
+        self.next_seq += 1
+
+        self.falling[self.falling_count] = slot
+        self.falling_pos[slot] = self.falling_count
+        self.falling_count += 1
+        self.index.add(slot, self.centerx(slot), self.seq[slot])
+        return slot
+
+    def _remove_falling(self, slot):
+        self.index.remove(self.centerx(slot), self.seq[slot])
+        self.falling_count -= 1
+        last = self.falling[self.falling_count]
+        pos = self.falling_pos[slot]
+        self.falling[pos] = last
+        self.falling_pos[last] = pos
+
+    def ground(self, slot, ground_y):
+        """Locks a falling object on the ground."""
+        self._remove_falling(slot)
+        self.y[slot] = ground_y - self.height
+        self.fy[slot] = self.y[slot]
+        self.vy[slot] = 0.0
+        self.lock[slot] = True
+
+        self.grounded[self.grounded_count] = slot
+        self.grounded_pos[slot] = self.grounded_count
+        self.grounded_count += 1
+
+    def collect(self, slot):
+        """Removes a falling object and returns its slot to the free list."""
+        self._remove_falling(slot)
+        self.free.append(slot)
+
+    # --- Per-tick physics ---
+
+    def apply_gravity(self, gravity, dt, ground_y):
+        """Moves every falling object one step.
+
+        Returns the slots that reached the ground, in spawn order. They are not
+        locked yet; the caller grounds them one by one with ground().
+        """
+        landed = self.landed
+        landed.clear()
+
+        falling = self.falling
+        y = self.y
+        fy = self.fy
+        vy = self.vy
+        prev_y = self.prev_y
+        velocity_step = gravity * dt
+        lowest_y = ground_y - self.height
+
+        for i in range(self.falling_count):
+            slot = falling[i]
+            prev_y[slot] = y[slot]
+            position = fy[slot] + vy[slot] * dt
+            fy[slot] = position
+            y[slot] = int(position)
+            vy[slot] += velocity_step
+
+            if y[slot] >= lowest_y:
+                landed.append(slot)
+
+        if len(landed) > 1:
+            landed.sort(key=self.seq.__getitem__)
+        return landed
+
+    def find_collected(self, collect_x, collect_y, distance):
+        """Returns the falling slots whose center is within `distance` of the collect point, in spawn order."""
+        collected = self.collected
+        collected.clear()
+
+        falling = self.falling
+        x = self.x
+        y = self.y
+        half_width = self.width / 2
+        half_height = self.height / 2
+        distance_sq = distance ** 2
+
+        for i in range(self.falling_count):
+            slot = falling[i]
+            dx = x[slot] + half_width - collect_x
+            dy = y[slot] + half_height - collect_y
+            if dx ** 2 + dy ** 2 < distance_sq:
+                collected.append(slot)
+
+        if len(collected) > 1:
+            collected.sort(key=self.seq.__getitem__)
+        return collected
+
+    def closest_falling(self, center_x):
+        """Slot of the falling object horizontally closest to `center_x`, or -1 if none.
+
+        Ties go to the oldest object, matching min() over a spawn-ordered list.
+        """
+        return self.index.nearest(center_x, -1)
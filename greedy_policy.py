@@ -0,0 +1,73 @@
+import sys
+
+import numpy as np
+
+# ------------------------------------------------
+# COMPILED GREEDY POLICY
+# ------------------------------------------------
+# Inference never needs the Q-values themselves, only the best action per
+# state. Exporting a trained table flattens those argmaxes into one int8
+# array indexed by a flat state id (np.ravel_multi_index order), so acting is
+# a single lookup and a batch of states is one fancy-index.
+
+POLICY_EXPORT_FILE = 'catch_garbage_greedy_policy.npz'
+
+
+class GreedyPolicy:
+    """Precomputed argmax action for every discrete state."""
+
+    def __init__(self, actions, state_shape):
+        self.state_shape = tuple(int(n) for n in state_shape)
+        self.actions = np.ascontiguousarray(actions, dtype=np.int8).reshape(-1)
+        if self.actions.size != int(np.prod(self.state_shape)):
+            raise ValueError(f"{self.actions.size} actions do not cover state shape {self.state_shape}")
+
+        self._action_list = self.actions.tolist()  # Plain ints for scalar lookups
+        self._strides = [int(np.prod(self.state_shape[i + 1:])) for i in range(len(self.state_shape))]
+
+    def state_id(self, state):
+        """Flat index of a state tuple."""
+        return sum(index * stride for index, stride in zip(state, self._strides))
+
+    def act(self, state):
+        """Best action for one (relative X bin, Y bin) state."""
+        x_bin, y_bin = state
+        return self._action_list[x_bin * self._strides[0] + y_bin]
+
+    def argmax(self, state):
+        """Same as act(), so the policy can stand in for a Q-storage backend when only acting."""
+        return self._action_list[self.state_id(state)]
+
+    def act_batch(self, states):
+        """Best actions for many states at once.
+
+        `states` is either a tuple of index arrays (one per state dimension) or
+        an (N, dims) integer array; returns an int8 array of N actions.
+        """
+        if not isinstance(states, tuple):
+            states = tuple(np.asarray(states).T)
+        return self.actions[np.ravel_multi_index(states, self.state_shape)]
+
+    def save(self, path=POLICY_EXPORT_FILE):
+        np.savez(path, actions=self.actions, state_shape=np.array(self.state_shape))
+
+    @classmethod
+    def load(cls, path=POLICY_EXPORT_FILE):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['actions'], data['state_shape'])
+
+
+def compile_policy(q_table):
+    """GreedyPolicy of a dense (states..., actions) Q-table; ties go to the lowest action like np.argmax."""
+    q_table = np.asarray(q_table)
+    return GreedyPolicy(q_table.argmax(axis=-1), q_table.shape[:-1])
+
+
+if __name__ == "__main__":
+    # Usage: python greedy_policy.py [q_table.npy] [output.npz]
+    q_table_file = sys.argv[1] if len(sys.argv) > 1 else 'catch_garbage_q_table.npy'
+    output_file = sys.argv[2] if len(sys.argv) > 2 else POLICY_EXPORT_FILE
+
+    policy = compile_policy(np.load(q_table_file))
+    policy.save(output_file)
+    print(f"Exported greedy policy for {policy.actions.size} states {policy.state_shape} to {output_file}.")
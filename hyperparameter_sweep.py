@@ -0,0 +1,136 @@
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from MachineLearningGemini import TrainingConfig, QLearningTrainer
+
+# ------------------------------------------------
+# SWEEP SETTINGS
+# ------------------------------------------------
+# Values tried per hyperparameter. Grid search takes every combination; random
+# search samples one value per parameter for each config.
+SEARCH_SPACE = {
+    'learning_rate': [0.1, 0.35, 0.6],
+    'discount_factor': [0.9, 0.95, 0.99],
+    'epsilon_decay': [0.99, 0.999, 0.99999],
+    'reward_collect': [50, 150, 300],
+    'penalty_ground': [-25, -75, -150],
+    'penalty_game_over': [-500, -1500],
+    'state_relative_x_bins': [6, 10, 14],
+    'state_y_bins': [3, 5],
+}
+
+TRAIN_EPISODES = 300   # Learning episodes per config
+EVAL_EPISODES = 20     # Greedy episodes per config, the same games for every config
+EVAL_SEED = 2024
+RESULTS_FILE = 'sweep_results.csv'
+
+
+def grid_configs(search_space=SEARCH_SPACE):
+    """Every combination of the search space values."""
+    names = list(search_space)
+    for values in itertools.product(*(search_space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_configs(count, seed=None, search_space=SEARCH_SPACE):
+    """`count` configs with one uniformly drawn value per parameter."""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        yield {name: values[rng.integers(len(values))] for name, values in search_space.items()}
+
+
+def evaluate_config(job):
+    """Trains one config from scratch, then scores it on the evaluation games (runs in a worker)."""
+    config_index, overrides, train_episodes, eval_episodes, run_seed = job
+
+    cpu_start = time.process_time()
+    trainer = QLearningTrainer(TrainingConfig(**overrides), run_seed=run_seed)
+    _, train_points = trainer.train(episodes=train_episodes)
+    eval_score = trainer.evaluate(eval_episodes, EVAL_SEED)
+    cpu_seconds = time.process_time() - cpu_start
+
+    return dict(
+        overrides,
+        config=config_index,
+        train_avg_points=train_points / train_episodes,
+        eval_score=eval_score,
+        cpu_seconds=cpu_seconds,
+        score_per_cpu_second=eval_score / cpu_seconds,
+    )
+
+
+def run_sweep(configs, train_episodes=TRAIN_EPISODES, eval_episodes=EVAL_EPISODES, n_workers=None,
+              results_file=RESULTS_FILE, seed=None):
+    """Evaluates every config on a process pool and writes the ranked results table.
+
+    Configs are ranked by evaluation score per CPU-second (training and
+    evaluation together). Every config trains from episode seeds (seed, i),
+    so differences come from the hyperparameters, not from luck of the draw.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+
+    configs = list(configs)
+    jobs = [(i, overrides, train_episodes, eval_episodes, seed) for i, overrides in enumerate(configs)]
+
+    print("--- Starting Hyperparameter Sweep ---")
+    print(f"Configs: {len(configs)} | Workers: {n_workers} | "
+          f"Train Episodes: {train_episodes} | Eval Episodes: {eval_episodes}")
+    print(f"Run Seed: {seed}")
+    print("-" * 40)
+
+    start_time = time.time()
+    results = []
+    with mp.Pool(n_workers) as pool:
+        for result in pool.imap_unordered(evaluate_config, jobs):
+            results.append(result)
+            print(f"[{int(time.time() - start_time)}s] Config {result['config']} ({len(results)}/{len(jobs)}) | "
+                  f"Eval Score: {result['eval_score']:.2f} | CPU: {result['cpu_seconds']:.1f}s")
+
+    results.sort(key=lambda row: row['score_per_cpu_second'], reverse=True)
+    for rank, row in enumerate(results, 1):
+        row['rank'] = rank
+
+    columns = ['rank', 'config', 'score_per_cpu_second', 'eval_score', 'train_avg_points', 'cpu_seconds']
+    columns += [name for name in TrainingConfig.FIELDS if results and name in results[0]]
+    with open(results_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(results)
+
+    print("-" * 40)
+    print(f"Sweep Finished in {int(time.time() - start_time)} seconds. Results saved to {results_file}.")
+    print(f"{'Rank':>4} {'Score/CPU-s':>12} {'Eval':>8} {'CPU s':>7}  Config")
+    for row in results[:10]:
+        overrides = ", ".join(f"{name}={row[name]}" for name in TrainingConfig.FIELDS if name in row)
+        print(f"{row['rank']:>4} {row['score_per_cpu_second']:>12.3f} {row['eval_score']:>8.2f} "
+              f"{row['cpu_seconds']:>7.1f}  {overrides}")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grid or random hyperparameter search over the tabular Q-learner.")
+    parser.add_argument('--search', choices=('grid', 'random'), default='random')
+    parser.add_argument('--samples', type=int, default=64, help='configs to draw for random search')
+    parser.add_argument('--train-episodes', type=int, default=TRAIN_EPISODES)
+    parser.add_argument('--eval-episodes', type=int, default=EVAL_EPISODES)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    if args.search == 'grid':
+        sweep_configs = grid_configs()
+    else:
+        sweep_configs = random_configs(args.samples, args.seed)
+
+    run_sweep(sweep_configs, args.train_episodes, args.eval_episodes, args.workers, args.output, args.seed)
@@ -1,10 +1,12 @@
 # Imports
-import math, random, threading, time, pygame, sys, os
+import atexit, random, pygame, sys, os
 
-# Player Settings
-player_x, player_y = 275, 450
-player_width, player_height = 100, 100
-player_replacement = 5
+from game_engine import GameEngine, GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX, PLAYER_WIDTH, PLAYER_HEIGHT
+from phase_profiler import PhaseProfiler
+from sprite_renderer import EngineRenderer
+
+# Player Settings (position, size and the rules of the game are in game_engine.py)
+player_replacement = 5  # Pixels per simulation step
 
 # Pygame Setup
 pygame.display.set_caption("Catch The Garbage")
@@ -24,126 +26,37 @@ def resource_path(relative_path):
     return os.path.join(os.path.abspath("."), relative_path)
 
 pygame.display.set_icon(pygame.image.load(resource_path("Images/trash-can.png")))
-player_image = pygame.transform.scale(pygame.image.load(resource_path("Images/recycle-bin.png")), (player_width, player_height))
-apple_image = pygame.transform.scale(pygame.image.load(resource_path("Images/apple.png")),(50,50))
-banana_image = pygame.transform.scale(pygame.image.load(resource_path("Images/banana.png")), (50,50))
-bottle_image = pygame.transform.scale(pygame.image.load(resource_path("Images/garbage-bag.png")), (50,50))
-garbage_bag_image = pygame.transform.scale(pygame.image.load(resource_path("Images/garbage-bag.png")), (50,50))
+def load_image(relative_path, size):
+    """Loads, scales and converts an image to the display format (fast alpha blits)."""
+    return pygame.transform.scale(pygame.image.load(resource_path(relative_path)), size).convert_alpha()
+
+player_image = load_image("Images/recycle-bin.png", (PLAYER_WIDTH, PLAYER_HEIGHT))
+apple_image = load_image("Images/apple.png", (50,50))
+banana_image = load_image("Images/banana.png", (50,50))
+bottle_image = load_image("Images/garbage-bag.png", (50,50))
+garbage_bag_image = load_image("Images/garbage-bag.png", (50,50))
 
 # Lists
-garbage_rect_list = []
 garbage_image_list = [apple_image, banana_image, bottle_image, garbage_bag_image]
 
-# Game Setup
-gravity = 20
-points = 0
-collect_distance = 20
-
-# Classes
-class Player(pygame.Rect):
-    def __init__(self):
-        pygame.Rect.__init__(self, player_x, player_y, player_width, player_height)
-        self.image = player_image
-
-class Garbage(pygame.Rect):
-    def __init__(self, x, y, width, height):
-        random_x = random.randint(20,530)
-        pygame.Rect.__init__(self, random_x, y, width, height)
-
-        self.selected_image = random.choice(garbage_image_list)
-
-        self.vy = 0.0
-        self._y = float(self.y)
-        self.lock = False
-
-    def collected(self):
-        global points
-        garbage_rect_list.remove(self)
-        points += 1
-
-    def on_ground(self):
-        self.lock = True
-        grayscale_img = pygame.transform.grayscale(self.selected_image)
-        self.selected_image = grayscale_img
+# Fixed timestep: the game advances in steps of fixed_dt seconds however fast frames are drawn
+fixed_dt = 1 / 60
+max_frame_time = 0.25  # Longer frames (window dragged, debugger) are not caught up on
 
+# Game Setup: the same engine the AI trains on, at the human game's pace
+engine = GameEngine(dt=fixed_dt, player_speed=player_replacement)
+engine.reset(lambda: random.randint(GARBAGE_SPAWN_X_MIN, GARBAGE_SPAWN_X_MAX))
 
 # Variables
-player = Player()
 running = True
-text = None
-text_rect = None
-font = None
-enable_ai = False
-ai_replacement = 5
-
-# Functions
-def check_length_between_two_points(a, b, x, y):
-    return round(math.sqrt((x-a)**2 + (y-b)**2))
-
-
-def check_collision_with_garbage():
-    for garbage in garbage_rect_list:
-        if player.colliderect(garbage):
-            #calculate positions and if valid count as collected garbage
-            garbage_center_x = garbage.x + (garbage.width // 2)
-            garbage_center_y = garbage.y + (garbage.height // 2)
-
-            trash_bin_collect_point_x = player.x + (player.width // 2)
-            trash_bin_collect_point_y = player.y + (player.height // 3)
-
-            length = check_length_between_two_points(garbage_center_x, garbage_center_y, trash_bin_collect_point_x, trash_bin_collect_point_y)
-            #print(length)
-            if length < collect_distance: #if closer than 20 pixels that collect
-                garbage.collected()
-
-
-def handle_garbages():
-    global running
-    i = 0
-    for garbage in garbage_rect_list:
-        if garbage.lock:
-            i += 1
-
-    if i > 20:
-        print("So much garbage on ground!")
-        running = False
-        pygame.quit()  # Later go to main menu
-        sys.exit(0)
-
-
-def apply_gravity(list_of_rects, dt):
-    for rect in list_of_rects:
-        if rect.lock:
-            continue
-        else:
-            rect.vy += gravity * dt
-            rect._y += rect.vy * dt
-            rect.y = int(rect._y)
-
-            if rect.bottom > screen.get_height():
-                rect.bottom = screen.get_height()
-                rect._y = rect.y
-                rect.vy = 0.0
-                rect.on_ground()
-
-
-def creating_garbage_loop():
-    global running
-    i = 8  # calculation for good wait time normally 8
-    x = 2
-    while running:
-        log_value = math.log2(x)
-        wait_time = i / log_value
-
-        # creating garbage
-        garbage_rect = Garbage(50, -50, 50, 50)
-        garbage_rect_list.append(garbage_rect)
-
-        time.sleep(wait_time)
-        print(f"Wait time: {wait_time}")
-        x += 0.25
+font = pygame.font.Font(None, 36)
+renderer = EngineRenderer(screen, "white", player_image, garbage_image_list, font, text_topleft=(5,5))
+renderer.attach(engine)
 
+# Profiling (python main.py --profile): frame time per phase, written to the profile file on exit
+profiler = PhaseProfiler() if "--profile" in sys.argv else None
 
+# Functions
 def handle_events(pygame_events):
     global running
     for event in pygame_events:
@@ -153,85 +66,101 @@ def handle_events(pygame_events):
             sys.exit(0)
 
 
-def handle_player_movement(pressed_keys):  # I know it's bad but I am too lazy to rewrite it.
-    if not enable_ai:
-        if (pressed_keys[pygame.K_LEFT] or pressed_keys[pygame.K_a]) and player.x - player_replacement >= 0:  # collusion
-            player.x -= player_replacement
-        elif (pressed_keys[pygame.K_RIGHT] or pressed_keys[pygame.K_d]) and player.x + player_replacement <= (screen.get_width() - player_width): # collusion
-            player.x += player_replacement
+def handle_player_movement(pressed_keys):
+    """Action from the keyboard: 0 = left, 1 = no move, 2 = right (the engine keeps the player on screen)."""
+    if pressed_keys[pygame.K_LEFT] or pressed_keys[pygame.K_a]:
+        return 0
+    elif pressed_keys[pygame.K_RIGHT] or pressed_keys[pygame.K_d]:
+        return 2
+    return 1
 
 
-def create_text_label():
-    global text, text_rect, font
-    font = pygame.font.Font(None, 36)
-    text = font.render(f"Points: {points}", True, (255,255,255), (0,0,0))
-    text_rect = text.get_rect()
-    text_rect.topleft = (5,5) #setting position
+def handle_game_over():
+    global running
+    print("So much garbage on ground!")
+    running = False
+    pygame.quit()  # Later go to main menu
+    sys.exit(0)
 
 
-def draw():
-    global text, text_rect, font
-    screen.fill("white")
-    text = font.render(f"Points: {points}", True, (0,0,0))
-    screen.blit(text, text_rect)
-    screen.blit(player.image, player)
+def draw(alpha=None):
+    """Repaints only what changed since the last frame and returns those screen areas.
 
-    for rect in garbage_rect_list:
-        screen.blit(rect.selected_image, rect)
+    Moving objects are drawn `alpha` (0..1) of the way from their position
+    before the last step to their current one; without one, at their current one.
+    """
+    return renderer.draw(f"Points: {engine.points}", alpha)
 
 
 def ai_for_game():
 # detect the closest garbage
 # move player to it's above
+    garbage_pool = engine.garbage_pool
+    falling = garbage_pool.falling[:garbage_pool.falling_count]
 
-    if enable_ai:
-
-        closest_garbage = None
-        for garbage in garbage_rect_list:  # Finding the closest garbage to ground.
-            if not closest_garbage and garbage.lock == False:
-                closest_garbage = garbage
-            elif closest_garbage and not garbage.lock:
-                if garbage.y > closest_garbage.y:
-                    closest_garbage = garbage
+    if falling:
+        # Finding the closest garbage to ground (the oldest one if several are as low).
+        closest_garbage = max(falling, key=lambda slot: (garbage_pool.y[slot], -garbage_pool.seq[slot]))
+        target_x = garbage_pool.x[closest_garbage] - garbage_pool.width // 2
+        player = engine.player
 
-        if closest_garbage:  # Move player to target
-            target_x = closest_garbage.x - closest_garbage.width // 2
+        if target_x < player.x and abs(target_x - player.x) > 10: # prevent moving so fast to right and left
+            return 0
+        elif target_x > player.x:
+            return 2
+    return 1
 
-            if target_x < player.x and abs(target_x - player.x) > 10: # prevent moving so fast to right and left
-                player.x -= ai_replacement
-            elif target_x > player.x:
-                player.x += ai_replacement
 
+def run_game(enable_ai=False, profile_file="main_profile.json"):
+    """Runs the game until the window is closed or the game is over.
 
+    With `enable_ai` the player is moved by ai_for_game() instead of the keyboard.
+    Under --profile the phase timings are written to `profile_file` on exit.
+    """
+    if profiler is not None:
+        atexit.register(profiler.dump, profile_file)
+        atexit.register(profiler.report)
 
+    accumulator = 0.0  # Real time not yet simulated
 
+    # While Loop
+    while running:
+        if profiler is not None:
+            profiler.start(len(engine.garbage_pool))
 
+        # limits fps to 60; the simulation catches up on the elapsed time in fixed steps
+        accumulator += min(clock.tick(60) / 1000, max_frame_time)
+        if profiler is not None:
+            profiler.lap("frame_wait")
 
-# Threads
-creating_garbage_thread = threading.Thread(target=creating_garbage_loop)
-creating_garbage_thread.start()
+        handle_events(pygame.event.get())
+        action = handle_player_movement(pygame.key.get_pressed())
+        if profiler is not None:
+            profiler.lap("events")
 
-# Init Some Functions
-create_text_label()
+        while accumulator >= fixed_dt:
+            accumulator -= fixed_dt
 
-# While Loop
-while running:
-    handle_events(pygame.event.get())
-    handle_player_movement(pygame.key.get_pressed())
-    check_collision_with_garbage()
-    handle_garbages()
-    ai_for_game()
+            if enable_ai:
+                action = ai_for_game()
+                if profiler is not None:
+                    profiler.lap("ai")
+            if engine.step(action):
+                handle_game_over()
 
-    draw()
+        dirty_rects = draw(accumulator / fixed_dt)
+        if profiler is not None:
+            profiler.lap("draw")
 
-    # flip() the display to put your work on screen
-    pygame.display.flip()
+        # update() the changed areas of the display to put your work on screen
+        renderer.flip(dirty_rects)
+        if profiler is not None:
+            profiler.lap("flip")
 
-    # for independent physics.
-    dt = clock.tick(60) / 1000  # dt is delta time in seconds since last frame, used for framerate- also limits fps to 60
 
-    apply_gravity(garbage_rect_list, dt)
+    pygame.quit()
+    sys.exit(0)
 
 
-pygame.quit()
-sys.exit(0)
\ No newline at end of file
+if __name__ == "__main__":
+    run_game()
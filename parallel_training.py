@@ -0,0 +1,202 @@
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import MachineLearningGemini as trainer
+from MachineLearningGemini import EPSILON_DECAY, MIN_EPSILON, CHECKPOINT_EVERY_SECONDS, POLICY_FILE
+from checkpoint import CheckpointWriter
+from policy_mmap import PolicyPublisher
+
+# ------------------------------------------------
+# PARALLEL TRAINING SETTINGS
+# ------------------------------------------------
+HOGWILD = 'hogwild'        # Workers update the shared Q-table directly, without locks
+DELTA_AVERAGING = 'delta'  # Workers learn on a local copy and merge averaged deltas
+SYNC_EVERY_EPISODES = 25   # Episodes between merges in delta-averaging mode
+REPORT_POLL_SECONDS = 0.5
+
+
+def epsilon_after(start_epsilon, episodes):
+    """Epsilon after `episodes` per-episode decays, as the serial trainer would have it."""
+    return max(MIN_EPSILON, start_epsilon * EPSILON_DECAY ** episodes)
+
+
+def _training_worker(shm_name, shape, dtype, mode, n_workers, start_epsilon, run_seed,
+                     episodes_started, episode_counter, points_total, merge_lock, deadline, episode_runner):
+    """Runs episodes against the shared Q-table until the deadline passes."""
+    trainer.RUN_SEED = run_seed
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    shared_q = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    if mode == HOGWILD:
+        trainer.Q_TABLE = shared_q
+    else:
+        trainer.Q_TABLE = shared_q.copy()
+        base_q = trainer.Q_TABLE.copy()
+
+    episodes_since_merge = 0
+
+    try:
+        while time.time() < deadline:
+            # Episode indices are handed out globally, so each one is seeded once
+            with episodes_started.get_lock():
+                episode_index = episodes_started.value
+                episodes_started.value += 1
+
+            trainer.GLOBAL_EPSILON = epsilon_after(start_epsilon, episode_counter.value)
+            points, _ = episode_runner(episode_index)
+
+            with episode_counter.get_lock():
+                episode_counter.value += 1
+            with points_total.get_lock():
+                points_total.value += points
+
+            episodes_since_merge += 1
+            if mode == DELTA_AVERAGING and episodes_since_merge >= SYNC_EVERY_EPISODES:
+                with merge_lock:
+                    shared_q += (trainer.Q_TABLE - base_q) / n_workers
+                    trainer.Q_TABLE[...] = shared_q
+                base_q[...] = trainer.Q_TABLE
+                episodes_since_merge = 0
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        if mode == DELTA_AVERAGING and episodes_since_merge:
+            with merge_lock:
+                shared_q += (trainer.Q_TABLE - base_q) / n_workers
+
+        # Views into the buffer must be gone before it can be closed
+        trainer.Q_TABLE = None
+        del shared_q
+        shm.close()
+
+
+def parallel_training_run(max_runtime_seconds=3600, n_workers=None, mode=HOGWILD, episode_runner=None, seed=None,
+                          checkpoint_every_seconds=CHECKPOINT_EVERY_SECONDS, publish_policy=True):
+    """Runs episodes on a pool of worker processes sharing one Q-table.
+
+    The Q-table lives in multiprocessing.shared_memory. In HOGWILD mode every
+    worker reads and writes it directly; in DELTA_AVERAGING mode each worker
+    learns on a private copy and every SYNC_EVERY_EPISODES episodes adds its
+    change divided by the number of workers. Epsilon follows the global episode
+    count, so it decays exactly as in a serial run of the same length.
+    Episode i is seeded from (seed, i) whichever worker runs it. The main
+    process snapshots the shared table into a background checkpoint every
+    `checkpoint_every_seconds` and, with `publish_policy`, publishes it to
+    POLICY_FILE on every progress poll.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if episode_runner is None:
+        episode_runner = trainer.run_episode
+
+    start_time = time.time()
+
+    # Load previous training state into shared memory
+    trainer.load_checkpoint()
+    if seed is not None:
+        trainer.RUN_SEED = seed
+    start_epsilon = trainer.GLOBAL_EPSILON
+    first_episode = trainer.EPISODES_TRAINED
+
+    q_table = np.ascontiguousarray(trainer.Q_TABLE)
+    shm = shared_memory.SharedMemory(create=True, size=q_table.nbytes)
+    shared_q = np.ndarray(q_table.shape, dtype=q_table.dtype, buffer=shm.buf)
+    shared_q[...] = q_table
+
+    episodes_started = mp.Value('q', first_episode)
+    episode_counter = mp.Value('q', 0)
+    points_total = mp.Value('d', 0.0)
+    merge_lock = mp.Lock()
+    deadline = start_time + max_runtime_seconds
+
+    print("--- Starting Parallel Headless Q-Learning Simulation ---")
+    print(f"Goal Runtime: {max_runtime_seconds // 60} minutes | Workers: {n_workers} | Mode: {mode}")
+    print(f"Current Epsilon: {start_epsilon:.6f}")
+    print(f"Run Seed: {trainer.RUN_SEED}")
+    print("-" * 40)
+
+    workers = [
+        mp.Process(target=_training_worker, args=(
+            shm.name, q_table.shape, q_table.dtype, mode, n_workers, start_epsilon, trainer.RUN_SEED,
+            episodes_started, episode_counter, points_total, merge_lock, deadline, episode_runner))
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    episode_count = 0
+    last_report = 0
+    checkpoint_writer = CheckpointWriter(trainer.write_checkpoint_files)
+    last_checkpoint_time = start_time
+    policy_publisher = PolicyPublisher(POLICY_FILE, q_table.shape) if publish_policy else None
+
+    try:
+        while any(worker.is_alive() for worker in workers):
+            time.sleep(REPORT_POLL_SECONDS)
+            episode_count = episode_counter.value
+
+            if policy_publisher is not None:
+                policy_publisher.publish(shared_q)
+
+            if time.time() - last_checkpoint_time >= checkpoint_every_seconds:
+                checkpoint_writer.submit(trainer.checkpoint_snapshot(
+                    epsilon_after(start_epsilon, episode_count), episodes_started.value, shared_q))
+                last_checkpoint_time = time.time()
+
+            # Log progress every 100 episodes
+            if episode_count // 100 > last_report:
+                last_report = episode_count // 100
+                elapsed_time = time.time() - start_time
+                avg_points = points_total.value / episode_count
+
+                print(
+                    f"[{int(elapsed_time)}s] Episodes: {episode_count:,} | Avg Score: {avg_points:.2f} | "
+                    f"Epsilon: {epsilon_after(start_epsilon, episode_count):.6f} | "
+                    f"Episodes/s: {episode_count / elapsed_time:,.1f}")
+
+    except KeyboardInterrupt:
+        print("\nTraining interrupted by user.")
+
+    finally:
+        checkpoint_writer.close()
+
+    for worker in workers:
+        worker.join()
+
+    if policy_publisher is not None:
+        policy_publisher.publish(shared_q)
+        policy_publisher.close()
+
+    episode_count = episode_counter.value
+    total_points = points_total.value
+
+    print("-" * 40)
+    print(f"Simulation Finished. Total time added: {int(time.time() - start_time)} seconds.")
+    print(f"Total Episodes Run in this session: {episode_count:,}")
+
+    if episode_count > 0:
+        print(f"Session Average Score: {total_points / episode_count:.2f}")
+
+    # Bring the shared table back into the trainer module before saving
+    trainer.Q_TABLE = shared_q.copy()
+    trainer.GLOBAL_EPSILON = epsilon_after(start_epsilon, episode_count)
+    # Every started episode index is used up (an interrupted one may not have been counted), so the
+    # next session continues after the last one handed out instead of replaying its seed
+    trainer.EPISODES_TRAINED = episodes_started.value
+    del shared_q
+    shm.close()
+    shm.unlink()
+
+    trainer.save_checkpoint(trainer.GLOBAL_EPSILON)
+    trainer.visualize_q_table()
+
+
+if __name__ == "__main__":
+    parallel_training_run(max_runtime_seconds=1200)
@@ -0,0 +1,88 @@
+# ------------------------------------------------
+# PER-PHASE PROFILER
+# ------------------------------------------------
+# Opt-in instrumentation for the training loop and the pygame loops. Callers
+# keep a `profiler` variable that is None when profiling is off, so the only
+# cost left in the hot loop is an `is not None` check per phase.
+
+import json
+import time
+
+perf_counter = time.perf_counter
+
+
+class PhaseProfiler:
+    """Cumulative wall time and call counts per named phase, plus a live-garbage histogram.
+
+    Phases are timed as laps: start() marks the beginning of a tick (or frame)
+    and every lap(name) charges the time since the previous mark to `name`.
+    Work done in the middle of a lap (a callback inside a loop) can be timed
+    on its own with begin_nested() and end_nested(name).
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.live_garbage = {}  # Live garbage count -> ticks (or frames) seen with it
+        self._mark = 0.0
+        self._nested_mark = 0.0
+
+    def start(self, live_garbage=None):
+        """Marks the start of a tick; optionally records how much garbage is alive."""
+        if live_garbage is not None:
+            self.live_garbage[live_garbage] = self.live_garbage.get(live_garbage, 0) + 1
+        self._mark = perf_counter()
+
+    def lap(self, phase):
+        """Charges the time since the last start() or lap() to `phase`."""
+        now = perf_counter()
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + now - self._mark
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self._mark = now
+
+    def begin_nested(self):
+        """Marks the start of a phase nested inside the lap in progress."""
+        self._nested_mark = perf_counter()
+
+    def end_nested(self, phase):
+        """Charges the time since begin_nested() to `phase` and leaves it out of the lap in progress."""
+        elapsed = perf_counter() - self._nested_mark
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + elapsed
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self._mark += elapsed
+
+    def as_dict(self):
+        total = sum(self.seconds.values())
+        phases = {}
+        for phase, seconds in sorted(self.seconds.items(), key=lambda item: -item[1]):
+            calls = self.calls[phase]
+            phases[phase] = {
+                'seconds': seconds,
+                'calls': calls,
+                'mean_us': seconds / calls * 1e6,
+                'share': seconds / total if total else 0.0,
+            }
+        return {
+            'total_seconds': total,
+            'phases': phases,
+            'live_garbage_histogram': {str(count): ticks for count, ticks in sorted(self.live_garbage.items())},
+        }
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+        print(f"Saved phase profile to {path}.")
+
+    def report(self):
+        """Prints the phases, most expensive first."""
+        summary = self.as_dict()
+        print(f"--- Phase Profile ({summary['total_seconds']:.2f}s measured) ---")
+        print(f"{'Phase':<16} {'Seconds':>10} {'Calls':>12} {'Mean (us)':>10} {'Share':>7}")
+        for phase, stats in summary['phases'].items():
+            print(f"{phase:<16} {stats['seconds']:>10.3f} {stats['calls']:>12,} "
+                  f"{stats['mean_us']:>10.2f} {stats['share']:>7.1%}")
+
+        ticks = sum(self.live_garbage.values())
+        if ticks:
+            mean_live = sum(count * seen for count, seen in self.live_garbage.items()) / ticks
+            print(f"Live garbage: mean {mean_live:.1f}, max {max(self.live_garbage)}")
@@ -0,0 +1,149 @@
+# ------------------------------------------------
+# LIVE POLICY FILE (memory-mapped, double-buffered Q-table)
+# ------------------------------------------------
+# The trainer publishes its Q-table into a small memory-mapped file that any
+# number of viewers can map read-only. Layout (all little-endian int64 / float64):
+#
+#   header: MAGIC, VERSION, generation, slot 0 sequence, slot 1 sequence, ndim, shape...
+#   data:   two Q-table slots
+#
+# Generation g lives in slot g % 2. A publish writes the slot the readers are
+# NOT using, bumping that slot's sequence number to odd before and even after
+# the copy, and only then stores the new generation. Readers switch to a new
+# generation by re-pointing a view (no copy) and confirm every read against the
+# slot sequence, so a read that raced with a rewrite is retried, never used.
+
+import mmap
+import os
+
+import numpy as np
+
+MAGIC = 0x51475443  # 'CTGQ'
+VERSION = 1
+HEADER_WORDS = 16
+HEADER_BYTES = HEADER_WORDS * 8
+MAX_DIMS = HEADER_WORDS - 6
+
+WORD_MAGIC, WORD_VERSION, WORD_GENERATION, WORD_SLOT_SEQ, WORD_NDIM, WORD_SHAPE = 0, 1, 2, 3, 5, 6
+
+
+def _file_size(shape):
+    return HEADER_BYTES + 2 * int(np.prod(shape)) * 8
+
+
+class PolicyPublisher:
+    """Writer side: publish(q_table) makes a new generation visible to every subscriber.
+
+    An existing file of the same shape is reused, so the generation counter keeps
+    growing across trainer restarts and viewers that are already attached carry on.
+    """
+
+    def __init__(self, path, shape):
+        self.path = path
+        self.shape = tuple(shape)
+        size = _file_size(self.shape)
+
+        reuse = os.path.exists(path) and os.path.getsize(path) == size
+        with open(path, 'r+b' if reuse else 'w+b') as f:
+            if not reuse:
+                f.truncate(size)
+            self._mmap = mmap.mmap(f.fileno(), size)
+
+        self.header = np.ndarray((HEADER_WORDS,), dtype='<i8', buffer=self._mmap)
+        self.slots = np.ndarray((2,) + self.shape, dtype='<f8', buffer=self._mmap, offset=HEADER_BYTES)
+
+        header = self.header
+        if not (reuse and header[WORD_MAGIC] == MAGIC and header[WORD_VERSION] == VERSION
+                and tuple(header[WORD_SHAPE:WORD_SHAPE + header[WORD_NDIM]]) == self.shape):
+            header[:] = 0
+            header[WORD_NDIM] = len(self.shape)
+            header[WORD_SHAPE:WORD_SHAPE + len(self.shape)] = self.shape
+            header[WORD_VERSION] = VERSION
+            header[WORD_MAGIC] = MAGIC  # Last, so a half-initialized file is never accepted
+
+    @property
+    def generation(self):
+        return int(self.header[WORD_GENERATION])
+
+    def publish(self, q_table):
+        """Copies `q_table` into the spare slot and returns the new generation."""
+        header = self.header
+        generation = int(header[WORD_GENERATION]) + 1
+        slot = generation % 2
+
+        header[WORD_SLOT_SEQ + slot] += 1  # Odd: slot is being rewritten
+        self.slots[slot] = q_table
+        header[WORD_SLOT_SEQ + slot] += 1  # Even: slot is consistent again
+        header[WORD_GENERATION] = generation
+        return generation
+
+    def close(self):
+        del self.header, self.slots
+        self._mmap.close()
+
+
+class PolicySubscriber:
+    """Reader side: maps the policy file read-only and follows new generations.
+
+    The file is opened lazily, so a viewer can start before the trainer. Call
+    poll() between frames; `table` is then a zero-copy view of the newest
+    generation and q_values() returns a verified, untorn row of it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.generation = 0
+        self.table = None
+        self._mmap = None
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER_BYTES:
+            return False
+
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = np.ndarray((HEADER_WORDS,), dtype='<i8', buffer=mapped)
+        ndim = int(header[WORD_NDIM])
+        if header[WORD_MAGIC] != MAGIC or header[WORD_VERSION] != VERSION or not 0 < ndim <= MAX_DIMS:
+            del header
+            mapped.close()
+            return False
+        shape = tuple(int(n) for n in header[WORD_SHAPE:WORD_SHAPE + ndim])
+
+        self._mmap = mapped
+        self.header = header
+        self.slots = np.ndarray((2,) + shape, dtype='<f8', buffer=mapped, offset=HEADER_BYTES)
+        return True
+
+    def poll(self):
+        """Switches to the newest published generation; True if it changed."""
+        if self._mmap is None and not self._open():
+            return False
+
+        generation = int(self.header[WORD_GENERATION])
+        if generation == self.generation:
+            return False
+
+        self.generation = generation
+        self.table = self.slots[generation % 2]
+        return True
+
+    def q_values(self, state):
+        """Copy of table[state] that is guaranteed not to be torn by a concurrent publish."""
+        while True:
+            slot = self.generation % 2
+            sequence = self.header[WORD_SLOT_SEQ + slot]
+            if sequence % 2 == 0:
+                values = self.table[state].copy()
+                if self.header[WORD_SLOT_SEQ + slot] == sequence:
+                    return values
+
+            # The publisher lapped this slot; a newer generation is out by now
+            self.poll()
+
+    def close(self):
+        if self._mmap is not None:
+            self.table = None
+            del self.header, self.slots
+            self._mmap.close()
+            self._mmap = None
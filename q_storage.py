@@ -0,0 +1,137 @@
+# ------------------------------------------------
+# Q-VALUE STORAGE BACKENDS
+# ------------------------------------------------
+# Every backend answers the same questions about a discrete state (a tuple of
+# bin indices): get(state) returns its action values, argmax/max pick the best
+# action/value, value/update read and write one entry. Unvisited states read as
+# all zeros, exactly like a freshly np.zeros'd table.
+#
+#   DenseQStorage   - one ndarray over the whole state space (float64/32/16)
+#   SparseQStorage  - a dict holding rows only for states that were updated
+#
+# Values are handed out as Python floats, so the Q-learning arithmetic runs in
+# double precision whatever the storage dtype is; only the stored result is rounded.
+
+import numpy as np
+
+DENSE = 'dense'
+DENSE32 = 'dense32'
+DENSE16 = 'dense16'
+SPARSE = 'sparse'
+
+DENSE_DTYPES = {DENSE: np.float64, DENSE32: np.float32, DENSE16: np.float16}
+
+
+class DenseQStorage:
+    """Q-values in one ndarray of shape state_shape + (actions,).
+
+    Wrapping an existing array (table=...) does not copy it, so updates are
+    visible to everyone else holding that array.
+    """
+
+    def __init__(self, shape=None, dtype=np.float64, table=None):
+        self.table = np.zeros(shape, dtype=dtype) if table is None else table
+
+    @property
+    def shape(self):
+        return self.table.shape
+
+    @property
+    def n_actions(self):
+        return self.table.shape[-1]
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def __len__(self):
+        """Number of states with storage (all of them)."""
+        return self.table.size // self.table.shape[-1]
+
+    def get(self, state):
+        return self.table[state]
+
+    def argmax(self, state):
+        return int(self.table[state].argmax())
+
+    def max(self, state):
+        return float(self.table[state].max())
+
+    def value(self, state, action):
+        return float(self.table[state + (action,)])
+
+    def update(self, state, action, value):
+        self.table[state + (action,)] = value
+
+    def to_dense(self, shape=None):
+        return np.array(self.table, dtype=np.float64)
+
+
+class SparseQStorage:
+    """Q-values in a dict keyed by state, for state spaces too large to allocate.
+
+    A row is created the first time one of its values is updated, so memory
+    tracks the states the agent actually visited, not the size of the product.
+    """
+
+    def __init__(self, n_actions, dtype=np.float32):
+        self.rows = {}
+        self.dtype = np.dtype(dtype)
+        self._zero_row = np.zeros(n_actions, dtype=self.dtype)
+        self._zero_row.flags.writeable = False
+
+    @property
+    def n_actions(self):
+        return len(self._zero_row)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the rows (excludes dict overhead)."""
+        return len(self.rows) * self._zero_row.nbytes
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, state):
+        return self.rows.get(state, self._zero_row)
+
+    def argmax(self, state):
+        row = self.rows.get(state)
+        return 0 if row is None else int(row.argmax())
+
+    def max(self, state):
+        row = self.rows.get(state)
+        return 0.0 if row is None else float(row.max())
+
+    def value(self, state, action):
+        row = self.rows.get(state)
+        return 0.0 if row is None else float(row[action])
+
+    def update(self, state, action, value):
+        row = self.rows.get(state)
+        if row is None:
+            row = self.rows[state] = self._zero_row.copy()
+        row[action] = value
+
+    def to_dense(self, shape):
+        """Expands into a float64 table of `shape` (states + actions)."""
+        table = np.zeros(shape)
+        for state, row in self.rows.items():
+            table[state] = row
+        return table
+
+
+def make_q_storage(kind, shape):
+    """New empty storage of `kind` (DENSE, DENSE32, DENSE16 or SPARSE) for a Q-table of `shape`."""
+    if kind == SPARSE:
+        return SparseQStorage(shape[-1])
+    if kind in DENSE_DTYPES:
+        return DenseQStorage(shape, DENSE_DTYPES[kind])
+    raise ValueError(f"Unknown Q-storage kind: {kind!r} (expected one of {DENSE}, {DENSE32}, {DENSE16}, {SPARSE})")
+
+
+def as_q_storage(q_table):
+    """Wraps plain arrays in a DenseQStorage (no copy); backends are returned unchanged."""
+    if isinstance(q_table, np.ndarray):
+        return DenseQStorage(table=q_table)
+    return q_table
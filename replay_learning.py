@@ -0,0 +1,183 @@
+import argparse
+import time
+
+import numpy as np
+
+from MachineLearningGemini import TrainingConfig, QLearningTrainer, TRANSITIONS_FILE
+from q_storage import DenseQStorage
+from transition_log import TRANSITION_DTYPE, read_transitions
+
+# ------------------------------------------------
+# REPLAY SETTINGS
+# ------------------------------------------------
+REPLAY_CAPACITY = 100_000  # Transitions kept by a ReplayBuffer (oldest are overwritten)
+REPLAY_BATCH_SIZE = 256
+REPLAY_BATCHES = 8         # Minibatches replayed after every learning episode
+OFFLINE_EPOCHS = 20        # Passes over a transition log in fit_offline
+EVAL_EPISODES = 20
+EVAL_SEED = 2024
+OUTPUT_FILE = 'catch_garbage_replay_q_table.npy'
+
+
+def replay_update(q_table, transitions, learning_rate, discount_factor):
+    """Applies one Q-learning update per transition (TRANSITION_DTYPE records) to `q_table` in place.
+
+    Targets are computed from the table before the batch is applied. Updates
+    that land on the same (state, action) are scattered into per-entry sums
+    with np.bincount and averaged, as in batched_simulator.update_q_table_batch,
+    so a minibatch full of repeats of the few states moves an entry by at most
+    one learning-rate step.
+    """
+    q_flat = q_table.reshape(-1)
+    states = transitions['state']
+    next_states = transitions['next_state']
+    index = np.ravel_multi_index((states[:, 0], states[:, 1], transitions['action']), q_table.shape)
+
+    max_future_q = np.max(q_table[next_states[:, 0], next_states[:, 1]], axis=1)
+    max_future_q[transitions['done']] = 0.0
+
+    target = transitions['reward'] + discount_factor * max_future_q
+    error_sum = np.bincount(index, weights=target - q_flat[index], minlength=q_flat.size)
+    count = np.bincount(index, minlength=q_flat.size)
+    updated = count > 0
+    q_flat[updated] += learning_rate * error_sum[updated] / count[updated]
+
+
+def fit_offline(transitions, config=None, epochs=OFFLINE_EPOCHS, batch_size=REPLAY_BATCH_SIZE, seed=None,
+                q_table=None):
+    """Learns a Q-table from recorded transitions alone, with no simulation.
+
+    Every epoch replays all transitions once, in minibatches of `batch_size`
+    drawn in a fresh random order. Starts from `q_table` (copied) or zeros.
+    """
+    config = config if config is not None else TrainingConfig()
+    q_table = np.zeros(config.q_table_shape) if q_table is None else np.array(q_table, dtype=np.float64)
+    transitions = np.asarray(transitions)
+    rng = np.random.default_rng(seed)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(transitions))
+        for start in range(0, len(order), batch_size):
+            replay_update(q_table, transitions[order[start:start + batch_size]],
+                          config.learning_rate, config.discount_factor)
+
+    return q_table
+
+
+class ReplayBuffer:
+    """The last `capacity` transitions in a preallocated TRANSITION_DTYPE array.
+
+    record() takes the same arguments as TransitionRecorder.record(), so a
+    buffer can be set as a QLearningTrainer's recorder.
+    """
+
+    def __init__(self, capacity=REPLAY_CAPACITY, seed=None):
+        self.transitions = np.zeros(capacity, dtype=TRANSITION_DTYPE)
+        self.capacity = capacity
+        self.size = 0
+        self.position = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def record(self, episode, state, action, reward, next_state, done=False):
+        self.transitions[self.position] = (episode, state, action, reward, next_state, done)
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, transitions):
+        """Adds an array of transitions (e.g. read_transitions()) in order."""
+        for start in range(0, len(transitions), self.capacity):
+            part = transitions[start:start + self.capacity]
+            end = self.position + len(part)
+            if end <= self.capacity:
+                self.transitions[self.position:end] = part
+            else:
+                split = self.capacity - self.position
+                self.transitions[self.position:] = part[:split]
+                self.transitions[:end - self.capacity] = part[split:]
+            self.position = end % self.capacity
+            self.size = min(self.size + len(part), self.capacity)
+
+    def sample(self, batch_size):
+        """`batch_size` transitions drawn uniformly with replacement."""
+        return self.transitions[self.rng.integers(0, self.size, batch_size)]
+
+
+class ReplayTrainer(QLearningTrainer):
+    """QLearningTrainer that also replays stored transitions.
+
+    Episodes learn online exactly like QLearningTrainer and store every
+    transition they learn from in `buffer`; after each learning episode
+    `replay_batches` minibatches sampled from the buffer are applied with
+    replay_update(). Needs a dense Q-table.
+    """
+
+    def __init__(self, config=None, q_table=None, epsilon=None, run_seed=None, garbage_pool=None,
+                 capacity=REPLAY_CAPACITY, batch_size=REPLAY_BATCH_SIZE, replay_batches=REPLAY_BATCHES):
+        super().__init__(config, q_table, epsilon, run_seed, garbage_pool)
+        if not isinstance(self.q_storage, DenseQStorage):
+            raise TypeError("ReplayTrainer needs a dense Q-table")
+        self.buffer = ReplayBuffer(capacity, seed=self.run_seed)
+        self.recorder = self.buffer
+        self.batch_size = batch_size
+        self.replay_batches = replay_batches
+
+    def replay(self):
+        """Applies `replay_batches` minibatch updates sampled from the buffer."""
+        if not self.buffer:
+            return
+        q_table = self.q_storage.table
+        for _ in range(self.replay_batches):
+            replay_update(q_table, self.buffer.sample(self.batch_size),
+                          self.config.learning_rate, self.config.discount_factor)
+
+    def run_episode(self, episode_index=0, learn=True):
+        result = super().run_episode(episode_index, learn)
+        if learn:
+            self.replay()
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay-based tabular Q-learning, online or from a transition log.")
+    parser.add_argument('--from-log', nargs='?', const=TRANSITIONS_FILE, default=None, metavar='PATH',
+                        help=f"fit offline from a transition log (default {TRANSITIONS_FILE}) instead of playing")
+    parser.add_argument('--learning-rate', type=float, default=None)
+    parser.add_argument('--discount-factor', type=float, default=None)
+    parser.add_argument('--epochs', type=int, default=OFFLINE_EPOCHS, help="passes over the log (offline)")
+    parser.add_argument('--episodes', type=int, default=300, help="learning episodes (online)")
+    parser.add_argument('--batch-size', type=int, default=REPLAY_BATCH_SIZE)
+    parser.add_argument('--replay-batches', type=int, default=REPLAY_BATCHES,
+                        help="minibatches replayed per episode (online)")
+    parser.add_argument('--eval-episodes', type=int, default=EVAL_EPISODES)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    overrides = {name: value for name, value in (('learning_rate', args.learning_rate),
+                                                 ('discount_factor', args.discount_factor)) if value is not None}
+    config = TrainingConfig(**overrides)
+    start_time = time.time()
+
+    if args.from_log is not None:
+        transitions = read_transitions(args.from_log)
+        print(f"Fitting {len(transitions):,} transitions from {args.from_log} | Epochs: {args.epochs} | "
+              f"Learning Rate: {config.learning_rate} | Discount: {config.discount_factor}")
+        q_table = fit_offline(transitions, config, args.epochs, args.batch_size, args.seed)
+    else:
+        trainer = ReplayTrainer(config, run_seed=args.seed, batch_size=args.batch_size,
+                                replay_batches=args.replay_batches)
+        print(f"Training {args.episodes} episodes with replay | Run Seed: {trainer.run_seed}")
+        _, total_points = trainer.train(episodes=args.episodes)
+        print(f"Average Score: {total_points / args.episodes:.2f} | Buffer: {len(trainer.buffer):,} transitions")
+        q_table = trainer.q_storage.table
+
+    print(f"Finished in {time.time() - start_time:.1f} seconds.")
+    np.save(args.output, q_table)
+    print(f"Saved Q-table to {args.output}.")
+
+    if args.eval_episodes:
+        score = QLearningTrainer(config, q_table).evaluate(args.eval_episodes, EVAL_SEED)
+        print(f"Greedy Eval Score ({args.eval_episodes} games): {score:.2f}")
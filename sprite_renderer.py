@@ -0,0 +1,196 @@
+# ------------------------------------------------
+# DIRTY-RECT SPRITE RENDERER (shared by the pygame front-ends)
+# ------------------------------------------------
+# The game state lives in a GameEngine (or any object with x, y, width and
+# height); each thing that is drawn gets a sprite that copies its position every
+# frame and is only marked dirty when it actually moved or changed image. A LayeredDirty
+# group then repaints just those areas (background underneath, sprites on top)
+# and only the changed rectangles are pushed to the display. Grounded garbage
+# that no longer moves costs nothing per frame.
+#
+# Fixed-timestep games can pass the fraction of a step that has elapsed since
+# the last simulation step (alpha) to draw(); targets that record their
+# `previous` topleft before each step are then drawn in between the two.
+#
+# EngineRenderer is the adapter the front-ends use: it draws a GameEngine's
+# player, live garbage and a status line, and only ever reads the engine.
+
+import pygame
+
+_grayscale_cache = {}
+
+
+def grayscale(image):
+    """Grayscale copy of `image`, converted once per source surface."""
+    gray = _grayscale_cache.get(image)
+    if gray is None:
+        gray = _grayscale_cache[image] = pygame.transform.grayscale(image)
+    return gray
+
+
+class FollowSprite(pygame.sprite.DirtySprite):
+    """Draws `image` wherever the game object `target` (x, y, width, height) currently is.
+
+    With an `alpha` and a `previous` topleft on the target, the sprite is drawn
+    that fraction of the way from the previous position to the current one.
+    """
+
+    def __init__(self, target, image):
+        super().__init__()
+        self.target = target
+        self.image = image
+        self.rect = pygame.Rect(target.x, target.y, target.width, target.height)
+
+    def update(self, alpha=None):
+        target = self.target
+        previous = getattr(target, 'previous', None)
+        if alpha is None or previous is None:
+            topleft = (target.x, target.y)
+        else:
+            topleft = (round(previous[0] + (target.x - previous[0]) * alpha),
+                       round(previous[1] + (target.y - previous[1]) * alpha))
+
+        if self.rect.topleft != topleft:
+            self.rect.topleft = topleft
+            self.dirty = 1
+
+    def set_image(self, image):
+        if image is not self.image:
+            self.image = image
+            self.dirty = 1
+
+
+class TextSprite(pygame.sprite.DirtySprite):
+    """A text label that is only re-rendered when its text changes."""
+
+    def __init__(self, font, color, topleft, text=""):
+        super().__init__()
+        self.font = font
+        self.color = color
+        self.topleft = topleft
+        self.text = None
+        self.set_text(text)
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.image = self.font.render(text, True, self.color)
+            self.rect = self.image.get_rect(topleft=self.topleft)
+            self.dirty = 1
+
+
+class DirtyRenderer:
+    """LayeredDirty group over a solid background that updates only changed screen areas."""
+
+    def __init__(self, screen, background_color):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(background_color)
+
+        self.sprites = pygame.sprite.LayeredDirty()
+        self.sprites.clear(screen, self.background)
+        self._full_update = True
+
+    def add(self, sprite, layer=0):
+        self.sprites.add(sprite, layer=layer)
+
+    def follow(self, target, image, layer=0):
+        """Adds and returns a FollowSprite for `target`; kill() it when the object goes away."""
+        sprite = FollowSprite(target, image)
+        self.add(sprite, layer)
+        return sprite
+
+    def reset(self):
+        """Drops every sprite and repaints the whole screen on the next frame."""
+        self.sprites.empty()
+        self._full_update = True
+
+    def draw(self, alpha=None):
+        """Moves the sprites to their targets (interpolated by `alpha`) and repaints the dirty areas; returns them."""
+        if self._full_update:
+            self.screen.blit(self.background, (0, 0))
+            self.sprites.repaint_rect(self.screen.get_rect())
+        self.sprites.update(alpha)
+        return self.sprites.draw(self.screen, self.background)
+
+    def flip(self, rects):
+        """Pushes `rects` (from draw) to the display, or the whole screen after a reset."""
+        if self._full_update:
+            pygame.display.flip()
+            self._full_update = False
+        else:
+            pygame.display.update(rects)
+
+
+class GarbageSprite(pygame.sprite.DirtySprite):
+    """One live garbage of a GarbagePool, grayscale once it is on the ground."""
+
+    def __init__(self, pool, slot, image):
+        super().__init__()
+        self.pool = pool
+        self.slot = slot
+        self.image = self.falling_image = image
+        self.rect = pygame.Rect(pool.x[slot], pool.y[slot], pool.width, pool.height)
+
+    def update(self, alpha=None):
+        pool = self.pool
+        slot = self.slot
+        y = pool.y[slot]
+        if pool.lock[slot]:
+            if self.image is self.falling_image:
+                self.image = grayscale(self.falling_image)
+                self.dirty = 1
+        elif alpha is not None:
+            y = round(pool.prev_y[slot] + (y - pool.prev_y[slot]) * alpha)
+
+        topleft = (pool.x[slot], y)
+        if self.rect.topleft != topleft:
+            self.rect.topleft = topleft
+            self.dirty = 1
+
+
+class EngineRenderer(DirtyRenderer):
+    """Draws a GameEngine: the player, its live garbage and a status line on top.
+
+    Garbage images are picked by spawn order, so drawing never touches the
+    game's random numbers and a rendered game plays exactly like a headless one.
+    """
+
+    def __init__(self, screen, background_color, player_image, garbage_images, font, text_color=(0, 0, 0),
+                 text_topleft=(10, 10)):
+        super().__init__(screen, background_color)
+        self.player_image = player_image
+        self.garbage_images = garbage_images
+        self.font = font
+        self.text_color = text_color
+        self.text_topleft = text_topleft
+        self.engine = None
+
+    def attach(self, engine):
+        """Starts drawing `engine` (call after every engine.reset())."""
+        self.reset()
+        self.engine = engine
+        self.follow(engine.player, self.player_image, layer=0)
+        self.status = TextSprite(self.font, self.text_color, self.text_topleft)
+        self.add(self.status, layer=2)
+        self.garbage_sprites = {}  # Spawn sequence number -> GarbageSprite
+
+    def draw(self, status_text="", alpha=None):
+        """Syncs the garbage sprites with the engine and repaints what changed; returns the dirty areas."""
+        pool = self.engine.garbage_pool
+        sprites = self.garbage_sprites
+        live = pool.falling[:pool.falling_count] + pool.grounded[:pool.grounded_count]
+
+        if len(live) != len(sprites) or any(pool.seq[slot] not in sprites for slot in live):
+            live_seqs = set()
+            for slot in live:
+                seq = pool.seq[slot]
+                live_seqs.add(seq)
+                if seq not in sprites:
+                    sprites[seq] = GarbageSprite(pool, slot, self.garbage_images[seq % len(self.garbage_images)])
+                    self.add(sprites[seq], layer=1)
+            for seq in [seq for seq in sprites if seq not in live_seqs]:
+                sprites.pop(seq).kill()  # Collected
+
+        self.status.set_text(status_text)
+        return super().draw(alpha)
@@ -0,0 +1,195 @@
+# ------------------------------------------------
+# BINARY TRANSITION LOG (streaming writer, memory-mapped reader)
+# ------------------------------------------------
+# Records the (state, action, reward, next_state, done) transitions the trainer
+# learns from, tagged with their episode index, as fixed-size little-endian
+# records. The file is a HEADER_BYTES header followed by packed records, so a
+# whole log can be mapped read-only as one NumPy structured array:
+#
+#   header: MAGIC, VERSION, record size (int64 each), zero padding
+#   data:   TRANSITION_DTYPE records, in the order they were recorded
+#
+# The training thread only ever fills preallocated chunks of a ring buffer; a
+# background thread appends full chunks to the file. If the writer falls a full
+# ring behind, record() waits for a free chunk rather than dropping transitions.
+
+import os
+import sys
+import threading
+from collections import deque
+
+import numpy as np
+
+MAGIC = 0x4C544743  # 'CGTL'
+VERSION = 1
+HEADER_BYTES = 64
+
+TRANSITION_DTYPE = np.dtype([
+    ('episode', '<u4'),
+    ('state', 'u1', (2,)),       # (relative X bin, Y bin)
+    ('action', 'u1'),
+    ('reward', '<f4'),
+    ('next_state', 'u1', (2,)),
+    ('done', '?'),                # Game over: no future reward
+])
+
+CHUNK_RECORDS = 1 << 16  # Records per ring buffer chunk (~1 MB)
+RING_CHUNKS = 4
+
+
+def _header():
+    header = np.zeros(HEADER_BYTES // 8, dtype='<i8')
+    header[:3] = (MAGIC, VERSION, TRANSITION_DTYPE.itemsize)
+    return header
+
+
+def _check_header(path, header):
+    if header[0] != MAGIC or header[1] != VERSION or header[2] != TRANSITION_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a version {VERSION} transition log")
+
+
+def read_transitions(path):
+    """Maps the log at `path` read-only; returns a structured array of TRANSITION_DTYPE records.
+
+    A record the writer was still appending is left out.
+    """
+    size = os.path.getsize(path)
+    if size < HEADER_BYTES:
+        raise ValueError(f"{path} is not a version {VERSION} transition log")
+    _check_header(path, np.fromfile(path, dtype='<i8', count=HEADER_BYTES // 8))
+
+    count = (size - HEADER_BYTES) // TRANSITION_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=TRANSITION_DTYPE)
+    return np.memmap(path, dtype=TRANSITION_DTYPE, mode='r', offset=HEADER_BYTES, shape=(count,))
+
+
+class TransitionRecorder:
+    """Appends transitions to the log at `path` through a ring of preallocated chunks.
+
+    record() writes one transition into the current chunk; full chunks are
+    handed to a writer thread. An existing log is appended to, so resumed runs
+    keep one file. flush() waits until everything recorded so far is on disk,
+    close() flushes and stops the thread.
+    """
+
+    def __init__(self, path, chunk_records=CHUNK_RECORDS, ring_chunks=RING_CHUNKS):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.recorded = 0
+        self.written = 0
+
+        append = os.path.exists(path) and os.path.getsize(path) >= HEADER_BYTES
+        if append:
+            _check_header(path, np.fromfile(path, dtype='<i8', count=HEADER_BYTES // 8))
+        self._file = open(path, 'r+b' if append else 'wb')
+        if append:
+            # Drop a record torn by a crash, so new records stay aligned
+            records = (os.path.getsize(path) - HEADER_BYTES) // TRANSITION_DTYPE.itemsize
+            self._file.truncate(HEADER_BYTES + records * TRANSITION_DTYPE.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file.write(_header().tobytes())
+            self._file.flush()
+
+        self._chunks = [np.zeros(chunk_records, dtype=TRANSITION_DTYPE) for _ in range(ring_chunks)]
+        self._free = deque(range(1, ring_chunks))
+        self._full = deque()  # (chunk, record count) waiting for the writer
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._use_chunk(0)
+
+        self._thread = threading.Thread(target=self._run, name='transition-writer', daemon=True)
+        self._thread.start()
+
+    def _use_chunk(self, chunk):
+        records = self._chunks[chunk]
+        self._chunk = chunk
+        self._index = 0
+        # Field views, so record() is a handful of scalar stores
+        self._episode = records['episode']
+        self._state = records['state']
+        self._action = records['action']
+        self._reward = records['reward']
+        self._next_state = records['next_state']
+        self._done = records['done']
+
+    def record(self, episode, state, action, reward, next_state, done=False):
+        index = self._index
+        self._episode[index] = episode
+        self._state[index] = state
+        self._action[index] = action
+        self._reward[index] = reward
+        self._next_state[index] = next_state
+        self._done[index] = done
+
+        self._index = index + 1
+        if self._index == self.chunk_records:
+            self._submit()
+
+    def _submit(self):
+        """Hands the current chunk to the writer and switches to a free one (waiting if none is)."""
+        with self._condition:
+            self._full.append((self._chunk, self._index))
+            self.recorded += self._index
+            self._condition.notify_all()
+            while not self._free:
+                self._condition.wait()
+            self._use_chunk(self._free.popleft())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._full and not self._closed:
+                    self._condition.wait()
+                if not self._full:
+                    return
+                chunk, count = self._full.popleft()
+                self._writing = True
+
+            try:
+                self._file.write(self._chunks[chunk][:count].tobytes())
+                self._file.flush()
+                self.written += count
+            except Exception as e:
+                print(f"Error writing transition log: {e}")
+
+            with self._condition:
+                self._free.append(chunk)
+                self._writing = False
+                self._condition.notify_all()
+
+    def flush(self):
+        """Writes the partly filled chunk too and waits until the file holds every record."""
+        if self._index:
+            self._submit()
+        with self._condition:
+            while self._full or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._file.close()
+
+
+def summarize(path):
+    """Prints what a transition log holds."""
+    transitions = read_transitions(path)
+    print(f"{path}: {len(transitions):,} transitions ({TRANSITION_DTYPE.itemsize} bytes each)")
+    if len(transitions) == 0:
+        return
+
+    episodes = np.unique(transitions['episode'])
+    print(f"Episodes: {len(episodes):,} ({episodes[0]:,} to {episodes[-1]:,}) | "
+          f"Game overs: {int(np.count_nonzero(transitions['done'])):,}")
+    print(f"Reward: total {float(transitions['reward'].sum(dtype=np.float64)):,.0f} | "
+          f"Actions (left, none, right): {np.bincount(transitions['action'], minlength=3).tolist()}")
+
+
+if __name__ == "__main__":
+    summarize(sys.argv[1] if len(sys.argv) > 1 else 'catch_garbage_transitions.bin')
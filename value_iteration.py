@@ -0,0 +1,191 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from MachineLearningGemini import ACTION_SPACE, Q_TABLE_FILE, Q_TABLE_SHAPE, TrainingConfig, QLearningTrainer
+from batched_simulator import BatchedSimulator, DEFAULT_NUM_ENVS
+from checkpoint import write_atomic
+
+# ------------------------------------------------
+# MODEL-BASED SOLVER SETTINGS
+# ------------------------------------------------
+# The solver plans per tick (one decision per tick, as visual_player plays), so
+# its discount is per tick too: events are hundreds of ticks apart, and the
+# trainer's per-event DISCOUNT_FACTOR would make every plan a few ticks long.
+SOLVER_DISCOUNT = 0.995
+ROLLOUT_ROUNDS = 3         # Round 1 acts at random, later rounds follow the latest solution
+ROLLOUT_TICKS = 4000       # Lockstep ticks per round (x n_envs transitions)
+ROLLOUT_EPSILON = 0.3      # Random actions in the later rounds, so every action keeps being tried
+TOLERANCE = 1e-6           # Value iteration stops once no Q-value changes by more than this
+MAX_ITERATIONS = 100_000
+EVAL_EPISODES = 20
+EVAL_SEED = 2024
+
+
+class TransitionModel:
+    """Transition counts and reward sums per (state, action), from observed ticks.
+
+    States are flat indices x_bin * y_bins + y_bin. Only (state, action,
+    next state) triples that occurred are stored, as parallel arrays, so memory
+    grows with what was seen rather than with states squared.
+    """
+
+    def __init__(self, n_states, n_actions=ACTION_SPACE):
+        self.n_states = n_states
+        self.n_actions = n_actions
+        n_pairs = n_states * n_actions
+        self.visits = np.zeros(n_pairs, dtype=np.int64)
+        self.reward_sum = np.zeros(n_pairs)
+        self.keys = np.zeros(0, dtype=np.int64)  # pair * n_states + next state
+        self.key_counts = np.zeros(0, dtype=np.int64)
+        self._pending = []
+
+    def add(self, states, actions, rewards, next_states, done):
+        """Counts one batch of ticks (arrays over envs).
+
+        `done` ticks add their visit and reward but no transition, so a game
+        over has no next state to bootstrap from.
+        """
+        pairs = states * self.n_actions + actions
+        n_pairs = self.visits.size
+        self.visits += np.bincount(pairs, minlength=n_pairs)
+        self.reward_sum += np.bincount(pairs, weights=rewards, minlength=n_pairs)
+        self._pending.append(pairs[~done] * self.n_states + next_states[~done])
+
+    def _merge(self):
+        if self._pending:
+            keys, inverse = np.unique(np.concatenate([self.keys] + self._pending), return_inverse=True)
+            counts = np.concatenate([self.key_counts, np.ones(len(inverse) - len(self.keys), dtype=np.int64)])
+            self.keys = keys
+            self.key_counts = np.bincount(inverse, weights=counts, minlength=len(keys)).astype(np.int64)
+            self._pending = []
+
+    def tensors(self):
+        """Returns (mean reward per pair, pair index, next state, probability) of every observed transition.
+
+        Probabilities are per visit, so for a pair whose games sometimes ended
+        they sum to the fraction of visits that did not. Pairs that were never
+        tried get reward 0 and no transitions.
+        """
+        self._merge()
+        seen = np.maximum(self.visits, 1)
+        pairs, next_states = np.divmod(self.keys, self.n_states)
+        return self.reward_sum / seen, pairs, next_states, self.key_counts / seen[pairs]
+
+
+def solve(model, discount=SOLVER_DISCOUNT, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS, q_values=None):
+    """Value iteration on the estimated model; returns Q of shape (n_states, n_actions) and the iterations run.
+
+    Each backup is Q = R + discount * P V, with the sparse product P V done as
+    one np.bincount over the observed transitions. Terminal ticks are missing
+    from P, so their share of a pair's visits contributes reward only.
+    """
+    rewards, pairs, next_states, probabilities = model.tensors()
+    q = np.zeros(rewards.size) if q_values is None else np.array(q_values, dtype=np.float64).reshape(-1)
+    n_pairs = rewards.size
+
+    for iteration in range(1, max_iterations + 1):
+        values = q.reshape(model.n_states, model.n_actions).max(axis=1)
+        new_q = rewards + discount * np.bincount(pairs, weights=probabilities * values[next_states], minlength=n_pairs)
+        delta = np.max(np.abs(new_q - q))
+        q = new_q
+        if delta < tolerance:
+            break
+
+    return q.reshape(model.n_states, model.n_actions), iteration
+
+
+def collect_rollouts(model, config, q_values=None, epsilon=1.0, ticks=ROLLOUT_TICKS, n_envs=DEFAULT_NUM_ENVS,
+                     seed=None):
+    """Plays `ticks` lockstep ticks of `n_envs` games and adds every tick to `model`.
+
+    Actions are random with probability `epsilon`, otherwise greedy on `q_values`.
+    """
+    rng = np.random.default_rng(seed)
+    simulator = BatchedSimulator(n_envs, rng=rng)
+    x_bins, y_bins = config.state_relative_x_bins, config.state_y_bins
+    x_bin, y_bin = simulator.get_states(x_bins=x_bins, y_bins=y_bins)
+    states = x_bin * y_bins + y_bin
+
+    for _ in range(ticks):
+        actions = rng.integers(0, ACTION_SPACE, n_envs)
+        if q_values is not None and epsilon < 1.0:
+            greedy = rng.random(n_envs) >= epsilon
+            actions[greedy] = np.argmax(q_values[states[greedy]], axis=1)
+
+        _, ground_hits, collections, done, _, _, _ = simulator.step(actions)
+        rewards = (ground_hits * config.penalty_ground + collections * config.reward_collect
+                   + done * config.penalty_game_over)
+
+        x_bin, y_bin = simulator.get_states(x_bins=x_bins, y_bins=y_bins)
+        next_states = x_bin * y_bins + y_bin
+        model.add(states, actions, rewards, next_states, done)
+        states = next_states
+
+
+def build_q_table(config=None, discount=SOLVER_DISCOUNT, rounds=ROLLOUT_ROUNDS, ticks=ROLLOUT_TICKS,
+                  n_envs=DEFAULT_NUM_ENVS, seed=None, verbose=True):
+    """Estimates the model from rollouts and solves it; returns a Q-table of config.q_table_shape.
+
+    Rollouts of all rounds are pooled, so later rounds refine the model where
+    the improving policy actually goes.
+    """
+    config = config if config is not None else TrainingConfig()
+    model = TransitionModel(config.state_relative_x_bins * config.state_y_bins)
+    seeds = np.random.SeedSequence(seed).spawn(rounds)
+    q_values = None
+
+    for round_index in range(rounds):
+        start_time = time.perf_counter()
+        epsilon = 1.0 if q_values is None else ROLLOUT_EPSILON
+        collect_rollouts(model, config, q_values, epsilon, ticks, n_envs, seeds[round_index])
+        rollout_seconds = time.perf_counter() - start_time
+
+        q_values, iterations = solve(model, discount, q_values=q_values)
+        if verbose:
+            print(f"Round {round_index + 1}/{rounds}: {ticks * n_envs:,} ticks in {rollout_seconds:.1f}s | "
+                  f"Seen pairs: {np.count_nonzero(model.visits)}/{model.visits.size} | "
+                  f"Value iteration: {iterations} sweeps in {time.perf_counter() - start_time - rollout_seconds:.2f}s")
+
+    return q_values.reshape(config.q_table_shape)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve the discretized game by value iteration on a sampled model.")
+    parser.add_argument('--discount', type=float, default=SOLVER_DISCOUNT, help="per-tick discount")
+    parser.add_argument('--rounds', type=int, default=ROLLOUT_ROUNDS)
+    parser.add_argument('--ticks', type=int, default=ROLLOUT_TICKS, help="lockstep ticks per round")
+    parser.add_argument('--envs', type=int, default=DEFAULT_NUM_ENVS)
+    parser.add_argument('--x-bins', type=int, default=None)
+    parser.add_argument('--y-bins', type=int, default=None)
+    parser.add_argument('--eval-episodes', type=int, default=EVAL_EPISODES)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=None,
+                        help=f"default {Q_TABLE_FILE} for the standard bins, else a file named after the shape")
+    args = parser.parse_args()
+
+    overrides = {name: value for name, value in (('state_relative_x_bins', args.x_bins),
+                                                 ('state_y_bins', args.y_bins)) if value is not None}
+    config = TrainingConfig(**overrides)
+
+    # visual_player and load_checkpoint read Q_TABLE_FILE as a Q_TABLE_SHAPE table
+    standard_shape = config.q_table_shape == Q_TABLE_SHAPE
+    if args.output is None:
+        args.output = (Q_TABLE_FILE if standard_shape
+                       else 'catch_garbage_q_table_{}x{}x{}.npy'.format(*config.q_table_shape))
+    elif not standard_shape and os.path.abspath(args.output) == os.path.abspath(Q_TABLE_FILE):
+        parser.error(f"a {config.q_table_shape} table cannot be written to {Q_TABLE_FILE}, which holds "
+                     f"{Q_TABLE_SHAPE} tables; choose another --output")
+
+    start_time = time.time()
+    q_table = build_q_table(config, args.discount, args.rounds, args.ticks, args.envs, args.seed)
+    print(f"Solved {q_table.shape} Q-table in {time.time() - start_time:.1f} seconds.")
+
+    write_atomic(args.output, lambda f: np.save(f, q_table))
+    print(f"Saved Q-table to {args.output}.")
+
+    if args.eval_episodes:
+        score = QLearningTrainer(config, q_table).evaluate(args.eval_episodes, EVAL_SEED)
+        print(f"Greedy Eval Score ({args.eval_episodes} games): {score:.2f}")
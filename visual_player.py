@@ -1,30 +1,53 @@
+import argparse
+import os
 import pygame
 import numpy as np
-import random
 import time
-import math
 import sys
+import atexit
+
+import MachineLearningGemini as trainer
+from game_engine import GameEngine, PLAYER_WIDTH, PLAYER_HEIGHT, GARBAGE_WIDTH, GARBAGE_HEIGHT, FIXED_DT
+from dqn_numpy import DQN_MODEL_FILE, DQN_WEIGHTS_FILE, NumpyQNetwork
+from greedy_policy import compile_policy
+from phase_profiler import PhaseProfiler
+from policy_mmap import PolicySubscriber
+from sprite_renderer import EngineRenderer
+
+# --- Command Line ---
+parser = argparse.ArgumentParser(description="Watch (or batch-evaluate) the trained Q-table policy.")
+parser.add_argument('--live', action='store_true', help="follow the Q-table a running trainer publishes")
+parser.add_argument('--profile', action='store_true', help="time each phase of a frame, written on exit")
+parser.add_argument('--speed', type=float, default=1.0,
+                    help="multiple of real time to play at (0 = as fast as possible)")
+parser.add_argument('--render-every', type=int, default=2, help="draw every Nth tick")
+parser.add_argument('--headless', action='store_true',
+                    help="no window (SDL dummy driver), nothing drawn; implies --speed 0")
+parser.add_argument('--episodes', type=int, default=1, help="games to play before exiting")
+parser.add_argument('--seed', type=int, default=None,
+                    help="run seed; game i gets the garbage of training episode (seed, i)")
+parser.add_argument('--dqn', nargs='?', const=DQN_WEIGHTS_FILE, default=None, metavar='WEIGHTS',
+                    help=f"play the DQN (NumPy forward pass, no torch) instead of the Q-table; "
+                         f"default weights {DQN_WEIGHTS_FILE}, else read from {DQN_MODEL_FILE} "
+                         f"(its observation layout is unverified and it plays worse than random here)")
+parser.add_argument('--parity', action='store_true',
+                    help="replay every game headless in the trainer and check that the results match")
+# Only the script reads the command line; an imported module (e.g. by benchmark.py) gets the defaults
+args = parser.parse_args() if __name__ == "__main__" else parser.parse_args([])
+
+if args.headless:
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    args.speed = 0.0
+if args.seed is None:
+    args.seed = int(np.random.SeedSequence().entropy)
 
 # --- Pygame Setup ---
 pygame.init()
 pygame.display.set_caption("Trained AI Player (Q-Table Demo)")
 screen = pygame.display.set_mode((650, 550))
-clock = pygame.time.Clock()
-
-# --- Game Constants ---
-SCREEN_WIDTH = 650
-SCREEN_HEIGHT = 550
-PLAYER_WIDTH = 100
-PLAYER_HEIGHT = 100
-PLAYER_SPEED = 15  # Matches the trained speed (PLAYER_REPLACEMENT)
-GRAVITY = 20
-COLLECT_DISTANCE = 20
-GARBAGE_ON_GROUND_LIMIT = 20
-
-# --- State Space Constants (MUST MATCH TRAINER) ---
-STATE_RELATIVE_X_BINS = 10
-STATE_Y_BINS = 3
-ACTION_SPACE = 3  # 0: Left, 1: No Move, 2: Right
+
+# The game itself is the trainer's GameEngine; state and decision interval come from the trainer too
+DECISION_INTERVAL = trainer.DECISION_INTERVAL  # Ticks each action is held for
 
 # --- Load Trained Q-Table ---
 try:
@@ -32,201 +55,180 @@ try:
     print("Successfully loaded trained Q-table!")
 except FileNotFoundError:
     print("Warning: 'catch_garbage_q_table.npy' not found. AI will use random policy.")
-    Q_TABLE = np.zeros((STATE_RELATIVE_X_BINS, STATE_Y_BINS, ACTION_SPACE))
+    Q_TABLE = np.zeros(trainer.Q_TABLE_SHAPE)
 except Exception as e:
     print(f"Error loading Q-table: {e}. AI will use random policy.")
-    Q_TABLE = np.zeros((STATE_RELATIVE_X_BINS, STATE_Y_BINS, ACTION_SPACE))
+    Q_TABLE = np.zeros(trainer.Q_TABLE_SHAPE)
+
+# Best action per state, precomputed once: acting is a single list lookup
+GREEDY_POLICY = compile_policy(Q_TABLE)
+
+# --- DQN Policy (python visual_player.py --dqn) ---
+# The exported q_net of the SB3 DQN, run with NumPy; it acts on raw observations instead of states
+dqn_network = None
+if args.dqn is not None:
+    dqn_path = args.dqn if os.path.exists(args.dqn) or args.dqn != DQN_WEIGHTS_FILE else DQN_MODEL_FILE
+    dqn_network = NumpyQNetwork.load(dqn_path)
+    print(f"Loaded DQN policy from {dqn_path}.")
+
+# --- Live Policy (python visual_player.py --live) ---
+# Follows the Q-table a running trainer publishes; Q_TABLE is used until the first generation arrives
+live_policy = PolicySubscriber(trainer.POLICY_FILE) if args.live else None
 
 # --- Images (Ensure these paths exist for Pygame) ---
 try:
-    player_image = pygame.transform.scale(pygame.image.load("Images/recycle-bin.png"), (PLAYER_WIDTH, PLAYER_HEIGHT))
-    apple_image = pygame.transform.scale(pygame.image.load("Images/apple.png"), (50, 50))
-    banana_image = pygame.transform.scale(pygame.image.load("Images/banana.png"), (50, 50))
-    bottle_image = pygame.transform.scale(pygame.image.load("Images/garbage-bag.png"), (50, 50))
-    garbage_bag_image = pygame.transform.scale(pygame.image.load("Images/garbage-bag.png"), (50, 50))
+    # convert_alpha() once so blits need no per-frame pixel format conversion
+    player_image = pygame.transform.scale(pygame.image.load("Images/recycle-bin.png"), (PLAYER_WIDTH, PLAYER_HEIGHT)).convert_alpha()
+    garbage_size = (GARBAGE_WIDTH, GARBAGE_HEIGHT)
+    apple_image = pygame.transform.scale(pygame.image.load("Images/apple.png"), garbage_size).convert_alpha()
+    banana_image = pygame.transform.scale(pygame.image.load("Images/banana.png"), garbage_size).convert_alpha()
+    bottle_image = pygame.transform.scale(pygame.image.load("Images/garbage-bag.png"), garbage_size).convert_alpha()
+    garbage_bag_image = pygame.transform.scale(pygame.image.load("Images/garbage-bag.png"), garbage_size).convert_alpha()
     garbage_image_list = [apple_image, banana_image, bottle_image, garbage_bag_image]
 except pygame.error as e:
     print(f"Error loading images: {e}. Pygame requires these files to run.")
     sys.exit()
 
 
-# --- Classes ---
-
-class Player(pygame.Rect):
-    def __init__(self):
-        super().__init__(275, 450, PLAYER_WIDTH, PLAYER_HEIGHT)
-        self.image = player_image
-
-
-class Garbage(pygame.Rect):
-    def __init__(self):
-        width, height = 50, 50
-        random_x = random.randint(20, SCREEN_WIDTH - width - 20)
-        super().__init__(random_x, -50, width, height)
-
-        self.selected_image = random.choice(garbage_image_list)
-        self.vy = 0.0
-        self._y = float(self.y)
-        self.lock = False  # True if it has hit the ground
-
-
-# --- Game State and Utility Functions ---
-player = Player()
-garbage_rect_list = []
-points = 0
+# --- Game State ---
+engine = GameEngine()
 font = pygame.font.Font(None, 36)
-spawn_difficulty_rate = 2.0
-spawn_interval = 8.0  # Starting interval (seconds)
-spawn_modifier = 0.25
-
+renderer = EngineRenderer(screen, (230, 230, 250), player_image, garbage_image_list, font)  # Light Lavender background
 
-def get_state(player_obj, garbage_list):
-    """Discretizes the game state (Relative X, Y Height) - MUST MATCH TRAINER."""
-    falling_garbage = [g for g in garbage_list if not g.lock]
-
-    if not falling_garbage:
-        return (0, 0)
-
-    closest_garbage = min(falling_garbage, key=lambda g: abs(player_obj.centerx - g.centerx))
-
-    relative_x = closest_garbage.centerx - player_obj.centerx
-    bin_size = SCREEN_WIDTH / STATE_RELATIVE_X_BINS
-
-    relative_x_bin = np.clip(
-        int((relative_x + SCREEN_WIDTH / 2) / bin_size),
-        0, STATE_RELATIVE_X_BINS - 1
-    )
-
-    garbage_y_bin = np.clip(
-        int(closest_garbage.centery / SCREEN_HEIGHT * STATE_Y_BINS),
-        0, STATE_Y_BINS - 1
-    )
-
-    return (relative_x_bin, garbage_y_bin)
+# Profiling (python visual_player.py --profile): frame time per phase, written on exit
+profiler = PhaseProfiler() if args.profile else None
+PROFILE_FILE = 'visual_player_profile.json'
 
 
 def select_action(state):
     """Selects the best action based on the loaded Q-Table (pure exploitation)."""
     # Epsilon is effectively 0 here, as we only exploit the learned policy
-    q_values = Q_TABLE[state]
-    return np.argmax(q_values)
-
-
-def apply_action(action):
-    """Moves the player based on the selected action."""
-    if action == 0 and player.x - PLAYER_SPEED >= 0:
-        player.x -= PLAYER_SPEED
-    elif action == 2 and player.x + PLAYER_SPEED <= (SCREEN_WIDTH - PLAYER_WIDTH):
-        player.x += PLAYER_SPEED
-
-
-def check_length_between_two_points(a, b, x, y):
-    return round(math.sqrt((x - a) ** 2 + (y - b) ** 2))
-
+    if live_policy is not None and live_policy.table is not None:
+        return np.argmax(live_policy.q_values(state))
+    return GREEDY_POLICY.act(state)
 
-def check_collision_and_collect():
-    global points
-    for garbage in garbage_rect_list[:]:
-        if garbage.lock: continue
 
-        # Simplified collision check
-        if player.colliderect(garbage):
-            garbage_center_x = garbage.x + (garbage.width // 2)
-            garbage_center_y = garbage.y + (garbage.height // 2)
+def start_game(game_index):
+    """Resets the engine to game `game_index`: the garbage of training episode (seed, game_index)."""
+    engine.reset(trainer.EpisodeRandom(args.seed, game_index).spawn_x)
+    renderer.attach(engine)
 
-            trash_bin_collect_point_x = player.x + (player.width // 2)
-            trash_bin_collect_point_y = player.y + (player.height // 3)
 
-            length = check_length_between_two_points(garbage_center_x, garbage_center_y, trash_bin_collect_point_x,
-                                                     trash_bin_collect_point_y)
+def status_text():
+    text = f"Points: {engine.points} | AI Mode: {'DQN' if dqn_network is not None else 'ON'}"
+    if live_policy is not None:
+        text += f" | Policy: gen {live_policy.generation}"
+    return text
 
-            if length < COLLECT_DISTANCE:
-                garbage_rect_list.remove(garbage)
-                points += 1
-                return  # Only collect one per tick for simplicity
 
-
-def apply_gravity(dt):
-    global running
-    garbage_on_ground_count = 0
-
-    for rect in garbage_rect_list[:]:
-        if rect.lock:
-            garbage_on_ground_count += 1
-            continue
-
-        rect.vy += GRAVITY * dt
-        rect._y += rect.vy * dt
-        rect.y = int(rect._y)
-
-        if rect.bottom > SCREEN_HEIGHT:
-            rect.bottom = SCREEN_HEIGHT
-            rect._y = rect.y
-            rect.vy = 0.0
-            rect.lock = True
-
-    if garbage_on_ground_count > GARBAGE_ON_GROUND_LIMIT:
-        return False  # Game Over
-
-    return True  # Game Still Running
-
-
-def draw():
-    screen.fill((230, 230, 250))  # Light Lavender background
-
-    # Draw Player
-    screen.blit(player.image, player)
-
-    # Draw Garbage
-    for rect in garbage_rect_list:
-        if rect.lock:
-            # Draw ground garbage slightly grayscale to distinguish
-            grayscale_img = pygame.transform.grayscale(rect.selected_image)
-            screen.blit(grayscale_img, rect)
-        else:
-            screen.blit(rect.selected_image, rect)
-
-    # Draw Score/Status
-    status_text = f"Points: {points} | AI Mode: ON"
-    text_surface = font.render(status_text, True, (0, 0, 0))
-    screen.blit(text_surface, (10, 10))
+def check_parity(game_results):
+    """Replays the games headless in the trainer's evaluation and compares (points, game time)."""
+    evaluator = trainer.QLearningTrainer(trainer.TrainingConfig(), GREEDY_POLICY, epsilon=0.0, run_seed=args.seed)
+    expected = [evaluator.run_episode(i, learn=False) for i in range(len(game_results))]
+    for i, (played, replayed) in enumerate(zip(game_results, expected)):
+        print(f"Game {i + 1}: pygame {played} | headless {replayed} | {'OK' if played == replayed else 'MISMATCH'}")
+    return game_results == expected
 
 
 # --- Main Game Loop ---
-running = True
-last_spawn_time = time.time()
-
-print("\n--- Starting Visual AI Play ---")
-
-while running:
-    # Handle Quit Event
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # Calculate delta time
-    dt = clock.tick(60) / 1000.0  # Cap frame rate at 60 FPS
-
-    # --- Garbage Spawning ---
-    if not garbage_rect_list or time.time() - last_spawn_time > (spawn_interval / math.log2(spawn_difficulty_rate)):
-        garbage_rect_list.append(Garbage())
-        last_spawn_time = time.time()
-        spawn_difficulty_rate += spawn_modifier
-
-    # --- AI Action ---
-    state = get_state(player, garbage_rect_list)
-    action = select_action(state)
-    apply_action(action)
-
-    # --- Game Logic ---
-    running = apply_gravity(dt)
-    check_collision_and_collect()
-
-    # --- Drawing ---
-    draw()
-
-    pygame.display.flip()
+# Every tick advances the engine by FIXED_DT, paced at --speed times real time
+# (0 = uncapped) and drawn every --render-every ticks. The game only depends on
+# the seed, never on frame rate or speed.
+if __name__ == "__main__":
+    render_every = 0 if args.headless else max(1, args.render_every)
+    running = True
+    game_results = []
+    tick = 0
+    wall_start = time.perf_counter()
+    paced_game_time = 0.0  # Game time since wall_start, for --speed pacing
+
+    engine.profiler = profiler
+    start_game(0)
+    action = None
+
+    print("\n--- Starting Visual AI Play ---")
+    print(f"Run Seed: {args.seed} | Speed: {'uncapped' if args.speed == 0 else f'{args.speed:g}x'} | "
+          f"Render: {'off' if render_every == 0 else f'every {render_every} ticks'}")
+
+    if profiler is not None:
+        atexit.register(profiler.dump, PROFILE_FILE)
+        atexit.register(profiler.report)
+
+    while running:
+        if profiler is not None:
+            profiler.start(len(engine.garbage_pool))
+
+        rendering = render_every and tick % render_every == 0
+
+        # Handle Quit Event
+        if rendering:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+            if profiler is not None:
+                profiler.lap('events')
+
+        # Keep pace with real time
+        paced_game_time += FIXED_DT
+        if args.speed > 0:
+            ahead = paced_game_time / args.speed - (time.perf_counter() - wall_start)
+            if ahead > 0:
+                time.sleep(ahead)
+        if profiler is not None:
+            profiler.lap('frame_wait')
+
+        # --- AI Action ---
+        # A new action every DECISION_INTERVAL ticks, as in training; held until then
+        if tick % DECISION_INTERVAL == 0:
+            if live_policy is not None:
+                live_policy.poll()  # Switch to the trainer's newest Q-table between decisions
+            if dqn_network is not None:
+                action = dqn_network.act(engine.observation())
+            else:
+                state = trainer.get_state(engine.player, engine.garbage_pool)
+                if profiler is not None:
+                    profiler.lap('get_state')
+                action = select_action(state)
+        tick += 1
+
+        # --- Game Logic ---
+        game_over = engine.step(action)
+
+        # --- Drawing ---
+        if rendering:
+            dirty_rects = renderer.draw(status_text())
+            if profiler is not None:
+                profiler.lap('draw')
+
+            renderer.flip(dirty_rects)
+            if profiler is not None:
+                profiler.lap('flip')
+
+        # --- Game Over ---
+        if game_over:
+            game_results.append((engine.points, engine.game_time))
+            print(f"Game {len(game_results)}: {engine.points} points | {engine.game_time:.1f}s game time")
+            if len(game_results) < args.episodes:
+                start_game(len(game_results))
+                tick = 0
+            else:
+                running = False
+
+    if game_results:
+        wall_seconds = time.perf_counter() - wall_start
+        mean_points = sum(points for points, _ in game_results) / len(game_results)
+        print(f"Mean points over {len(game_results)} games: {mean_points:.2f} | Wall time: {wall_seconds:.1f}s")
+
+    parity_ok = True
+    if args.parity and game_results:
+        if live_policy is not None:
+            print("Parity check skipped: --live changes the policy during play.")
+        elif dqn_network is not None:
+            print("Parity check skipped: the headless trainer plays the Q-table, not the DQN.")
+        else:
+            parity_ok = check_parity(game_results)
+            print(f"Parity with the headless trainer: {'OK' if parity_ok else 'MISMATCH'}")
 
-# Cleanup
-pygame.quit()
-sys.exit()
+    # Cleanup
+    pygame.quit()
+    sys.exit(0 if parity_ok else 1)